@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for the hot paths of Plotlyst on synthetic, large novels.
+
+Run from the repository root:
+    PYTHONPATH=src/main/python python benchmark.py <benchmark> [options]
+"""
+import argparse
+import os
+import random
+import tempfile
+import tracemalloc
+from timeit import default_timer as timer
+
+os.environ.setdefault('PLOTLYST_TEST_ENV', '1')
+
+from plotlyst.core import codec  # noqa: E402
+from plotlyst.core.client import json_client, SceneInfo, CharacterInfo  # noqa: E402
+from plotlyst.core.domain import Novel, Character, Chapter, Scene, Plot, ScenePlotReference, Document  # noqa: E402
+from plotlyst.env import app_env  # noqa: E402
+
+_qt_app = None
+
+
+def synthetic_novel(scenes: int, characters: int = 0, chapters: int = 0) -> Novel:
+    if not characters:
+        characters = max(1, scenes // 5)
+    if not chapters:
+        chapters = max(1, scenes // 3)
+
+    novel = Novel.new_novel(title='Benchmark')
+    novel.characters.extend([Character(name=f'Character {i}') for i in range(characters)])
+    novel.chapters.extend([Chapter(title=str(i + 1)) for i in range(chapters)])
+    plot = Plot(text='Main')
+    novel.plots.append(plot)
+    for i in range(scenes):
+        scene = Scene(title=f'Scene {i}', synopsis=f'Synopsis of scene {i}. ' * 5,
+                      pov=novel.characters[i % characters],
+                      characters=[novel.characters[(i + 1) % characters], novel.characters[(i + 2) % characters]],
+                      chapter=novel.chapters[i * chapters // scenes],
+                      plot_values=[ScenePlotReference(plot)])
+        novel.scenes.append(scene)
+
+    return novel
+
+
+def persist_synthetic_novel(workspace: str, scenes: int) -> Novel:
+    json_client.init(workspace)
+    novel = synthetic_novel(scenes)
+    app_env.novel = novel
+    json_client.insert_novel(novel)
+    for character in novel.characters:
+        json_client.update_character(character, novel=novel)
+    for scene in novel.scenes:
+        json_client.update_scene(scene)
+    json_client.update_novel(novel)
+
+    return novel
+
+
+def synthetic_manuscript_html(words: int) -> str:
+    global _qt_app
+    from PyQt6.QtGui import QGuiApplication, QTextDocument
+
+    if QGuiApplication.instance() is None:
+        _qt_app = QGuiApplication([])
+    rnd = random.Random(words)
+    vocabulary = [''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rnd.randint(2, 9))) for _ in
+                  range(3000)]
+    paragraphs = []
+    for _ in range(max(1, words // 80)):
+        paragraphs.append(' '.join(rnd.choice(vocabulary) for _ in range(80)).capitalize() + '.')
+    document = QTextDocument()
+    document.setPlainText('\n'.join(paragraphs))
+    return document.toHtml()
+
+
+def measure(func, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = timer()
+        func()
+        elapsed = timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_fetch(args):
+    print(f'{"scenes":>8} {"sequential":>12} {"parallel":>12} {"speedup":>8}')
+    for scenes in args.scenes:
+        with tempfile.TemporaryDirectory() as workspace:
+            novel = persist_synthetic_novel(workspace, scenes)
+
+            json_client.parallel_loading = False
+            sequential = measure(lambda: json_client.fetch_novel(novel.id), args.repeat)
+            json_client.parallel_loading = True
+            parallel = measure(lambda: json_client.fetch_novel(novel.id), args.repeat)
+
+            print(f'{scenes:>8} {sequential:>11.3f}s {parallel:>11.3f}s {sequential / parallel:>7.2f}x')
+
+
+def bench_storage(args):
+    print(f'{"scenes":>8} {"directory":>12} {"container":>12} {"speedup":>8}')
+    for scenes in args.scenes:
+        with tempfile.TemporaryDirectory() as workspace:
+            novel = persist_synthetic_novel(workspace, scenes)
+
+            def save():
+                with json_client.batch():
+                    for scene in novel.scenes:
+                        json_client.update_scene(scene)
+                    json_client.update_novel(novel)
+
+            directory = measure(lambda: json_client.fetch_novel(novel.id), args.repeat)
+            directory += measure(save, args.repeat)
+            json_client.convert_to_container(novel.id)
+            container = measure(lambda: json_client.fetch_novel(novel.id), args.repeat)
+            container += measure(save, args.repeat)
+            json_client.init(workspace)
+
+            print(f'{scenes:>8} {directory:>11.3f}s {container:>11.3f}s {directory / container:>7.2f}x')
+
+
+def bench_codec(args):
+    print(f'{"scenes":>8} {"":>7} {"dataclasses_json":>17} {"codec":>12} {"speedup":>8}')
+    for scenes in args.scenes:
+        with tempfile.TemporaryDirectory() as workspace:
+            novel = persist_synthetic_novel(workspace, scenes)
+            scene_data = [path.read_text(encoding='utf-8') for path in
+                          json_client.novels_dir.joinpath(str(novel.id), 'scenes').iterdir()]
+            character_data = [path.read_text(encoding='utf-8') for path in
+                              json_client.novels_dir.joinpath(str(novel.id), 'characters').iterdir()]
+
+        def reference_decode():
+            return [SceneInfo.from_json(x) for x in scene_data] + [CharacterInfo.from_json(x) for x in character_data]
+
+        def codec_decode():
+            return [codec.from_json(SceneInfo, x) for x in scene_data] + [codec.from_json(CharacterInfo, x) for x
+                                                                          in character_data]
+
+        infos = codec_decode()
+        reference = measure(reference_decode, args.repeat)
+        fast = measure(codec_decode, args.repeat)
+        print(f'{scenes:>8} {"decode":>7} {reference:>16.3f}s {fast:>11.3f}s {reference / fast:>7.2f}x')
+
+        reference = measure(lambda: [x.to_json() for x in infos], args.repeat)
+        fast = measure(lambda: [codec.to_json(x) for x in infos], args.repeat)
+        print(f'{scenes:>8} {"encode":>7} {reference:>16.3f}s {fast:>11.3f}s {reference / fast:>7.2f}x')
+
+
+def bench_docs(args):
+    print(f'{"words":>8} {"format":>8} {"bytes/save":>12} {"save":>10}')
+    for words in args.words:
+        with tempfile.TemporaryDirectory() as workspace:
+            novel = persist_synthetic_novel(workspace, 1)
+            content = synthetic_manuscript_html(words)
+            for compact in [False, True]:
+                json_client.compact_documents = compact
+                document = Document('Manuscript')
+                saves = []
+
+                def save():
+                    document.content = content + str(len(saves))  # one keystroke
+                    with json_client.batch() as stats:
+                        json_client.update_document(novel, document)
+                    saves.append(stats.written_bytes)
+
+                elapsed = measure(save, args.repeat)
+                name = 'compact' if compact else 'html'
+                print(f'{words:>8} {name:>8} {saves[-1]:>12} {elapsed * 1000:>8.2f}ms')
+            json_client.compact_documents = False
+
+
+def bench_index(args):
+    print(f'{"scenes":>8} {"linear":>12} {"index":>12} {"speedup":>8}')
+    for scenes in args.scenes:
+        novel = synthetic_novel(scenes)
+        ids = [(x.id, x.pov.id, x.chapter.id) for x in novel.scenes if x.pov and x.chapter]
+
+        def find(entities, id_):
+            for entity in entities:
+                if entity.id == id_:
+                    return entity
+
+        def linear_lookup():
+            for scene_id, character_id, chapter_id in ids:
+                find(novel.scenes, scene_id)
+                find(novel.characters, character_id)
+                find(novel.chapters, chapter_id)
+
+        def index_lookup():
+            for scene_id, character_id, chapter_id in ids:
+                novel.index.scene(scene_id)
+                novel.index.character(character_id)
+                novel.index.chapter(chapter_id)
+
+        linear = measure(linear_lookup, args.repeat)
+        indexed = measure(index_lookup, args.repeat)
+        print(f'{scenes:>8} {linear:>11.3f}s {indexed:>11.3f}s {linear / indexed:>7.2f}x')
+
+
+def bench_entities(args):
+    print(f'{"scenes":>8} {"memory":>10} {"str hash":>12} {"hash":>12} {"speedup":>8}')
+    for scenes in args.scenes:
+        tracemalloc.start()
+        novel = synthetic_novel(scenes)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        entities = novel.scenes + novel.characters + novel.chapters
+        str_hash = measure(lambda: [hash(str(x.id)) for x in entities], args.repeat)
+        entity_hash = measure(lambda: [hash(x) for x in entities], args.repeat)
+        print(f'{scenes:>8} {memory / 1024 / 1024:>8.2f}MB {str_hash * 1000:>10.2f}ms {entity_hash * 1000:>10.2f}ms '
+              f'{str_hash / entity_hash:>7.2f}x')
+
+
+def bench_wordcount(args):
+    from PyQt6.QtGui import QGuiApplication, QTextDocument, QTextCursor
+    from plotlyst.core.text import wc
+    from plotlyst.view.widget.input import BlockStatistics
+
+    print(f'{"words":>8} {"blocks":>8} {"edit":>10} {"full":>10} {"per block":>10} {"speedup":>8}')
+    for words in args.words:
+        html = synthetic_manuscript_html(words)
+        document = QTextDocument()
+        document.documentLayout()
+        statistics = BlockStatistics(document)
+        document.setHtml(html)
+        QGuiApplication.processEvents()
+        assert statistics.wordCount() == wc(document.toPlainText().replace('\n', ' '))
+        middle = document.findBlockByNumber(document.blockCount() // 2).position()
+
+        def keystroke(count):
+            cursor = QTextCursor(document)
+            cursor.setPosition(middle)
+            cursor.insertText('a ')
+            count()
+            cursor.setPosition(middle)
+            cursor.setPosition(middle + 2, QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+            count()
+
+        edit = measure(lambda: keystroke(lambda: None), args.repeat)
+        full = measure(lambda: keystroke(lambda: wc(document.toPlainText())), args.repeat)
+        incremental = measure(lambda: keystroke(statistics.wordCount), args.repeat)
+        print(f'{words:>8} {document.blockCount():>8} {edit * 500:>8.3f}ms {full * 500:>8.3f}ms '
+              f'{incremental * 500:>8.3f}ms {full / incremental:>7.2f}x')
+
+
+def synthetic_paragraphs(words: int) -> list:
+    rnd = random.Random(words)
+    vocabulary = [''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rnd.randint(2, 9))) for _ in
+                  range(3000)] + ['Mr.', '—', '(aside)', 'well,', '"Hello,"', 'then;', 'what?!', '...']
+    paragraphs = []
+    for _ in range(max(1, words // 40)):
+        sentences = [' '.join(rnd.choice(vocabulary) for _ in range(10)).capitalize() + rnd.choice('.?!')
+                     for _ in range(4)]
+        paragraphs.append(' '.join(sentences))
+    return paragraphs
+
+
+def bench_text(args):
+    import re
+    import nltk
+    from plotlyst.core.text import sentence_counts, _sentence_count
+
+    def clean_text(text: str) -> str:
+        text = re.sub(r'[,:;()\-–—]', ' ', text)
+        text = re.sub(r'["\'“”«»‹›„‟’❝❞❮❯⹂〝〞〟＂‚‘‛❛❜❟]', '', text)
+        text = re.sub(r'[\.!?]', '.', text)
+        text = re.sub(r'^\s+', '', text)
+        text = re.sub(r'[ ]*(\n|\r\n|\r)[ ]*', ' ', text)
+        text = re.sub(r'([\.])[\. ]+', '.', text)
+        text = re.sub(r'[ ]*([\.])', '. ', text)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\s+$', '', text)
+        text = re.sub(r'\.(?! )', '. ', text)
+        text = re.sub(r'\,(?! )', ', ', text)
+        text = re.sub(r' +', ' ', text)
+        return text
+
+    print(f'{"words":>8} {"blocks":>8} {"per call":>12} {"batch":>12} {"cached":>12} {"speedup":>8}')
+    for words in args.words:
+        paragraphs = synthetic_paragraphs(words)
+
+        def batch():
+            _sentence_count.cache_clear()
+            sentence_counts(paragraphs)
+
+        per_call = measure(lambda: [len(nltk.text.sent_tokenize(clean_text(x))) for x in paragraphs], args.repeat)
+        batched = measure(batch, args.repeat)
+        cached = measure(lambda: sentence_counts(paragraphs), args.repeat)
+        print(f'{words:>8} {len(paragraphs):>8} {per_call * 1000:>10.2f}ms {batched * 1000:>10.2f}ms '
+              f'{cached * 1000:>10.2f}ms {per_call / batched:>7.2f}x')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run Plotlyst micro-benchmarks on synthetic novels')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='number of repetitions, the best one is reported')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    fetch_parser = subparsers.add_parser('fetch', help='sequential vs parallel novel loading')
+    fetch_parser.add_argument('-s', '--scenes', type=int, nargs='+', default=[100, 500, 1500],
+                              help='scene counts to measure')
+    fetch_parser.set_defaults(func=bench_fetch)
+
+    storage_parser = subparsers.add_parser('storage', help='open and save with directory vs container storage')
+    storage_parser.add_argument('-s', '--scenes', type=int, nargs='+', default=[100, 500, 1500],
+                                help='scene counts to measure')
+    storage_parser.set_defaults(func=bench_storage)
+
+    codec_parser = subparsers.add_parser('codec', help='dataclasses_json vs precompiled codecs')
+    codec_parser.add_argument('-s', '--scenes', type=int, nargs='+', default=[100, 500, 1500],
+                              help='scene counts to measure')
+    codec_parser.set_defaults(func=bench_codec)
+
+    docs_parser = subparsers.add_parser('docs', help='bytes written per manuscript save, plain vs compact')
+    docs_parser.add_argument('-w', '--words', type=int, nargs='+', default=[500, 2000, 5000],
+                             help='manuscript word counts to measure')
+    docs_parser.set_defaults(func=bench_docs)
+
+    index_parser = subparsers.add_parser('index', help='entity lookups by id, linear scan vs novel index')
+    index_parser.add_argument('-s', '--scenes', type=int, nargs='+', default=[100, 500, 1500],
+                              help='scene counts to measure')
+    index_parser.set_defaults(func=bench_index)
+
+    entities_parser = subparsers.add_parser('entities', help='memory and hashing of the domain entities')
+    entities_parser.add_argument('-s', '--scenes', type=int, nargs='+', default=[500, 2000],
+                                 help='scene counts to measure')
+    entities_parser.set_defaults(func=bench_entities)
+
+    wordcount_parser = subparsers.add_parser('wordcount', help='word count per keystroke, full text vs per block')
+    wordcount_parser.add_argument('-w', '--words', type=int, nargs='+', default=[2000, 10000, 20000],
+                                  help='manuscript word counts to measure')
+    wordcount_parser.set_defaults(func=bench_wordcount)
+
+    text_parser = subparsers.add_parser('text', help='text cleaning and sentence counting per block')
+    text_parser.add_argument('-w', '--words', type=int, nargs='+', default=[2000, 10000, 50000],
+                             help='manuscript word counts to measure')
+    text_parser.set_defaults(func=bench_text)
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -46,6 +46,7 @@ try:
     from fbs_runtime.application_context import cached_property, is_frozen
 
     from plotlyst.core.client import json_client
+    from plotlyst.event.core import event_profiler
     from plotlyst.event.handler import handle_exception
     from plotlyst.view.main_window import MainWindow
     from plotlyst.view.stylesheet import APP_STYLESHEET
@@ -78,8 +79,11 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--mode', type=lambda mode: AppMode[mode.upper()], choices=list(AppMode), default=AppMode.PROD)
     parser.add_argument('--clear', action='store_true')
+    parser.add_argument('--profile-events', action='store_true',
+                        help='record the time spent by event listeners; saved to the cache directory on exit')
     args = parser.parse_args()
     app_env.mode = args.mode
+    event_profiler.enabled = args.profile_events
 
     setup_logging()
 
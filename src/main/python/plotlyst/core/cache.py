@@ -0,0 +1,155 @@
+"""
+Plotlyst
+Copyright (C) 2021-2024  Zsolt Kovari
+
+This file is part of Plotlyst.
+
+Plotlyst is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Plotlyst is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from plotlyst.core.domain import Document
+
+DOCUMENT_CACHE_BUDGET = 64 * 1024 * 1024  # bytes
+
+
+@dataclass
+class DocumentCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    resident_bytes: int = 0
+    resident_documents: int = 0
+
+
+@dataclass
+class _Entry:
+    document: 'weakref.ReferenceType[Document]'
+    novel_id: uuid.UUID
+    size: int = 0
+    persisted_version: int = -1
+
+
+class DocumentCache:
+    """Keeps the loaded content of documents within a memory budget.
+
+    When the budget is exceeded, the least recently used documents whose content is already persisted are unloaded.
+    An unloaded document reloads its content transparently the next time it is accessed.
+    Documents are referenced weakly, so the documents of a closed novel are not kept alive by the cache."""
+
+    def __init__(self, loader: Callable[[uuid.UUID, Document], str], budget: int = DOCUMENT_CACHE_BUDGET):
+        self.budget = budget
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._entries: 'OrderedDict[uuid.UUID, _Entry]' = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._resident_bytes = 0
+
+    def admit(self, novel_id: uuid.UUID, document: Document, persisted_version: Optional[int] = None):
+        """Starts tracking the content of the document, or updates it if already tracked.
+        The content is considered clean if the given persisted version is the current version of the document."""
+        with self._lock:
+            entry = self._entries.get(document.id)
+            if entry is None or entry.document() is not document:
+                if entry is not None:
+                    self._resident_bytes -= entry.size
+                entry = _Entry(weakref.ref(document), novel_id)
+                self._entries[document.id] = entry
+                document.attach_content_cache(self)
+            if persisted_version is not None:
+                entry.persisted_version = persisted_version
+            self._resize(document, entry)
+            self._entries.move_to_end(document.id)
+            self._evict()
+
+    def accessed(self, document: Document):
+        with self._lock:
+            if document.id in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(document.id)
+
+    def changed(self, document: Document):
+        with self._lock:
+            entry = self._entries.get(document.id)
+            if entry is not None:
+                self._resize(document, entry)
+                self._entries.move_to_end(document.id)
+                self._evict()
+
+    def reload(self, document: Document) -> str:
+        with self._lock:
+            entry = self._entries.get(document.id)
+            if entry is None:
+                return ''
+            self._misses += 1
+            version = document.content_version
+            content = self._loader(entry.novel_id, document)
+            if not document.restore_content(content):
+                content = document.content
+            elif document.content_version == version:
+                entry.persisted_version = version
+            self._resize(document, entry)
+            self._entries.move_to_end(document.id)
+            self._evict()
+            return content
+
+    def discard(self, document: Document):
+        with self._lock:
+            entry = self._entries.pop(document.id, None)
+            if entry is not None:
+                self._resident_bytes -= entry.size
+                document.attach_content_cache(None)
+
+    def stats(self) -> DocumentCacheStats:
+        with self._lock:
+            self._purge()
+            resident = sum(1 for x in self._entries.values() if x.size)
+            return DocumentCacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions,
+                                      resident_bytes=self._resident_bytes, resident_documents=resident)
+
+    def _resize(self, document: Document, entry: _Entry):
+        size = document.content_size()
+        self._resident_bytes += size - entry.size
+        entry.size = size
+
+    def _purge(self):
+        for id_, entry in list(self._entries.items()):
+            if entry.document() is None:
+                self._resident_bytes -= entry.size
+                del self._entries[id_]
+
+    def _evict(self):
+        if self._resident_bytes <= self.budget:
+            return
+        self._purge()
+        newest = next(reversed(self._entries), None)
+        for id_, entry in self._entries.items():
+            if self._resident_bytes <= self.budget:
+                break
+            document = entry.document()
+            if document is None or id_ == newest or not entry.size or \
+                    entry.persisted_version != document.content_version:
+                continue
+            if not document.unload_content(entry.persisted_version):
+                continue
+            self._resident_bytes -= entry.size
+            entry.size = 0
+            self._evictions += 1
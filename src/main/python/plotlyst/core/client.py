@@ -17,16 +17,21 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-import codecs
 import copy
+import gzip
+import hashlib
+import logging
 import os
 import pathlib
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import IntEnum
 from pathlib import Path
-from typing import List, Optional, Any, Dict, Set, Union
+from typing import List, Optional, Any, Dict, Set, Callable, Type
 
 from PyQt6.QtCore import QByteArray, QBuffer, QIODevice
 from PyQt6.QtGui import QImage, QImageReader, QImageWriter
@@ -35,6 +40,8 @@ from dataclasses_json import dataclass_json, Undefined, config
 from qthandy import busy
 
 from plotlyst.common import recursive
+from plotlyst.core import codec
+from plotlyst.core.cache import DocumentCache
 from plotlyst.core.domain import Novel, Character, Scene, Chapter, SceneStage, \
     default_stages, StoryStructure, \
     default_story_structures, NovelDescriptor, TemplateValue, \
@@ -49,6 +56,8 @@ from plotlyst.core.domain import Novel, Character, Scene, Chapter, SceneStage, \
     CharacterProfileSectionReference, CharacterMultiAttribute, default_character_profile, CharacterPersonality, \
     StrengthWeaknessAttribute, PremiseBuilder, SceneFunctions, Location, default_locations, TopicElement, StoryType, \
     DailyProductivity
+from plotlyst.core.journal import OperationJournal
+from plotlyst.core.storage import NovelStorage, DirectoryStorage, ContainerStorage
 from plotlyst.core.template import Role, exclude_if_empty, exclude_if_black, exclude_if_false
 from plotlyst.env import app_env
 
@@ -59,6 +68,9 @@ class ApplicationNovelVersion(IntEnum):
 
 LATEST_VERSION = [x for x in ApplicationNovelVersion][-1]
 
+PARALLEL_LOADING_THRESHOLD = 32
+COMPRESSED_SUFFIX = '.gz'
+
 
 class SqlClient:
 
@@ -80,8 +92,8 @@ class SqlClient:
     def update_novel(self, novel: Novel):
         json_client.update_novel(novel)
 
-    def fetch_novel(self, id: uuid.UUID) -> Novel:
-        return json_client.fetch_novel(id)
+    def fetch_novel(self, id: uuid.UUID, progress: Optional[Callable[[int, int], None]] = None) -> Novel:
+        return json_client.fetch_novel(id, progress)
 
     def insert_character(self, novel: Novel, character: Character):
         json_client.insert_character(novel, character)
@@ -226,9 +238,7 @@ class NovelInfo:
     synopsis: Optional['Document'] = None
     version: ApplicationNovelVersion = ApplicationNovelVersion.R0
     prefs: NovelPreferences = field(default_factory=NovelPreferences)
-    world: WorldBuilding = field(default_factory=WorldBuilding)
     locations: List[Location] = field(default_factory=default_locations)
-    board: Board = field(default_factory=Board)
     manuscript_goals: ManuscriptGoals = field(default_factory=ManuscriptGoals)
     events_map: Optional[Diagram] = field(default=None, metadata=config(exclude=exclude_if_empty))
     character_networks: List[Diagram] = field(default_factory=default_character_networks)
@@ -276,6 +286,19 @@ class JsonClient:
         self._old_characters_dir: Optional[pathlib.Path] = None
         self.project_images_dir: Optional[pathlib.Path] = None
         self._old_docs_dir: Optional[pathlib.Path] = None
+        self.loading_workers: Optional[int] = None
+        self.parallel_loading: bool = True
+        self.container_storage: bool = False
+        self.compact_documents: bool = False
+        self._directory_storage: Optional[DirectoryStorage] = None
+        self._storages: Dict[str, NovelStorage] = {}
+        self._storages_lock = threading.RLock()
+        self._batching = threading.local()
+        self._persisted_hashes: Dict[str, bytes] = {}
+        self._avatar_ids: Dict[uuid.UUID, Optional[uuid.UUID]] = {}
+        self._journal: Optional[OperationJournal] = None
+        self._journaling = threading.local()
+        self.document_cache = DocumentCache(self._load_document_content)
 
     def init(self, workspace: str):
         self.project_file_path = os.path.join(workspace, 'project.plotlyst')
@@ -286,7 +309,7 @@ class JsonClient:
         else:
             with open(self.project_file_path) as json_file:
                 data = json_file.read()
-                self.project = Project.from_json(data)
+                self.project = codec.from_json(Project, data)
             self._persist_project()
 
         self._workspace = workspace
@@ -299,6 +322,16 @@ class JsonClient:
         if not os.path.exists(str(self.project_images_dir)):
             os.mkdir(self.project_images_dir)
 
+        self._close_storages()
+        self._directory_storage = DirectoryStorage(self.novels_dir)
+        self._persisted_hashes.clear()
+        self._avatar_ids.clear()
+
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = OperationJournal(self.root_path.joinpath('journal'))
+        self._replay_journal()
+
     def novels(self) -> List[NovelDescriptor]:
         return [NovelDescriptor(title=x.title, id=x.id, import_origin=x.import_origin, lang_settings=x.lang_settings,
                                 subtitle=x.subtitle, icon=x.icon, icon_color=x.icon_color,
@@ -312,39 +345,110 @@ class JsonClient:
                 return True
         return False
 
-    def characters_dir(self, novel: Optional[Union[Novel, NovelInfo]] = None) -> Path:
-        if novel is None:
-            novel = app_env.novel
-        characters_dir_ = self.novels_dir.joinpath(str(novel.id)).joinpath('characters')
-        if not characters_dir_.exists():
-            characters_dir_.mkdir()
-        return characters_dir_
-
-    def scenes_dir(self, novel: Optional[Union[Novel, NovelInfo]] = None) -> Path:
-        if novel is None:
-            novel = app_env.novel
-        scenes_dir_ = self.novels_dir.joinpath(str(novel.id)).joinpath('scenes')
-        if not scenes_dir_.exists():
-            scenes_dir_.mkdir()
-        return scenes_dir_
-
-    def diagrams_dir(self, novel: Novel) -> Path:
-        diagrams_dir_ = self.novels_dir.joinpath(str(novel.id)).joinpath('diagrams')
-        if not diagrams_dir_.exists():
-            diagrams_dir_.mkdir()
-        return diagrams_dir_
-
     def images_dir(self, novel: Novel) -> Path:
         images_dir_ = self.novels_dir.joinpath(str(novel.id)).joinpath('images')
         if not images_dir_.exists():
             images_dir_.mkdir()
         return images_dir_
 
-    def docs_dir(self, novel: Novel) -> Path:
-        docs_dir_ = self.novels_dir.joinpath(str(novel.id)).joinpath('docs')
-        if not docs_dir_.exists():
-            docs_dir_.mkdir()
-        return docs_dir_
+    @contextmanager
+    def batch(self):
+        """Groups the writes of the block. Novels stored in a container are committed in one transaction.
+        Yields the counters of the written and the skipped, unchanged entities of the outermost batch.
+        Only the calling thread is affected: writes of other threads are neither part of the batch nor counted."""
+        batching = self._batching
+        batching.depth = getattr(batching, 'depth', 0) + 1
+        if batching.depth == 1:
+            batching.stats = BatchStats()
+            batching.storages = []
+        stats = batching.stats
+        try:
+            yield stats
+        finally:
+            batching.depth -= 1
+            if batching.depth == 0:
+                storages = batching.storages
+                batching.stats = None
+                batching.storages = []
+                for storage in storages:
+                    storage.commit()
+
+    @contextmanager
+    def journaling(self):
+        """Records the writes and deletions of the block in the workspace journal instead of applying them.
+        The records are synced to disk together at the end of the block.
+        Only the calling thread is affected. Avatars are not saved while journaling."""
+        self._journaling.active = True
+        try:
+            yield
+        finally:
+            self._journaling.active = False
+            self._journal.sync()
+
+    def rotate_journal(self) -> int:
+        """Closes the current journal segment and returns its sequence number.
+        The segment can be discarded once the changes recorded so far are persisted."""
+        return self._journal.rotate()
+
+    def discard_journal(self, sequence: int):
+        self._journal.discard(sequence)
+
+    def is_container_storage(self, novel_id: uuid.UUID) -> bool:
+        return isinstance(self._storage(novel_id), ContainerStorage)
+
+    def convert_to_container(self, novel_id: uuid.UUID):
+        """Imports every file of the novel from the directory layout into a single container file.
+        Images remain in the directory layout."""
+        storage = self._storage(novel_id)
+        if isinstance(storage, ContainerStorage):
+            return
+
+        keys = [self.__json_file(novel_id)]
+        images_prefix = self.__key(novel_id, 'images', '')
+        keys.extend([x for x in storage.keys(str(novel_id)) if not x.startswith(images_prefix)])
+
+        container = ContainerStorage(self.novels_dir.joinpath(self.__container_file(novel_id)))
+        container.begin()
+        try:
+            for key in keys:
+                container.write_bytes(key, storage.read_bytes(key))
+        finally:
+            container.commit()
+
+        with self._storages_lock:
+            self._storages[str(novel_id)] = container
+        for key in keys:
+            storage.delete(key)
+
+    def convert_to_directory(self, novel_id: uuid.UUID):
+        """Exports every entry of the novel's container file into the directory layout and removes the container."""
+        storage = self._storage(novel_id)
+        if not isinstance(storage, ContainerStorage):
+            return
+
+        for key in storage.keys():
+            self._directory_storage.write_bytes(key, storage.read_bytes(key))
+
+        with self._storages_lock:
+            self._storages[str(novel_id)] = self._directory_storage
+        storage.close()
+        os.remove(storage.path)
+
+    def migrate_documents(self, novel_id: uuid.UUID, compact: bool) -> int:
+        """Rewrites every document of the novel in the compact (compressed) or in the plain HTML format.
+        Returns the number of migrated documents."""
+        prefix = self.__key(novel_id, 'docs', '')
+        source_suffix = '.html' if compact else '.html' + COMPRESSED_SUFFIX
+        migrated = 0
+        with self.batch():
+            for key in self._storage(novel_id).keys(prefix):
+                if not key.endswith(source_suffix):
+                    continue
+                target_key = key + COMPRESSED_SUFFIX if compact else key[:-len(COMPRESSED_SUFFIX)]
+                self._write(novel_id, target_key, self._read(novel_id, key))
+                self._delete(novel_id, key)
+                migrated += 1
+        return migrated
 
     def update_project_novel(self, novel: Novel):
         novel_info = self._find_project_novel_info_or_fail(novel.id)
@@ -368,6 +472,8 @@ class JsonClient:
                                               short_synopsis=novel.short_synopsis, parent=novel.parent, sequence=novel.sequence)
         self.project.novels.append(project_novel_info)
         self._persist_project()
+        if self.container_storage:
+            self._open_container(novel.id)
         self._persist_novel(novel)
         novel_dir = self.novels_dir.joinpath(str(project_novel_info.id))
         if not novel_dir.exists():
@@ -377,7 +483,18 @@ class JsonClient:
         novel_info = self._find_project_novel_info_or_fail(novel.id)
         self.project.novels.remove(novel_info)
         self._persist_project()
-        self.__delete_info(self.novels_dir, novel_info.id)
+        self._delete(novel_info.id, self.__json_file(novel_info.id))
+
+        with self._storages_lock:
+            storage = self._storages.pop(str(novel_info.id), None)
+        if isinstance(storage, ContainerStorage):
+            storage.close()
+        container_path = self.novels_dir.joinpath(self.__container_file(novel_info.id))
+        if container_path.exists():
+            os.remove(container_path)
+        prefix = str(novel_info.id)
+        for key in [x for x in self._persisted_hashes if x.startswith(prefix)]:
+            self._persisted_hashes.pop(key, None)
 
     def update_novel(self, novel: Novel):
         self._persist_novel(novel)
@@ -394,7 +511,7 @@ class JsonClient:
 
     def delete_scene(self, novel: Novel, scene: Scene):
         self._persist_novel(novel)
-        self.__delete_info(self.scenes_dir(novel), scene.id)
+        self._delete(novel.id, self.__key(novel.id, 'scenes', self.__json_file(scene.id)))
         if scene.document:
             self.delete_document(novel, scene.document)
 
@@ -403,16 +520,13 @@ class JsonClient:
         self._persist_novel(novel)
 
     def update_character(self, character: Character, update_avatar: bool = False, novel: Optional[Novel] = None):
-        avatar_id: Optional[uuid.UUID] = None
-
-        path = self.characters_dir(novel).joinpath(self.__json_file(character.id))
-        if os.path.exists(path):
-            with open(path) as json_file:
-                data = json_file.read()
-                info: CharacterInfo = CharacterInfo.from_json(data)
-                avatar_id = info.avatar_id
+        if character.id in self._avatar_ids:
+            avatar_id = self._avatar_ids[character.id]
+        else:
+            avatar_id = self.__read_avatar_id(character, novel)
 
-        if update_avatar:
+        if update_avatar and not self._is_journaling():
+            self.load_avatar(character)
             if avatar_id:
                 self.__delete_image(avatar_id)
                 avatar_id = None
@@ -420,12 +534,18 @@ class JsonClient:
                 avatar_id = uuid.uuid4()
                 image = QImage.fromData(character.avatar)
                 image.save(str(self.project_images_dir.joinpath(self.__image_file(avatar_id))))
+            character.avatar_id = avatar_id
 
         self._persist_character(character, avatar_id, novel)
+        if not self._is_journaling():
+            # the journal runs concurrently with the flush, which owns the avatar index
+            self._avatar_ids[character.id] = avatar_id
 
     def delete_character(self, novel: Novel, character: Character):
         self._persist_novel(novel)
-        self.__delete_info(self.characters_dir(novel), character.id)
+        self._delete(novel.id, self.__key(novel.id, 'characters', self.__json_file(character.id)))
+        if not self._is_journaling():
+            self._avatar_ids.pop(character.id, None)
         if character.document:
             self.delete_document(novel, character.document)
 
@@ -442,14 +562,15 @@ class JsonClient:
         if document.type in [DocumentType.DOCUMENT, DocumentType.STORY_STRUCTURE]:
             content = self.__load_doc(novel, document.id)
             document.content = content
+            self.document_cache.admit(novel.id, document, document.content_version)
         else:
             data_str: str = self.__load_doc_data(novel, document.data_id)
             if document.type in [DocumentType.CAUSE_AND_EFFECT, DocumentType.REVERSED_CAUSE_AND_EFFECT]:
-                document.data = Causality.from_json(data_str)
+                document.data = codec.from_json(Causality, data_str)
             elif document.type == DocumentType.MICE:
-                document.data = MiceQuotient.from_json(data_str)
+                document.data = codec.from_json(MiceQuotient, data_str)
             elif document.type == DocumentType.PREMISE:
-                document.data = PremiseBuilder.from_json(data_str)
+                document.data = codec.from_json(PremiseBuilder, data_str)
         document.loaded = True
 
     @busy
@@ -464,11 +585,23 @@ class JsonClient:
 
         json_str = self.__load_diagram(novel, diagram.id)
         if json_str:
-            diagram.data = DiagramData.from_json(json_str)
+            diagram.data = codec.from_json(DiagramData, json_str)
         else:
             diagram.data = DiagramData()
         diagram.loaded = True
 
+    def load_avatar(self, character: Character) -> Optional[Any]:
+        if character.avatar or character.avatar_id is None:
+            return character.avatar
+
+        path = self.project_images_dir.joinpath(self.__image_file(character.avatar_id))
+        if path.exists():
+            character.avatar = path.read_bytes()
+        else:
+            character.avatar_id = None
+
+        return character.avatar
+
     def load_image(self, novel: Novel, ref: ImageRef) -> Optional[QImage]:
         filename = f'{ref.id}.{ref.extension}'
         path = self.images_dir(novel).joinpath(filename)
@@ -493,10 +626,16 @@ class JsonClient:
     def update_diagram(self, novel: Novel, diagram: Diagram):
         self._persist_diagram(novel, diagram)
 
-    def fetch_novel(self, id: uuid.UUID) -> Novel:
+    def fetch_novel(self, id: uuid.UUID, progress: Optional[Callable[[int, int], None]] = None) -> Novel:
         project_novel_info: ProjectNovelInfo = self._find_project_novel_info_or_fail(id)
         novel_info = self._read_novel_info(project_novel_info.id)
-        self.__persist_info(self.novels_dir, novel_info)
+        self._write(novel_info.id, self.__json_file(novel_info.id), codec.to_json(novel_info))
+
+        loading_progress = _LoadingProgress(len(novel_info.characters) + len(novel_info.scenes), progress)
+        character_keys = [self.__key(novel_info.id, 'characters', self.__json_file(x)) for x in novel_info.characters]
+        character_infos = self._read_infos(novel_info.id, character_keys, CharacterInfo, loading_progress)
+        scene_keys = [self.__key(novel_info.id, 'scenes', self.__json_file(x)) for x in novel_info.scenes]
+        scene_infos = self._read_infos(novel_info.id, scene_keys, SceneInfo, loading_progress)
 
         plot_ids = {}
         for plot in novel_info.plots:
@@ -507,43 +646,39 @@ class JsonClient:
             chapter = Chapter(title=chapter_info.title, id=chapter_info.id, type=chapter_info.type)
             chapters.append(chapter)
             chapters_ids[str(chapter.id)] = chapter
+        stage_ids = {}
+        for stage in novel_info.stages:
+            stage_ids.setdefault(str(stage.id), stage)
 
         characters = []
-        for char_id in novel_info.characters:
-            path = self.characters_dir(novel_info).joinpath(
-                self.__json_file(char_id))
-            if not os.path.exists(path):
+        for info in character_infos:
+            if info is None:
                 continue
-            with open(path, encoding='utf8') as json_file:
-                data = json_file.read()
-                info: CharacterInfo = CharacterInfo.from_json(data)
-                character = Character(name=info.name, id=info.id, gender=info.gender, role=info.role, age=info.age,
-                                      age_infinite=info.age_infinite,
-                                      occupation=info.occupation,
-                                      template_values=info.template_values,
-                                      disabled_template_headers=info.disabled_template_headers,
-                                      backstory=info.backstory, plans=info.plans,
-                                      document=info.document,
-                                      journals=info.journals, prefs=info.prefs, topics=info.topics,
-                                      big_five=info.big_five,
-                                      profile=info.profile,
-                                      summary=info.summary,
-                                      faculties=info.faculties,
-                                      traits=info.traits,
-                                      values=info.values,
-                                      gmc=info.gmc,
-                                      lack=info.lack,
-                                      baggage=info.baggage,
-                                      flaws=info.flaws,
-                                      strengths=info.strengths,
-                                      personality=info.personality, alias=info.alias,
-                                      origin_id=info.origin_id
-                                      )
-                if info.avatar_id:
-                    bytes = self._load_image(self.__image_file(info.avatar_id))
-                    if bytes:
-                        character.avatar = bytes
-                characters.append(character)
+            character = Character(name=info.name, id=info.id, gender=info.gender, role=info.role, age=info.age,
+                                  age_infinite=info.age_infinite,
+                                  occupation=info.occupation,
+                                  template_values=info.template_values,
+                                  disabled_template_headers=info.disabled_template_headers,
+                                  backstory=info.backstory, plans=info.plans,
+                                  document=info.document,
+                                  journals=info.journals, prefs=info.prefs, topics=info.topics,
+                                  big_five=info.big_five,
+                                  profile=info.profile,
+                                  summary=info.summary,
+                                  faculties=info.faculties,
+                                  traits=info.traits,
+                                  values=info.values,
+                                  gmc=info.gmc,
+                                  lack=info.lack,
+                                  baggage=info.baggage,
+                                  flaws=info.flaws,
+                                  strengths=info.strengths,
+                                  personality=info.personality, alias=info.alias,
+                                  origin_id=info.origin_id
+                                  )
+            character.avatar_id = info.avatar_id
+            self._avatar_ids[character.id] = info.avatar_id
+            characters.append(character)
         characters_ids: Dict[str, Character] = {}
         for char in characters:
             characters_ids[str(char.id)] = char
@@ -566,50 +701,43 @@ class JsonClient:
             novel_info.story_structures[0].active = True
 
         scenes: List[Scene] = []
-        for scene_id in novel_info.scenes:
-            path = self.scenes_dir(novel_info).joinpath(
-                self.__json_file(scene_id))
-            if not os.path.exists(path):
+        for info in scene_infos:
+            if info is None:
                 continue
-            with open(path, encoding='utf8') as json_file:
-                data = json_file.read()
-                info: SceneInfo = SceneInfo.from_json(data)
-                scene_plots = []
-                for plot_value in info.plots:
-                    if str(plot_value.plot_id) in plot_ids.keys():
-                        scene_plots.append(ScenePlotReference(plot_ids[str(plot_value.plot_id)], plot_value.data))
-                if info.pov and str(info.pov) in characters_ids.keys():
-                    pov = characters_ids[str(info.pov)]
-                else:
-                    pov = None
-
-                scene_characters = []
-                for char_id in info.characters:
-                    if str(char_id) in characters_ids.keys():
-                        scene_characters.append(characters_ids[str(char_id)])
-
-                if info.chapter and str(info.chapter) in chapters_ids.keys():
-                    chapter = chapters_ids[str(info.chapter)]
-                else:
-                    chapter = None
-
-                stage = None
-                if info.stage:
-                    match = [x for x in novel_info.stages if x.id == info.stage]
-                    if match:
-                        stage = match[0]
-
-                scene = Scene(title=info.title, id=info.id, synopsis=info.synopsis,
-                              wip=info.wip, day=info.day,
-                              plot_values=scene_plots, pov=pov, characters=scene_characters, agendas=info.agendas,
-                              chapter=chapter, stage=stage, beats=info.beats,
-                              comments=info.comments, tag_references=info.tag_references,
-                              document=info.document, manuscript=info.manuscript, drive=info.drive,
-                              purpose=info.purpose, outcome=info.outcome, story_elements=info.story_elements,
-                              structure=info.structure, questions=info.questions, info=info.info,
-                              progress=info.progress, plot_pos_progress=info.plot_pos_progress,
-                              plot_neg_progress=info.plot_neg_progress, functions=info.functions)
-                scenes.append(scene)
+            scene_plots = []
+            for plot_value in info.plots:
+                if str(plot_value.plot_id) in plot_ids.keys():
+                    scene_plots.append(ScenePlotReference(plot_ids[str(plot_value.plot_id)], plot_value.data))
+            if info.pov and str(info.pov) in characters_ids.keys():
+                pov = characters_ids[str(info.pov)]
+            else:
+                pov = None
+
+            scene_characters = []
+            for char_id in info.characters:
+                if str(char_id) in characters_ids.keys():
+                    scene_characters.append(characters_ids[str(char_id)])
+
+            if info.chapter and str(info.chapter) in chapters_ids.keys():
+                chapter = chapters_ids[str(info.chapter)]
+            else:
+                chapter = None
+
+            stage = None
+            if info.stage:
+                stage = stage_ids.get(str(info.stage))
+
+            scene = Scene(title=info.title, id=info.id, synopsis=info.synopsis,
+                          wip=info.wip, day=info.day,
+                          plot_values=scene_plots, pov=pov, characters=scene_characters, agendas=info.agendas,
+                          chapter=chapter, stage=stage, beats=info.beats,
+                          comments=info.comments, tag_references=info.tag_references,
+                          document=info.document, manuscript=info.manuscript, drive=info.drive,
+                          purpose=info.purpose, outcome=info.outcome, story_elements=info.story_elements,
+                          structure=info.structure, questions=info.questions, info=info.info,
+                          progress=info.progress, plot_pos_progress=info.plot_pos_progress,
+                          plot_neg_progress=info.plot_neg_progress, functions=info.functions)
+            scenes.append(scene)
 
         tag_types = novel_info.tag_types
         tags = novel_info.tags
@@ -647,28 +775,140 @@ class JsonClient:
                       character_networks=novel_info.character_networks,
                       manuscript_progress=novel_info.manuscript_progress, questions=novel_info.questions, productivity=novel_info.productivity)
 
-        world_path = self.novels_dir.joinpath(str(novel_info.id)).joinpath('world.json')
-        if os.path.exists(world_path):
-            with open(world_path, encoding='utf8') as json_file:
-                novel.world = WorldBuilding.from_json(json_file.read())
-        board_path = self.novels_dir.joinpath(str(novel_info.id)).joinpath('board.json')
-        if os.path.exists(board_path):
-            with open(board_path, encoding='utf8') as json_file:
-                novel.board = Board.from_json(json_file.read())
+        world_data = self._read(novel_info.id, self.__key(novel_info.id, 'world.json'))
+        if world_data is not None:
+            novel.world = codec.from_json(WorldBuilding, world_data)
+        board_data = self._read(novel_info.id, self.__key(novel_info.id, 'board.json'))
+        if board_data is not None:
+            novel.board = codec.from_json(Board, board_data)
 
         return novel
 
+    def _read_infos(self, novel_id: uuid.UUID, keys: List[str], info_type: Type,
+                    progress: '_LoadingProgress') -> List[Optional[Any]]:
+        """Reads and decodes the JSON entry of each key. The order of keys is kept, missing entries are returned as None.
+        Bigger batches are read and decoded concurrently on a thread pool."""
+        if not self.parallel_loading or len(keys) < PARALLEL_LOADING_THRESHOLD:
+            infos = []
+            for key in keys:
+                infos.append(self._read_info(novel_id, key, info_type))
+                progress.step()
+            return infos
+
+        with ThreadPoolExecutor(max_workers=self.loading_workers) as executor:
+            futures = [executor.submit(self._read_info, novel_id, key, info_type) for key in keys]
+            for _ in as_completed(futures):
+                progress.step()
+            return [x.result() for x in futures]
+
     def _read_novel_info(self, id: uuid.UUID) -> NovelInfo:
-        path = self.novels_dir.joinpath(self.__json_file(id))
-        if not os.path.exists(path):
+        data = self._read(id, self.__json_file(id))
+        if data is None:
             raise IOError(f'Could not find novel with id {id}')
-        with open(path) as json_file:
-            data = json_file.read()
-            return NovelInfo.from_json(data)
+        return codec.from_json(NovelInfo, data)
+
+    def _read_info(self, novel_id: uuid.UUID, key: str, info_type: Type) -> Optional[Any]:
+        data = self._read(novel_id, key)
+        if data is None:
+            return None
+        return codec.from_json(info_type, data)
+
+    def _read(self, novel_id: uuid.UUID, key: str) -> Optional[str]:
+        if key.endswith(COMPRESSED_SUFFIX):
+            compressed = self._storage(novel_id).read_bytes(key)
+            data = gzip.decompress(compressed).decode('utf-8') if compressed is not None else None
+        else:
+            data = self._storage(novel_id).read(key)
+        if data is not None:
+            self._persisted_hashes[key] = _content_hash(data)
+        return data
+
+    def _write(self, novel_id: uuid.UUID, key: str, data: str):
+        """Writes the data unless it is identical to what was last read or written under the same key.
+        Keys with the compressed suffix are stored gzip-compressed."""
+        if self._is_journaling():
+            self._journal.record_write(novel_id, key, data)
+            return
+
+        content_hash = _content_hash(data)
+        stats = getattr(self._batching, 'stats', None)
+        if self._persisted_hashes.get(key) == content_hash:
+            if stats:
+                stats.skipped += 1
+            return
+
+        if key.endswith(COMPRESSED_SUFFIX):
+            encoded = gzip.compress(data.encode('utf-8'), mtime=0)
+            self._batched_storage(novel_id).write_bytes(key, encoded)
+        else:
+            encoded = data.encode('utf-8')
+            self._batched_storage(novel_id).write(key, data)
+        self._persisted_hashes[key] = content_hash
+        if stats:
+            stats.written += 1
+            stats.written_bytes += len(encoded)
+
+    def _delete(self, novel_id: uuid.UUID, key: str):
+        if self._is_journaling():
+            self._journal.record_delete(novel_id, key)
+            return
+
+        self._batched_storage(novel_id).delete(key)
+        self._persisted_hashes.pop(key, None)
+
+    def _is_journaling(self) -> bool:
+        return getattr(self._journaling, 'active', False)
+
+    def _replay_journal(self):
+        """Applies the changes that were journaled but not persisted before the application stopped."""
+        replayed = 0
+        with self.batch():
+            for entry in self._journal.entries():
+                if not self.has_novel(entry.novel_id):
+                    continue
+                if entry.is_deletion():
+                    self._delete(entry.novel_id, entry.key)
+                else:
+                    self._write(entry.novel_id, entry.key, entry.data)
+                replayed += 1
+        if replayed:
+            logging.info('Replayed %d journaled changes', replayed)
+        self._journal.clear()
+
+    def _storage(self, novel_id: uuid.UUID) -> NovelStorage:
+        with self._storages_lock:
+            storage = self._storages.get(str(novel_id))
+            if storage is None:
+                if self.novels_dir.joinpath(self.__container_file(novel_id)).exists():
+                    storage = self._open_container(novel_id)
+                else:
+                    storage = self._directory_storage
+                    self._storages[str(novel_id)] = storage
+            return storage
+
+    def _batched_storage(self, novel_id: uuid.UUID) -> NovelStorage:
+        """Returns the storage of the novel and enters it into the batch of the calling thread, if any."""
+        storage = self._storage(novel_id)
+        if getattr(self._batching, 'depth', 0) and storage not in self._batching.storages:
+            storage.begin()
+            self._batching.storages.append(storage)
+        return storage
+
+    def _open_container(self, novel_id: uuid.UUID) -> ContainerStorage:
+        with self._storages_lock:
+            storage = ContainerStorage(self.novels_dir.joinpath(self.__container_file(novel_id)))
+            self._storages[str(novel_id)] = storage
+            return storage
+
+    def _close_storages(self):
+        with self._storages_lock:
+            for storage in self._storages.values():
+                storage.close()
+            self._storages.clear()
 
     def _persist_project(self):
         with atomic_write(self.project_file_path, overwrite=True) as f:
-            f.write(self.project.to_json())
+            f.write(codec.to_json(self.project))
 
     def _persist_novel(self, novel: Novel):
         novel_info = NovelInfo(id=novel.id, scenes=[x.id for x in novel.scenes],
@@ -688,23 +928,15 @@ class JsonClient:
                                events_map=novel.events_map, character_networks=novel.character_networks,
                                manuscript_progress=novel.manuscript_progress, questions=novel.questions, productivity=novel.productivity)
 
-        self.__persist_info(self.novels_dir, novel_info)
+        self._write(novel.id, self.__json_file(novel.id), codec.to_json(novel_info))
         # self._persist_world(novel.id, novel.world)
         self._persist_board(novel.id, novel.board)
 
     def _persist_world(self, novel_id: uuid.UUID, world: WorldBuilding):
-        novel_dir = self.novels_dir.joinpath(str(novel_id))
-        if not novel_dir.exists():
-            novel_dir.mkdir()
-
-        self.__persist_info_by_name(novel_dir, world, 'world')
+        self._write(novel_id, self.__key(novel_id, 'world.json'), codec.to_json(world))
 
     def _persist_board(self, novel_id: uuid.UUID, board: Board):
-        novel_dir = self.novels_dir.joinpath(str(novel_id))
-        if not novel_dir.exists():
-            novel_dir.mkdir()
-
-        self.__persist_info_by_name(novel_dir, board, 'board')
+        self._write(novel_id, self.__key(novel_id, 'board.json'), codec.to_json(board))
 
     def _persist_character(self, char: Character, avatar_id: Optional[uuid.UUID] = None, novel: Optional[Novel] = None):
         char_info = CharacterInfo(id=char.id, name=char.name, gender=char.gender, role=char.role, age=char.age,
@@ -729,7 +961,9 @@ class JsonClient:
                                   alias=char.alias,
                                   origin_id=char.origin_id
                                   )
-        self.__persist_info(self.characters_dir(novel), char_info)
+        novel_id = self.__novel_or_current(novel).id
+        self._write(novel_id, self.__key(novel_id, 'characters', self.__json_file(char.id)),
+                    codec.to_json(char_info))
 
     def _persist_scene(self, scene: Scene, novel: Optional[Novel] = None):
         plots = [ScenePlotReferenceInfo(x.plot.id, x.data) for x in scene.plot_values]
@@ -747,18 +981,27 @@ class JsonClient:
                          structure=scene.structure, questions=scene.questions, info=scene.info, progress=scene.progress,
                          plot_pos_progress=scene.plot_pos_progress, plot_neg_progress=scene.plot_neg_progress,
                          functions=scene.functions)
-        self.__persist_info(self.scenes_dir(novel), info)
+        novel_id = self.__novel_or_current(novel).id
+        self._write(novel_id, self.__key(novel_id, 'scenes', self.__json_file(scene.id)), codec.to_json(info))
 
     def _persist_diagram(self, novel: Novel, diagram: Diagram):
-        diagrams_dir = self.diagrams_dir(novel)
-        if not os.path.exists(str(diagrams_dir)):
-            os.mkdir(diagrams_dir)
-        self.__persist_json_by_id(diagrams_dir, diagram.data.to_json(), diagram.id)
+        self._write(novel.id, self.__key(novel.id, 'diagrams', self.__json_file(diagram.id)),
+                    codec.to_json(diagram.data))
 
     @staticmethod
     def __id_or_none(item):
         return item.id if item else None
 
+    @staticmethod
+    def __novel_or_current(novel: Optional[Novel]) -> Novel:
+        if novel is None:
+            return app_env.novel
+        return novel
+
+    @staticmethod
+    def __key(novel_id: uuid.UUID, *parts: str) -> str:
+        return '/'.join([str(novel_id), *parts])
+
     def __collect_goal_ids(self, goal_ids: Set[str], plans: List[CharacterPlan]):
         for plan in plans:
             for goal in plan.goals:
@@ -775,67 +1018,63 @@ class JsonClient:
     def __doc_file(self, uuid: uuid.UUID) -> str:
         return f'{uuid}.html'
 
-    def _load_image(self, filename: str) -> Optional[Any]:
-        path = self.project_images_dir.joinpath(filename)
-        return load_image(path)
+    def __container_file(self, uuid: uuid.UUID) -> str:
+        return f'{uuid}.db'
+
+    def __doc_key(self, novel: Novel, filename: str) -> str:
+        return self.__key(novel.id, 'docs', str(novel.id), filename)
 
     def __load_doc(self, novel: Novel, doc_uuid: uuid.UUID) -> str:
-        novel_doc_dir = self.docs_dir(novel).joinpath(str(novel.id))
-        path = novel_doc_dir.joinpath(self.__doc_file(doc_uuid))
-        if not os.path.exists(path):
-            return ''
-        with codecs.open(str(path), "r", "utf-8") as doc_file:
-            return doc_file.read()
+        return self._read_doc_content(novel.id, doc_uuid)
+
+    def _load_document_content(self, novel_id: uuid.UUID, doc: Document) -> str:
+        return self._read_doc_content(novel_id, doc.id)
+
+    def _read_doc_content(self, novel_id: uuid.UUID, doc_uuid: uuid.UUID) -> str:
+        """Reads the document in the preferred format first, then in the other one."""
+        for key in self._doc_content_keys(novel_id, doc_uuid):
+            content = self._read(novel_id, key)
+            if content is not None:
+                return content
+        return ''
+
+    def _doc_content_keys(self, novel_id: uuid.UUID, doc_uuid: uuid.UUID) -> List[str]:
+        """Returns the key of the document in the preferred format, followed by the key in the other format."""
+        key = self.__key(novel_id, 'docs', str(novel_id), self.__doc_file(doc_uuid))
+        if self.compact_documents:
+            return [key + COMPRESSED_SUFFIX, key]
+        return [key, key + COMPRESSED_SUFFIX]
 
     def __load_doc_data(self, novel: Novel, data_uuid: uuid.UUID) -> str:
         if not data_uuid:
             return ''
-        novel_doc_dir = self.docs_dir(novel).joinpath(str(novel.id))
-        path = novel_doc_dir.joinpath(self.__json_file(data_uuid))
-        if not os.path.exists(path):
-            return ''
-        with open(path, encoding='utf-8') as json_file:
-            return json_file.read()
+        data = self._read(novel.id, self.__doc_key(novel, self.__json_file(data_uuid)))
+        return data if data is not None else ''
 
     def __load_diagram(self, novel: Novel, diagram_uuid: uuid.UUID) -> str:
-        diagrams_dir = self.diagrams_dir(novel)
-        path = diagrams_dir.joinpath(self.__json_file(diagram_uuid))
-        if not os.path.exists(path):
-            return ''
-        with open(path, encoding='utf-8') as json_file:
-            return json_file.read()
+        data = self._read(novel.id, self.__key(novel.id, 'diagrams', self.__json_file(diagram_uuid)))
+        return data if data is not None else ''
 
     def __persist_doc(self, novel: Novel, doc: Document):
-        novel_doc_dir = self.docs_dir(novel).joinpath(str(novel.id))
-        if not os.path.exists(str(novel_doc_dir)):
-            os.mkdir(novel_doc_dir)
-
         if doc.type in [DocumentType.DOCUMENT, DocumentType.STORY_STRUCTURE]:
-            doc_file_path = novel_doc_dir.joinpath(self.__doc_file(doc.id))
-            with atomic_write(doc_file_path, encoding='utf-8', overwrite=True) as f:
-                f.write(doc.content)
+            version = doc.content_version
+            key, other_key = self._doc_content_keys(novel.id, doc.id)
+            self._write(novel.id, key, doc.content)
+            if other_key in self._persisted_hashes:
+                self._delete(novel.id, other_key)
+            if not self._is_journaling():
+                self.document_cache.admit(novel.id, doc, version)
         elif doc.type in [DocumentType.REVERSED_CAUSE_AND_EFFECT, DocumentType.CAUSE_AND_EFFECT, DocumentType.MICE,
                           DocumentType.PREMISE]:
-            self.__persist_json_by_id(novel_doc_dir, doc.data.to_json(), doc.data_id)
-
-    def __persist_info(self, dir, info: Any):
-        self.__persist_json_by_id(dir, info.to_json(), info.id)
-
-    def __persist_info_by_name(self, dir, info: Any, name: str):
-        self.__persist_json_by_name(dir, info.to_json(), name)
-
-    def __persist_json_by_name(self, dir, json_data: str, name: str):
-        with atomic_write(dir.joinpath(f'{name}.json'), encoding='utf-8', overwrite=True) as f:
-            f.write(json_data)
+            self._write(novel.id, self.__doc_key(novel, self.__json_file(doc.data_id)), codec.to_json(doc.data))
 
-    def __persist_json_by_id(self, dir, json_data: str, id: uuid.UUID):
-        with atomic_write(dir.joinpath(self.__json_file(id)), encoding='utf-8', overwrite=True) as f:
-            f.write(json_data)
-
-    def __delete_info(self, dir, id: uuid.UUID):
-        path = dir.joinpath(self.__json_file(id))
-        if os.path.exists(path):
-            os.remove(path)
+    def __read_avatar_id(self, character: Character, novel: Optional[Novel]) -> Optional[uuid.UUID]:
+        novel_id = self.__novel_or_current(novel).id
+        data = self._read(novel_id, self.__key(novel_id, 'characters', self.__json_file(character.id)))
+        if data is None:
+            return None
+        info: CharacterInfo = codec.from_json(CharacterInfo, data)
+        return info.avatar_id
 
     def __delete_image(self, id: uuid.UUID):
         path = self.project_images_dir.joinpath(self.__image_file(id))
@@ -843,17 +1082,38 @@ class JsonClient:
             os.remove(path)
 
     def __delete_doc(self, novel: Novel, doc: Document):
-        novel_doc_dir = self.docs_dir(novel).joinpath(str(novel.id))
-        if not os.path.exists(str(novel_doc_dir)):
-            return
-        doc_file_path = novel_doc_dir.joinpath(self.__doc_file(doc.id))
-        if os.path.exists(doc_file_path):
-            os.remove(doc_file_path)
+        for key in self._doc_content_keys(novel.id, doc.id):
+            self._delete(novel.id, key)
+        if not self._is_journaling():
+            self.document_cache.discard(doc)
 
         if doc.diagram is not None:
-            self.__delete_info(self.diagrams_dir(novel), doc.diagram.id)
+            self._delete(novel.id, self.__key(novel.id, 'diagrams', self.__json_file(doc.diagram.id)))
 
         recursive(doc, lambda parent: parent.children, lambda p, child: self.__delete_doc(novel, child))
 
 
+@dataclass
+class BatchStats:
+    written: int = 0
+    skipped: int = 0
+    written_bytes: int = 0
+
+
+class _LoadingProgress:
+    def __init__(self, total: int, callback: Optional[Callable[[int, int], None]] = None):
+        self._total = total
+        self._value = 0
+        self._callback = callback
+
+    def step(self):
+        self._value += 1
+        if self._callback:
+            self._callback(self._value, self._total)
+
+
+def _content_hash(data: str) -> bytes:
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).digest()
+
+
 json_client = JsonClient()
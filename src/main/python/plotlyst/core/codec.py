@@ -0,0 +1,329 @@
+"""
+Plotlyst
+Copyright (C) 2021-2024  Zsolt Kovari
+
+This file is part of Plotlyst.
+
+Plotlyst is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Plotlyst is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Precompiled JSON codecs for the dataclasses_json domain classes.
+
+The encoder and decoder of a class are built once from its fields, type hints and dataclasses_json overrides.
+They produce the same JSON and the same objects as dataclasses_json's to_json and from_json,
+without resolving the overrides and type hints again for every object.
+"""
+import json
+import threading
+from dataclasses import fields, is_dataclass, MISSING
+from datetime import datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Type, TypeVar, Mapping, Collection, Optional, get_type_hints
+from uuid import UUID
+
+from dataclasses_json import Undefined
+from dataclasses_json.core import _ExtendedEncoder, _asdict, _decode_dataclass, _decode_generic, \
+    _user_overrides_or_exts, _is_supported_generic
+from dataclasses_json.utils import _is_new_type, _is_optional, _issubclass_safe, _is_collection, _is_mapping, \
+    _get_type_cons, _undefined_parameter_action_safe
+
+T = TypeVar('T')
+
+_json_encoder = _ExtendedEncoder()
+_NoneType = type(None)
+_PREDICATE_RAW_TYPES = (str, int, float, bool, _NoneType, Enum, UUID, datetime, Decimal)
+
+
+def to_json(obj: Any) -> str:
+    return _json_encoder.encode(_encode(obj))
+
+
+def from_json(cls: Type[T], data: str) -> T:
+    return codec(cls).decode(json.loads(data))
+
+
+def to_dict(obj: Any) -> Dict[str, Any]:
+    return _encode(obj)
+
+
+def codec(cls: Type) -> 'ClassCodec':
+    class_codec = _codecs.get(cls)
+    if class_codec is None:
+        with _lock:
+            class_codec = _codecs.get(cls)
+            if class_codec is None:
+                class_codec = ClassCodec(cls)
+                _codecs[cls] = class_codec
+    return class_codec
+
+
+class ClassCodec:
+    def __init__(self, cls: Type):
+        self.cls = cls
+        self._overrides = _user_overrides_or_exts(cls)
+        self._fallback = self._requires_fallback()
+        self.encode: Callable[[Any], Dict[str, Any]] = self._compile_encoder()
+        self._decode: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+    def decode(self, kvs: Dict[str, Any]) -> Any:
+        if self._decode is None:
+            self._decode = self._compile_decoder()
+        return self._decode(kvs)
+
+    def _requires_fallback(self) -> bool:
+        action = _undefined_parameter_action_safe(self.cls)
+        if action is not None and action != Undefined.EXCLUDE:
+            return True
+        return any(x.letter_case is not None for x in self._overrides.values())
+
+    def _compile_encoder(self) -> Callable[[Any], Dict[str, Any]]:
+        if self._fallback:
+            return lambda obj: _encode(_asdict(obj))
+
+        namespace = {'_encode': _encode, '_asdict': _asdict, '_exclusion_value': _exclusion_value}
+        lines = ['def encode(obj):', '    result = {}']
+        for i, field_ in enumerate(fields(self.cls)):
+            override = self._overrides[field_.name]
+            lines.append(f'    raw = obj.{field_.name}')
+            if override.encoder is not None:
+                namespace[f'encoder_{i}'] = override.encoder
+                lines.append(f'    value = _encode(encoder_{i}(_asdict(raw)))')
+            else:
+                lines.append('    value = _encode(raw)')
+            if override.exclude is not None:
+                namespace[f'exclude_{i}'] = override.exclude
+                lines.append(f'    if not exclude_{i}(_exclusion_value(raw, value)):')
+                lines.append(f'        result[{field_.name!r}] = value')
+            else:
+                lines.append(f'    result[{field_.name!r}] = value')
+        lines.append('    return result')
+
+        exec('\n'.join(lines), namespace)
+        return namespace['encode']
+
+    def _compile_decoder(self) -> Callable[[Dict[str, Any]], Any]:
+        cls = self.cls
+        if self._fallback:
+            return lambda kvs: _decode_dataclass(cls, kvs, False)
+
+        types = get_type_hints(cls)
+        specs = []
+        for field_ in fields(cls):
+            if not field_.init:
+                continue
+            specs.append((field_.name, self._field_decoder(field_.name, types[field_.name]), field_.default,
+                          field_.default_factory))
+        init = getattr(cls.__init__, '__wrapped__', cls.__init__)
+        new = cls.__new__
+
+        def decode(kvs):
+            if isinstance(kvs, cls):
+                return kvs
+            kwargs = {}
+            for name, decoder, default, default_factory in specs:
+                if name in kvs:
+                    value = kvs[name]
+                elif default is not MISSING:
+                    value = default
+                elif default_factory is not MISSING:
+                    value = default_factory()
+                else:
+                    raise KeyError(name)
+                kwargs[name] = None if value is None else decoder(value)
+            obj = new(cls)
+            init(obj, **kwargs)
+            return obj
+
+        return decode
+
+    def _field_decoder(self, name: str, type_) -> Callable[[Any], Any]:
+        while _is_new_type(type_):
+            type_ = type_.__supertype__
+
+        override_decoder = self._overrides[name].decoder
+        if override_decoder is not None:
+            return lambda value: value if type_ is type(value) else override_decoder(value)
+        if is_dataclass(type_):
+            return _dataclass_field_decoder(type_)
+        if _is_supported_generic(type_) and type_ != str:
+            return _generic_decoder(type_)
+        return _extended_decoder(type_)
+
+
+def _exclusion_value(raw: Any, value: Any) -> Any:
+    if isinstance(raw, _PREDICATE_RAW_TYPES):
+        return raw
+    return value
+
+
+def _encode(value: Any) -> Any:
+    encoder = _value_encoders.get(type(value))
+    if encoder is None:
+        encoder = _value_encoder(type(value))
+        _value_encoders[type(value)] = encoder
+    return encoder(value)
+
+
+def _value_encoder(type_: Type) -> Callable[[Any], Any]:
+    if is_dataclass(type_):
+        return codec(type_).encode
+    if issubclass(type_, Enum):
+        return _encode_enum
+    if issubclass(type_, (str, int, float, bool, _NoneType)):
+        return _identity
+    if issubclass(type_, UUID):
+        return str
+    if issubclass(type_, datetime):
+        return _encode_datetime
+    if issubclass(type_, Decimal):
+        return str
+    if issubclass(type_, Mapping):
+        return _encode_mapping
+    if issubclass(type_, (Collection, bytes)):
+        return _encode_collection
+    return _identity
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _encode_enum(value: Enum) -> Any:
+    return _encode(value.value)
+
+
+def _encode_datetime(value: datetime) -> float:
+    return value.timestamp()
+
+
+def _encode_mapping(value: Mapping) -> Dict[Any, Any]:
+    return {_encode(k): _encode(v) for k, v in value.items()}
+
+
+def _encode_collection(value: Collection) -> list:
+    return [_encode(x) for x in value]
+
+
+def _dataclass_field_decoder(type_: Type) -> Callable[[Any], Any]:
+    class_codec = codec(type_)
+
+    def decode(value):
+        if is_dataclass(value):
+            return value
+        return class_codec.decode(value)
+
+    return decode
+
+
+def _dataclass_item_decoder(type_: Type) -> Callable[[Any], Any]:
+    return codec(type_).decode
+
+
+def _items_decoder(type_) -> Optional[Callable[[Any], Any]]:
+    if is_dataclass(type_):
+        return _dataclass_item_decoder(type_)
+    if _is_supported_generic(type_):
+        return _generic_decoder(type_)
+    return None
+
+
+def _generic_decoder(type_) -> Callable[[Any], Any]:
+    try:
+        decoder = _compile_generic_decoder(type_)
+    except (AttributeError, TypeError, IndexError):
+        decoder = None
+    if decoder is None:
+        return lambda value: _decode_generic(type_, value, False)
+
+    def decode(value):
+        if value is None:
+            return None
+        return decoder(value)
+
+    return decode
+
+
+def _compile_generic_decoder(type_) -> Optional[Callable[[Any], Any]]:
+    if _issubclass_safe(type_, Enum):
+        return type_
+
+    if _is_collection(type_):
+        cons = _get_type_cons(type_)
+        if _is_mapping(type_):
+            key_type, value_type = getattr(type_, '__args__', (Any, Any))
+            key_items = _items_decoder(key_type)
+            key_cons = _identity if key_type is None or key_type == Any else key_type
+            value_items = _items_decoder(value_type)
+
+            def decode_mapping(value):
+                keys = value.keys() if key_items is None else map(key_items, value.keys())
+                values = value.values() if value_items is None else map(value_items, value.values())
+                return cons(zip(map(key_cons, keys), values))
+
+            return _safe_cons(decode_mapping, type_)
+
+        items = _items_decoder(type_.__args__[0])
+        if items is None:
+            return _safe_cons(lambda value: cons(value), type_)
+        return _safe_cons(lambda value: cons(map(items, value)), type_)
+
+    if not hasattr(type_, '__args__'):
+        return _identity
+    if _is_optional(type_) and len(type_.__args__) == 2:
+        type_arg = type_.__args__[0]
+        if is_dataclass(type_arg):
+            return codec(type_arg).decode
+        if _is_supported_generic(type_arg):
+            return _generic_decoder(type_arg)
+        return _extended_decoder(type_arg)
+
+    return _identity
+
+
+def _safe_cons(decoder: Callable[[Any], Any], type_) -> Callable[[Any], Any]:
+    def decode(value):
+        try:
+            return decoder(value)
+        except (TypeError, AttributeError):
+            return _decode_generic(type_, value, False)
+
+    return decode
+
+
+def _extended_decoder(type_) -> Callable[[Any], Any]:
+    if _issubclass_safe(type_, datetime):
+        return _decode_datetime
+    if _issubclass_safe(type_, Decimal):
+        return lambda value: value if isinstance(value, Decimal) else Decimal(value)
+    if _issubclass_safe(type_, UUID):
+        return _decode_uuid
+    return _identity
+
+
+def _decode_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    tz = datetime.now(timezone.utc).astimezone().tzinfo
+    return datetime.fromtimestamp(value, tz=tz)
+
+
+def _decode_uuid(value: Any) -> UUID:
+    if isinstance(value, UUID):
+        return value
+    return UUID(value)
+
+
+_codecs: Dict[Type, ClassCodec] = {}
+_value_encoders: Dict[Type, Callable[[Any], Any]] = {}
+_lock = threading.RLock()
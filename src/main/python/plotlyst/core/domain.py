@@ -19,6 +19,8 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 # flake8: noqa
 import copy
+import sys
+import threading
 import uuid
 from abc import ABC
 from dataclasses import dataclass, field
@@ -52,7 +54,7 @@ class TemplateValue:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class LayoutType(Enum):
@@ -96,7 +98,7 @@ class ImageRef:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class TopicType(Enum):
@@ -186,7 +188,7 @@ class Topic:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class AgePeriod(Enum):
@@ -240,9 +242,7 @@ class CharacterGoal:
     children: List['CharacterGoal'] = field(default_factory=list)
 
     def goal(self, novel: 'Novel') -> Optional['Goal']:
-        for goal_ in novel.goals:
-            if goal_.id == self.goal_id:
-                return goal_
+        return novel.index.goal(self.goal_id)
 
     @overrides
     def __eq__(self, other: 'CharacterGoal'):
@@ -252,7 +252,7 @@ class CharacterGoal:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -270,7 +270,7 @@ class CharacterPlan:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 MALE = 'male'
@@ -280,7 +280,7 @@ NON_BINARY = 'non-binary'
 GENDERLESS = 'genderless'
 
 
-@dataclass
+@dataclass(slots=True)
 class AvatarPreferences:
     use_image: bool = True
     use_initial: bool = False
@@ -388,7 +388,7 @@ def default_big_five_values() -> Dict[str, List[int]]:
     }
 
 
-@dataclass
+@dataclass(slots=True)
 class CharacterPreferences:
     avatar: AvatarPreferences = field(default_factory=AvatarPreferences)
     settings: Dict[str, Any] = field(default_factory=dict)
@@ -448,14 +448,14 @@ class CharacterProfileFieldType(Enum):
     Field_Lacks = 'lacks'
 
 
-@dataclass
+@dataclass(slots=True)
 class CharacterProfileFieldReference:
     type: CharacterProfileFieldType
     ref: Optional[uuid.UUID] = field(default=None, metadata=config(exclude=exclude_if_empty))
     value: Optional[Any] = field(default=None, metadata=config(exclude=exclude_if_empty))
 
 
-@dataclass
+@dataclass(slots=True)
 class CharacterProfileSectionReference:
     type: Optional[CharacterProfileSectionType] = field(default=None, metadata=config(exclude=exclude_if_empty))
     ref: Optional[uuid.UUID] = field(default=None, metadata=config(exclude=exclude_if_empty))
@@ -569,7 +569,7 @@ class CharacterPersonalityAttribute:
     value: str = ''
 
 
-@dataclass
+@dataclass(slots=True)
 class CharacterPersonality:
     enneagram: Optional[CharacterPersonalityAttribute] = None
     mbti: Optional[CharacterPersonalityAttribute] = None
@@ -595,7 +595,7 @@ class TopicElement:
     blocks: List[TopicElementBlock] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Character:
     name: str
     id: uuid.UUID = field(default_factory=uuid.uuid4)
@@ -627,6 +627,10 @@ class Character:
     personality: CharacterPersonality = field(default_factory=CharacterPersonality)
     alias: str = field(default='', metadata=config(exclude=exclude_if_empty))
     origin_id: Optional[uuid.UUID] = field(default=None, metadata=config(exclude=exclude_if_empty))
+    avatar_id: Optional[uuid.UUID] = field(default=None, metadata=config(exclude=exclude_if_empty))
+
+    def has_avatar(self) -> bool:
+        return bool(self.avatar) or self.avatar_id is not None
 
     def enneagram(self) -> Optional[SelectionItem]:
         if self.prefs.toggled(NovelSetting.Character_enneagram):
@@ -674,7 +678,7 @@ class Character:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class PlaceholderCharacter(Character):
@@ -689,7 +693,7 @@ class ChapterType(Enum):
     Interlude = 2
 
 
-@dataclass
+@dataclass(slots=True)
 class Chapter:
     title: str
     id: uuid.UUID = field(default_factory=uuid.uuid4)
@@ -712,7 +716,7 @@ class Chapter:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -802,7 +806,7 @@ class StoryBeat(OutlineItem):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -817,7 +821,7 @@ class SceneStage(SelectionItem):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -832,7 +836,7 @@ class DramaticQuestion(SelectionItem):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class PlotType(Enum):
@@ -856,7 +860,7 @@ class PlotValue(SelectionItem):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class PlotPrincipleType(Enum):
@@ -1248,10 +1252,7 @@ class CharacterBased(ABC):
         if not self.character_id:
             return None
         if not self._character:
-            for c in novel.characters:
-                if c.id == self.character_id:
-                    self._character = c
-                    break
+            self._character = novel.index.character(self.character_id)
 
         return self._character
 
@@ -1268,9 +1269,7 @@ class SceneBased(ABC):
         if not self.scene_id:
             return None
         if not self._scene:
-            for s in novel.scenes:
-                if s.id == self.scene_id:
-                    return s
+            return novel.index.scene(self.scene_id)
 
 
 def default_plot_value() -> PlotValue:
@@ -1391,10 +1390,7 @@ class Plot(SelectionItem, CharacterBased):
         if not self.relation_character_id:
             return None
         if not self._relation_character:
-            for c in novel.characters:
-                if c.id == self.relation_character_id:
-                    self._relation_character = c
-                    break
+            self._relation_character = novel.index.character(self.relation_character_id)
 
         return self._relation_character
 
@@ -1417,7 +1413,7 @@ class Plot(SelectionItem, CharacterBased):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class ConflictType(Enum):
@@ -1444,10 +1440,7 @@ class Conflict(SelectionItem, CharacterBased):
         if not self.conflicting_character_id:
             return None
         if not self._conflicting_character:
-            for c in novel.characters:
-                if c.id == self.conflicting_character_id:
-                    self._conflicting_character = c
-                    break
+            self._conflicting_character = novel.index.character(self.conflicting_character_id)
 
         return self._conflicting_character
 
@@ -1459,7 +1452,7 @@ class Conflict(SelectionItem, CharacterBased):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -1475,7 +1468,7 @@ class Goal(SelectionItem):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -1489,14 +1482,14 @@ class ScenePlotValueCharge:
                 return v
 
 
-@dataclass
+@dataclass(slots=True)
 class ScenePlotReferenceData:
     comment: str = field(default='', metadata=config(exclude=exclude_if_empty))
     charge: int = 0
     values: List[ScenePlotValueCharge] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ScenePlotReference:
     plot: Plot
     data: ScenePlotReferenceData = field(default_factory=ScenePlotReferenceData)
@@ -1568,9 +1561,7 @@ class ConflictReference:
     intensity: int = 1
 
     def conflict(self, novel: 'Novel') -> Optional[Conflict]:
-        for conflict in novel.conflicts:
-            if conflict.id == self.conflict_id:
-                return conflict
+        return novel.index.conflict(self.conflict_id)
 
 
 class Motivation(Enum):
@@ -1663,10 +1654,10 @@ class SceneStructureAgenda(CharacterBased):
 
     def conflicts(self, novel: 'Novel') -> List[Conflict]:
         conflicts_ = []
-        for id_ in [x.conflict_id for x in self.conflict_references]:
-            for conflict in novel.conflicts:
-                if conflict.id == id_:
-                    conflicts_.append(conflict)
+        for ref in self.conflict_references:
+            conflict = novel.index.conflict(ref.conflict_id)
+            if conflict is not None:
+                conflicts_.append(conflict)
 
         return conflicts_
 
@@ -1707,7 +1698,7 @@ class InformationAcquisition(Enum):
     REVELATION = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class SceneDrive:
     worldbuilding: int = field(default=0, metadata=config(exclude=exclude_if_empty))
     tension: int = field(default=0, metadata=config(exclude=exclude_if_empty))
@@ -1949,7 +1940,7 @@ class SceneReaderInformation:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -1960,13 +1951,13 @@ class SceneFunction:
     ref: Optional[uuid.UUID] = field(default=None, metadata=config(exclude=exclude_if_empty))
 
 
-@dataclass
+@dataclass(slots=True)
 class SceneFunctions:
     primary: List[SceneFunction] = field(default_factory=list)
     secondary: List[SceneFunction] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Scene:
     title: str
     id: uuid.UUID = field(default_factory=uuid.uuid4)
@@ -2034,11 +2025,10 @@ class Scene:
 
     def tags(self, novel: 'Novel') -> List['Tag']:
         tags_ = []
-        for id_ in [x.tag_id for x in self.tag_references]:
-            for tags_per_type in novel.tags.values():
-                for tag in tags_per_type:
-                    if tag.id == id_:
-                        tags_.append(tag)
+        for ref in self.tag_references:
+            tag = novel.index.tag(ref.tag_id)
+            if tag is not None:
+                tags_.append(tag)
 
         return tags_
 
@@ -2052,7 +2042,7 @@ class Scene:
         return self.__is_outcome(SceneOutcome.MOTION)
 
     def title_or_index(self, novel: 'Novel') -> str:
-        return self.title if self.title else f'Scene {novel.scenes.index(self) + 1}'
+        return self.title if self.title else f'Scene {novel.index.scene_position(self) + 1}'
 
     def calculate_plot_progress(self):
         self.plot_pos_progress = 0
@@ -2078,7 +2068,7 @@ class Scene:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 def default_stages() -> List[SceneStage]:
@@ -2135,7 +2125,7 @@ class Variable:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class WorldBuildingEntityType(Enum):
@@ -2183,7 +2173,7 @@ class WorldBuildingEntityElement:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -2211,7 +2201,7 @@ class WorldBuildingEntity:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class WorldConceitType(Enum):
@@ -2255,7 +2245,7 @@ class WorldConceit:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 def worldbuilding_root() -> WorldBuildingEntity:
@@ -2397,7 +2387,7 @@ class Location:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 def default_maps() -> List[WorldBuildingMap]:
@@ -2427,7 +2417,7 @@ class TaskStatus(SelectionItem):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 tag_characterization = SelectionItem('Characterization', icon='fa5s.user', icon_color='darkBlue')
@@ -2494,7 +2484,7 @@ class Task(CharacterBased):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 def default_task_statues() -> List[TaskStatus]:
@@ -3340,7 +3330,7 @@ class NovelDescriptor:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
     def is_scrivener_sync(self) -> bool:
         if self.import_origin is None:
@@ -3393,16 +3383,12 @@ class MiceThread:
     def beginning_scene(self, novel: 'Novel') -> Optional['Scene']:
         if not self.beginning_scene_id:
             return None
-        for s in novel.scenes:
-            if s.id == self.beginning_scene_id:
-                return s
+        return novel.index.scene(self.beginning_scene_id)
 
     def ending_scene(self, novel: 'Novel') -> Optional['Scene']:
         if not self.ending_scene_id:
             return None
-        for s in novel.scenes:
-            if s.id == self.ending_scene_id:
-                return s
+        return novel.index.scene(self.ending_scene_id)
 
 
 @dataclass_json(undefined=Undefined.EXCLUDE)
@@ -3495,6 +3481,9 @@ class DocumentStatistics:
     progress: Dict[str, DocumentProgress] = field(default_factory=dict, metadata=config(exclude=exclude_if_empty))
 
 
+_CONTENT_LOCK = threading.Lock()
+
+
 @dataclass
 class Document(CharacterBased, SceneBased):
     title: str
@@ -3523,15 +3512,66 @@ class Document(CharacterBased, SceneBased):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
     def __post_init__(self):
         self.loaded: bool = False
-        self.content: str = ''
         self.data: Any = None
+        self._content: Optional[str] = ''
+        self._content_version: int = 0
+        self._content_cache = None
         self._character: Optional[Character] = None
         self._scene: Optional[Scene] = None
 
+    @property
+    def content(self) -> str:
+        content = self._content
+        if content is None:
+            return self._content_cache.reload(self) if self._content_cache is not None else ''
+        if self._content_cache is not None:
+            self._content_cache.accessed(self)
+        return content
+
+    @content.setter
+    def content(self, content: str):
+        with _CONTENT_LOCK:
+            self._content = content
+            self._content_version += 1
+        if self._content_cache is not None:
+            self._content_cache.changed(self)
+
+    @property
+    def content_version(self) -> int:
+        return self._content_version
+
+    def content_size(self) -> int:
+        return sys.getsizeof(self._content) if self._content is not None else 0
+
+    def attach_content_cache(self, cache):
+        self._content_cache = cache
+
+    def unload_content(self, expected_version: Optional[int] = None) -> bool:
+        """Unloads the content unless it was changed since the expected version. Returns whether it was unloaded."""
+        with _CONTENT_LOCK:
+            if expected_version is not None and expected_version != self._content_version:
+                return False
+            self._content = None
+            return True
+
+    def restore_content(self, content: str) -> bool:
+        """Restores the unloaded content unless it was assigned in the meantime. Returns whether it was restored."""
+        with _CONTENT_LOCK:
+            if self._content is not None:
+                return False
+            self._content = content
+            return True
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_content'] = self.content
+        state['_content_cache'] = None
+        return state
+
 
 def default_documents() -> List[Document]:
     return [Document('Story', id=uuid.UUID('ec2a62d9-fc00-41dd-8a6c-b121156b6cf4'), icon='fa5s.book-open'),
@@ -3553,7 +3593,7 @@ class ProductivityType(SelectionItem):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 class SnapshotType(Enum):
@@ -3651,7 +3691,7 @@ class ReaderQuestion:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 @dataclass
@@ -3683,7 +3723,7 @@ class Tag(SelectionItem):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 def default_general_tags() -> List[Tag]:
@@ -3765,7 +3805,7 @@ class Node(CharacterBased):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 def to_node(x: float, y: float, type: GraphicsItemType, subtype: str = '', default_size: int = 12) -> Node:
@@ -3842,7 +3882,7 @@ class Diagram:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 def default_character_networks() -> List[Diagram]:
@@ -3971,6 +4011,217 @@ def default_locations() -> List[Location]:
     return [Location('New location')]
 
 
+class TrackedList(list):
+    """A list that counts its modifications, so that indexes built over it can detect when they become stale."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+
+    def append(self, item):
+        super().append(item)
+        self.version += 1
+
+    def extend(self, items):
+        super().extend(items)
+        self.version += 1
+
+    def insert(self, i, item):
+        super().insert(i, item)
+        self.version += 1
+
+    def remove(self, item):
+        super().remove(item)
+        self.version += 1
+
+    def pop(self, *args):
+        item = super().pop(*args)
+        self.version += 1
+        return item
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.version += 1
+
+    def reverse(self):
+        super().reverse()
+        self.version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def __iadd__(self, other):
+        super().__iadd__(other)
+        self.version += 1
+        return self
+
+    def __imul__(self, other):
+        super().__imul__(other)
+        self.version += 1
+        return self
+
+
+class TrackedDict(dict):
+    """A dict of lists that counts its own modifications and the modifications of its lists."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._version = 0
+        for k, v in self.items():
+            if isinstance(v, list) and not isinstance(v, TrackedList):
+                super().__setitem__(k, TrackedList(v))
+
+    @property
+    def version(self) -> int:
+        return self._version + sum(getattr(x, 'version', 0) for x in self.values())
+
+    def __setitem__(self, key, value):
+        if isinstance(value, list) and not isinstance(value, TrackedList):
+            value = TrackedList(value)
+        super().__setitem__(key, value)
+        self._version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._version += 1
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._version += 1
+        return value
+
+    def clear(self):
+        super().clear()
+        self._version += 1
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+
+class NovelIndex:
+    """Id-based lookups of the entities of a novel.
+
+    Each collection is indexed on first lookup and reindexed only after it was modified."""
+
+    def __init__(self, novel: 'Novel'):
+        self._novel = novel
+        self._entities: Dict[str, Dict[uuid.UUID, Any]] = {}
+        self._versions: Dict[str, Any] = {}
+        self._collections: Dict[str, Any] = {}
+        self._chapter_assignments = 0
+
+    def character(self, id_: Optional[uuid.UUID]) -> Optional[Character]:
+        return self._lookup('characters', id_)
+
+    def scene(self, id_: Optional[uuid.UUID]) -> Optional['Scene']:
+        return self._lookup('scenes', id_)
+
+    def chapter(self, id_: Optional[uuid.UUID]) -> Optional[Chapter]:
+        return self._lookup('chapters', id_)
+
+    def plot(self, id_: Optional[uuid.UUID]) -> Optional[Plot]:
+        return self._lookup('plots', id_)
+
+    def conflict(self, id_: Optional[uuid.UUID]) -> Optional[Conflict]:
+        return self._lookup('conflicts', id_)
+
+    def goal(self, id_: Optional[uuid.UUID]) -> Optional[Goal]:
+        return self._lookup('goals', id_)
+
+    def stage(self, id_: Optional[uuid.UUID]) -> Optional[SceneStage]:
+        return self._lookup('stages', id_)
+
+    def structure(self, id_: Optional[uuid.UUID]) -> Optional[StoryStructure]:
+        return self._lookup('story_structures', id_)
+
+    def tag(self, id_: Optional[uuid.UUID]) -> Optional[Tag]:
+        return self._lookup('tags', id_)
+
+    def scene_position(self, scene: 'Scene') -> int:
+        """Returns the position of the scene in the novel like list.index, and raises ValueError if it is missing."""
+        scenes = self._novel.scenes
+        version = self._version(scenes)
+        if self._stale('positions', scenes, version):
+            positions = {}
+            for i, s in enumerate(scenes):
+                positions.setdefault(s.id, i)
+            self._store('positions', scenes, version, positions)
+        position = self._entities['positions'].get(scene.id)
+        if position is None:
+            raise ValueError(f'{scene} is not in the novel')
+        return position
+
+    def scenes_in_chapter(self, chapter: Chapter) -> List['Scene']:
+        """Returns the scenes assigned to the very chapter object, in the order of the novel."""
+        scenes = self._novel.scenes
+        version = (self._version(scenes), self._chapter_assignments)
+        if self._stale('chapter_scenes', scenes, version):
+            chapter_scenes = {}
+            for s in scenes:
+                if s.chapter is not None:
+                    chapter_scenes.setdefault(id(s.chapter), []).append(s)
+            self._store('chapter_scenes', scenes, version, chapter_scenes)
+        return list(self._entities['chapter_scenes'].get(id(chapter), []))
+
+    def chapters_reassigned(self):
+        """Invalidates the scenes per chapter after the chapter of a scene was changed in place."""
+        self._chapter_assignments += 1
+
+    def _lookup(self, name: str, id_: Optional[uuid.UUID]) -> Optional[Any]:
+        if id_ is None:
+            return None
+        if isinstance(id_, str):
+            id_ = uuid.UUID(id_)
+        collection = getattr(self._novel, name)
+        version = self._version(collection)
+        if self._stale(name, collection, version):
+            self._store(name, collection, version, self._index(collection))
+        return self._entities[name].get(id_)
+
+    def _stale(self, name: str, collection, version: Any) -> bool:
+        # the indexed collection is kept and compared by identity, because a replacement could reuse its id
+        return self._collections.get(name) is not collection or self._versions[name] != version
+
+    def _store(self, name: str, collection, version: Any, entities: Dict[Any, Any]):
+        self._entities[name] = entities
+        self._versions[name] = version
+        self._collections[name] = collection
+
+    @staticmethod
+    def _version(collection) -> Any:
+        return getattr(collection, 'version', None), len(collection)
+
+    @staticmethod
+    def _index(collection) -> Dict[uuid.UUID, Any]:
+        if isinstance(collection, dict):
+            items = [x for values in collection.values() for x in values]
+        else:
+            items = collection
+        entities = {}
+        for item in items:
+            entities.setdefault(item.id, item)
+        return entities
+
+
+_INDEXED_COLLECTIONS = {'story_structures', 'characters', 'scenes', 'plots', 'chapters', 'stages', 'conflicts',
+                        'goals'}
+
+
 @dataclass
 class Novel(NovelDescriptor):
     story_structures: List[StoryStructure] = field(default_factory=list)
@@ -3999,6 +4250,21 @@ class Novel(NovelDescriptor):
     questions: Dict[str, ReaderQuestion] = field(default_factory=dict)
     productivity: DailyProductivity = field(default_factory=DailyProductivity)
 
+    def __setattr__(self, key, value):
+        if key in _INDEXED_COLLECTIONS and isinstance(value, list) and not isinstance(value, TrackedList):
+            value = TrackedList(value)
+        elif key == 'tags' and isinstance(value, dict) and not isinstance(value, TrackedDict):
+            value = TrackedDict(value)
+        super().__setattr__(key, value)
+
+    @property
+    def index(self) -> NovelIndex:
+        index = self.__dict__.get('_index')
+        if index is None:
+            index = NovelIndex(self)
+            self.__dict__['_index'] = index
+        return index
+
     def pov_characters(self) -> List[Character]:
         pov_ids = set()
         povs: List[Character] = []
@@ -4041,12 +4307,14 @@ class Novel(NovelDescriptor):
     @property
     def active_stage(self) -> Optional[SceneStage]:
         if self.prefs.active_stage_id:
-            for stage in self.stages:
-                if stage.id == self.prefs.active_stage_id:
-                    return stage
+            return self.index.stage(self.prefs.active_stage_id)
 
     def scenes_in_chapter(self, chapter: Chapter) -> List[Scene]:
-        return [x for x in self.scenes if x.chapter is chapter]
+        return self.index.scenes_in_chapter(chapter)
+
+    def assign_chapter(self, scene: Scene, chapter: Optional[Chapter]):
+        scene.chapter = chapter
+        self.index.chapters_reassigned()
 
     @staticmethod
     def new_scene(title: str = '') -> Scene:
@@ -4081,7 +4349,7 @@ class Novel(NovelDescriptor):
         return Novel(title, icon='ph.books', story_type=StoryType.Series)
 
     def insert_scene_after(self, scene: Scene, chapter: Optional[Chapter] = None) -> Scene:
-        i = self.scenes.index(scene)
+        i = self.index.scene_position(scene)
         day = scene.day
 
         new_scene = self.new_scene()
@@ -4109,4 +4377,4 @@ class Novel(NovelDescriptor):
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
@@ -0,0 +1,138 @@
+"""
+Plotlyst
+Copyright (C) 2021-2024  Zsolt Kovari
+
+This file is part of Plotlyst.
+
+Plotlyst is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Plotlyst is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, List, Dict, Iterator, TextIO
+
+
+@dataclass
+class JournalEntry:
+    novel_id: uuid.UUID
+    key: str
+    data: Optional[str] = None
+
+    def is_deletion(self) -> bool:
+        return self.data is None
+
+
+class OperationJournal:
+    """Append-only log of the entity writes and deletions that are not persisted yet.
+
+    Entries are appended to the current segment file and synced to disk together by sync().
+    Once the changes of a segment are persisted, the segment is rotated and discarded."""
+
+    SUFFIX = '.journal'
+
+    def __init__(self, dir_: Path):
+        self._dir = dir_
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._last_hashes: Dict[str, bytes] = {}
+        self._sequence = max([self._sequence_of(x) for x in self.segments()], default=0) + 1
+
+    def record_write(self, novel_id: uuid.UUID, key: str, data: str):
+        content_hash = hashlib.blake2b(data.encode('utf-8'), digest_size=16).digest()
+        with self._lock:
+            if self._last_hashes.get(key) == content_hash:
+                return
+            self._append({'novel': str(novel_id), 'key': key, 'data': data})
+            self._last_hashes[key] = content_hash
+
+    def record_delete(self, novel_id: uuid.UUID, key: str):
+        with self._lock:
+            self._append({'novel': str(novel_id), 'key': key})
+            self._last_hashes.pop(key, None)
+
+    def sync(self):
+        """Forces the entries appended so far to disk."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def rotate(self) -> int:
+        """Closes the current segment. Later entries go to a new segment.
+        Returns the sequence number of the closed segment."""
+        with self._lock:
+            self._close_file()
+            self._last_hashes.clear()
+            sequence = self._sequence
+            self._sequence += 1
+            return sequence
+
+    def discard(self, sequence: int):
+        """Removes the closed segments up to and including the given sequence number."""
+        with self._lock:
+            for path in self.segments():
+                if self._sequence_of(path) <= sequence and self._sequence_of(path) != self._sequence:
+                    os.remove(path)
+
+    def clear(self):
+        with self._lock:
+            self._close_file()
+            self._last_hashes.clear()
+            for path in self.segments():
+                os.remove(path)
+            self._sequence = 1
+
+    def close(self):
+        with self._lock:
+            self._close_file()
+
+    def segments(self) -> List[Path]:
+        if not self._dir.is_dir():
+            return []
+        return sorted(self._dir.glob(f'*{self.SUFFIX}'), key=self._sequence_of)
+
+    def entries(self) -> Iterator[JournalEntry]:
+        """Yields the entries of every segment in the order they were recorded.
+        An incomplete entry, e.g. after a crash during appending, is skipped."""
+        for path in self.segments():
+            with open(path, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                        yield JournalEntry(uuid.UUID(record['novel']), record['key'], record.get('data'))
+                    except (ValueError, KeyError):
+                        logging.warning('Skipping corrupted journal entry in %s', path)
+
+    def _append(self, record: Dict[str, str]):
+        if self._file is None:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            path = self._dir.joinpath(f'{self._sequence:08d}{self.SUFFIX}')
+            self._file = open(path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record) + '\n')
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _sequence_of(self, path: Path) -> int:
+        try:
+            return int(path.stem)
+        except ValueError:
+            return 0
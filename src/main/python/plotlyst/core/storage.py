@@ -0,0 +1,220 @@
+"""
+Plotlyst
+Copyright (C) 2021-2024  Zsolt Kovari
+
+This file is part of Plotlyst.
+
+Plotlyst is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Plotlyst is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import sqlite3
+import threading
+from abc import abstractmethod
+from pathlib import Path
+from typing import Optional, List, Set
+
+from atomicwrites import atomic_write
+
+CONTAINER_BUSY_TIMEOUT = 30  # seconds a write waits for the batch of another thread to commit
+
+
+class NovelStorage:
+    """Stores the serialized entities of novels. Entities are addressed by keys that are relative POSIX paths
+    in the novels directory, e.g. '<novel_id>/scenes/<scene_id>.json'."""
+
+    @abstractmethod
+    def read(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def write(self, key: str, data: str):
+        pass
+
+    @abstractmethod
+    def read_bytes(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def write_bytes(self, key: str, data: bytes):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def keys(self, prefix: str = '') -> List[str]:
+        pass
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class DirectoryStorage(NovelStorage):
+    """One file per entity under the novels directory. Every file is written atomically."""
+
+    def __init__(self, root: Path):
+        self._root = root
+
+    def read(self, key: str) -> Optional[str]:
+        path = self._root.joinpath(key)
+        if not path.exists():
+            return None
+        with open(path, encoding='utf-8', newline='') as file:
+            return file.read()
+
+    def write(self, key: str, data: str):
+        path = self._root.joinpath(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path, encoding='utf-8', overwrite=True) as f:
+            f.write(data)
+
+    def read_bytes(self, key: str) -> Optional[bytes]:
+        path = self._root.joinpath(key)
+        if not path.exists():
+            return None
+        return path.read_bytes()
+
+    def write_bytes(self, key: str, data: bytes):
+        path = self._root.joinpath(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path, mode='wb', overwrite=True) as f:
+            f.write(data)
+
+    def delete(self, key: str):
+        path = self._root.joinpath(key)
+        if path.exists():
+            os.remove(path)
+
+    def keys(self, prefix: str = '') -> List[str]:
+        dir_ = self._root.joinpath(prefix)
+        if not dir_.is_dir():
+            return []
+        return sorted(x.relative_to(self._root).as_posix() for x in dir_.rglob('*') if x.is_file())
+
+
+class ContainerStorage(NovelStorage):
+    """A single SQLite file with one row per entity. Rows are read only when requested.
+
+    Writes are committed immediately unless they happen between begin() and commit(),
+    in which case the whole batch is committed in one transaction.
+    Batches are tracked per thread: a thread in a batch writes through its own connection,
+    so the writes of other threads neither join nor count against its transaction."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._batches: Set[sqlite3.Connection] = set()
+        self._batches_lock = threading.Lock()
+        self._connection = self._connect()
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, kind TEXT NOT NULL, data BLOB NOT NULL)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS entries_kind ON entries (kind)')
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def read(self, key: str) -> Optional[str]:
+        data = self.read_bytes(key)
+        if data is None:
+            return None
+        return data.decode('utf-8')
+
+    def write(self, key: str, data: str):
+        self.write_bytes(key, data.encode('utf-8'))
+
+    def read_bytes(self, key: str) -> Optional[bytes]:
+        rows = self._execute('SELECT data FROM entries WHERE key = ?', (key,))
+        if not rows:
+            return None
+        return bytes(rows[0][0])
+
+    def write_bytes(self, key: str, data: bytes):
+        self._execute('INSERT OR REPLACE INTO entries (key, kind, data) VALUES (?, ?, ?)',
+                      (key, _kind(key), sqlite3.Binary(data)))
+
+    def delete(self, key: str):
+        self._execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def keys(self, prefix: str = '') -> List[str]:
+        if prefix:
+            rows = self._execute('SELECT key FROM entries WHERE key LIKE ? ESCAPE ? ORDER BY key',
+                                 (_like_prefix(prefix), '\\'))
+        else:
+            rows = self._execute('SELECT key FROM entries ORDER BY key')
+        return [x[0] for x in rows]
+
+    def begin(self):
+        if getattr(self._local, 'depth', 0) == 0:
+            connection = self._connect()
+            connection.execute('BEGIN IMMEDIATE')
+            with self._batches_lock:
+                self._batches.add(connection)
+            self._local.batch = connection
+            self._local.depth = 0
+        self._local.depth += 1
+
+    def commit(self):
+        if getattr(self._local, 'depth', 0) == 0:
+            return
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            connection = self._local.batch
+            self._local.batch = None
+            with self._batches_lock:
+                if connection not in self._batches:
+                    return
+                self._batches.discard(connection)
+            connection.execute('COMMIT')
+            connection.close()
+
+    def close(self):
+        with self._batches_lock:
+            for connection in self._batches:
+                if connection.in_transaction:
+                    connection.execute('COMMIT')
+                connection.close()
+            self._batches.clear()
+        with self._lock:
+            self._connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self._path), timeout=CONTAINER_BUSY_TIMEOUT, check_same_thread=False,
+                                     isolation_level=None)
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _execute(self, sql: str, parameters=()) -> List[tuple]:
+        batch = getattr(self._local, 'batch', None)
+        if batch is not None:
+            return batch.execute(sql, parameters).fetchall()
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+
+def _kind(key: str) -> str:
+    return key.rsplit('/', 1)[0] if '/' in key else ''
+
+
+def _like_prefix(prefix: str) -> str:
+    prefix = prefix.rstrip('/') + '/'
+    return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
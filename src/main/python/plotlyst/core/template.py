@@ -129,7 +129,7 @@ class TemplateField:
 
     @overrides
     def __hash__(self):
-        return hash(str(self.id))
+        return hash(self.id.int)
 
 
 age_field = TemplateField(name='Age', type=TemplateFieldType.NUMERIC,
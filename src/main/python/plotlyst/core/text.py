@@ -18,6 +18,8 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import re
+from functools import lru_cache
+from typing import Iterable, List
 
 import nltk
 from qttextedit import OBJECT_REPLACEMENT_CHARACTER
@@ -61,31 +63,49 @@ def parse_structure_to_richtext(structure: StoryStructure):
 
 
 def wc(text: str) -> int:
-    text = re.sub(r'—', ' ', text)  # Override em dash to spaces
-    text = re.sub(OBJECT_REPLACEMENT_CHARACTER, '', text)
+    text = text.replace('—', ' ')  # Override em dash to spaces
+    text = text.replace(OBJECT_REPLACEMENT_CHARACTER, '')
     return textstat.lexicon_count(text)
 
 
-def clean_text(text: str):
-    text = re.sub(r'[,:;()\-–—]', ' ', text)  # Override commas, colons, etc to spaces/
-    text = re.sub(r'["\'“”«»‹›„‟’❝❞❮❯⹂〝〞〟＂‚‘‛❛❜❟]', '', text)  # Replace quotation marks
-    text = re.sub(r'[\.!?]', '.', text)  # Change all terminators like ! and ? to "."
-    text = re.sub(r'^\s+', '', text)  # Remove whites pace
-    text = re.sub(r'[ ]*(\n|\r\n|\r)[ ]*', ' ', text)  # Remove new lines
-    text = re.sub(r'([\.])[\. ]+', '.', text)  # Change all ".." to "."
-    text = re.sub(r'[ ]*([\.])', '. ', text)  # Normalize all "."`
-    text = re.sub(r'\s+', ' ', text)  # Remove multiple spaces
-    text = re.sub(r'\s+$', '', text)  # Remove trailing spaces
-    text = re.sub(r'\.(?! )', '. ', text)  # Add space after period where missing
-    text = re.sub(r'\,(?! )', ', ', text)  # Add space after comma where missing
-    text = re.sub(r' +', ' ', text)  # Compress many spaces to one
+SENTENCE_CACHE_SIZE = 16384  # texts
 
+# Override commas, colons, dashes, etc. to spaces, remove quotation marks, change terminators like ! and ? to "."
+_CLEAN_TRANSLATION = str.maketrans({**dict.fromkeys(',:;()-–—', ' '),
+                                    **dict.fromkeys('"\'“”«»‹›„‟’❝❞❮❯⹂〝〞〟＂‚‘‛❛❜❟'),
+                                    '!': '.', '?': '.'})
+_NEW_LINE_PATTERN = re.compile(r'[ ]*(\n|\r\n|\r)[ ]*')
+_TERMINATOR_PATTERN = re.compile(r'[ ]*\.[\. ]*')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def clean_text(text: str) -> str:
+    text = text.translate(_CLEAN_TRANSLATION).lstrip()
+    text = _NEW_LINE_PATTERN.sub(' ', text)  # Remove new lines
+    text = _TERMINATOR_PATTERN.sub('. ', text)  # Change all ".." to "." followed by one space
+    text = _WHITESPACE_PATTERN.sub(' ', text).rstrip()  # Remove multiple and trailing spaces
+    if text.endswith('.'):  # Every other period is followed by a space already
+        text += ' '
     return text
 
 
+def clean_texts(texts: Iterable[str]) -> List[str]:
+    return [clean_text(x) for x in texts]
+
+
 def sentence_count(text: str) -> int:
-    text = clean_text(text)
-    return len(nltk.text.sent_tokenize(text))
+    return _sentence_count(text)
+
+
+def sentence_counts(texts: Iterable[str]) -> List[int]:
+    """Counts the sentences of each text, e.g. of every block of a document.
+    The counts are cached per text, so only the texts that changed since the last call are tokenized."""
+    return [_sentence_count(x) for x in texts]
+
+
+@lru_cache(maxsize=SENTENCE_CACHE_SIZE)
+def _sentence_count(text: str) -> int:
+    return len(nltk.text.sent_tokenize(clean_text(text)))
 
 
 class HtmlString(str):
@@ -17,10 +17,12 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import random
 from abc import abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Any, Dict
+from timeit import default_timer as timer
+from typing import Optional, Any, Dict, List, Type, Tuple
 
 from PyQt6.QtCore import pyqtSignal, QObject, QTimer
 
@@ -62,6 +64,23 @@ class Event:
     source: Any
 
 
+@dataclass
+class CoalescedEvent(Event):
+    """Delivered once per event loop iteration instead of the individual events of the given type,
+    to the listeners that registered for that type with coalescing. Identical events are delivered only once."""
+    event_type: Type[Event]
+    events: List[Event]
+
+    def values(self, attr: str) -> List[Any]:
+        """Returns the distinct values of the given attribute as a list in the order of the events, e.g. values('scene')."""
+        values = []
+        for event in self.events:
+            value = getattr(event, attr)
+            if value not in values:
+                values.append(value)
+        return values
+
+
 class EventSender(QObject):
     send = pyqtSignal(Event)
 
@@ -92,13 +111,105 @@ class EventListener:
         pass
 
 
+@dataclass
+class ListenerTiming:
+    event_type: str
+    listener: str
+    count: int
+    total: float
+    p50: float
+    p99: float
+
+
+class EventProfiler:
+    """Records the wall time spent per event type and listener class.
+
+    Disabled by default; the dispatcher checks only the enabled flag then.
+    Exact counts and totals are kept, percentiles are computed from a bounded random sample."""
+
+    EMIT = 'emit_event'
+    MAX_SAMPLES = 4096
+
+    def __init__(self):
+        self.enabled: bool = False
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._totals: Dict[Tuple[str, str], float] = {}
+        self._samples: Dict[Tuple[str, str], List[float]] = {}
+
+    def deliver(self, listener: EventListener, event: Event):
+        start = timer()
+        try:
+            listener.event_received(event)
+        finally:
+            self.record(_event_name(event), type(listener).__name__, timer() - start)
+
+    def record(self, event_type: str, listener: str, elapsed: float):
+        key = (event_type, listener)
+        count = self._counts.get(key, 0) + 1
+        self._counts[key] = count
+        self._totals[key] = self._totals.get(key, 0.0) + elapsed
+        samples = self._samples.setdefault(key, [])
+        if len(samples) < self.MAX_SAMPLES:
+            samples.append(elapsed)
+        else:
+            i = random.randrange(count)
+            if i < self.MAX_SAMPLES:
+                samples[i] = elapsed
+
+    def reset(self):
+        self._counts.clear()
+        self._totals.clear()
+        self._samples.clear()
+
+    def timings(self) -> List[ListenerTiming]:
+        """Returns the recorded timings, the most expensive in total first."""
+        timings = []
+        for key, count in self._counts.items():
+            samples = sorted(self._samples[key])
+            timings.append(ListenerTiming(event_type=key[0], listener=key[1], count=count, total=self._totals[key],
+                                          p50=_percentile(samples, 0.5), p99=_percentile(samples, 0.99)))
+        return sorted(timings, key=lambda x: x.total, reverse=True)
+
+    def report(self) -> str:
+        lines = [f'{"event":<36} {"listener":<36} {"count":>8} {"total ms":>10} {"p50 ms":>8} {"p99 ms":>8}']
+        for timing in self.timings():
+            lines.append(f'{timing.event_type:<36} {timing.listener:<36} {timing.count:>8} '
+                         f'{timing.total * 1000:>10.2f} {timing.p50 * 1000:>8.3f} {timing.p99 * 1000:>8.3f}')
+        return '\n'.join(lines)
+
+    def dump(self, path: str):
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.report())
+            file.write('\n')
+
+
+def _event_name(event: Event) -> str:
+    if isinstance(event, CoalescedEvent):
+        return f'{event.event_type.__name__} (coalesced)'
+    return type(event).__name__
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+event_profiler = EventProfiler()
+
+
 def emit_global_event(event: Event):
     global_event_sender.send.emit(event)
 
 
 def emit_event(novel: Novel, event: Event, delay: int = 0):
     def func():
-        event_senders.instance(novel).send.emit(event)
+        if event_profiler.enabled:
+            start = timer()
+            event_senders.instance(novel).send.emit(event)
+            event_profiler.record(type(event).__name__, EventProfiler.EMIT, timer() - start)
+        else:
+            event_senders.instance(novel).send.emit(event)
 
     if delay:
         QTimer.singleShot(10, func)
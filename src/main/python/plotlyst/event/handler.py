@@ -20,16 +20,18 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import asyncio
 import logging
 import traceback
-from typing import Optional, List, Dict, TypeVar
+import weakref
+from dataclasses import dataclass, fields
+from typing import Optional, List, Dict, TypeVar, Tuple, Any
 
-from PyQt6.QtCore import QTimer, Qt, QObject
+from PyQt6.QtCore import QTimer, Qt, QObject, QCoreApplication
 from PyQt6.QtGui import QCursor
 from PyQt6.QtWidgets import QMessageBox, QWidget, QStatusBar, QApplication
 
 from plotlyst.core.domain import Novel
 from plotlyst.env import app_env
 from plotlyst.event.core import EventLog, Severity, \
-    emit_critical, EventListener, Event
+    emit_critical, EventListener, Event, CoalescedEvent, event_profiler
 from plotlyst.view.dialog.error import ErrorMessageBox
 from plotlyst.view.style.base import apply_color
 
@@ -90,34 +92,186 @@ def handle_exception(exception_type, exception_value: Exception, exception_trace
 TEvent = TypeVar('TEvent', bound=Event)
 
 
+@dataclass
+class DispatchStats:
+    events: int = 0
+    deliveries: int = 0
+    coalesced_events: int = 0
+    saved_deliveries: int = 0
+
+
 class EventDispatcher:
+    """Delivers the events to the registered listeners.
 
-    def __init__(self):
-        self._listeners: Dict[TEvent, List[EventListener]] = {}
+    A listener registered for an event class also receives the events of its subclasses, once even if it is
+    registered for several classes of the hierarchy. The listeners of each dispatched event class are resolved
+    once into a dispatch table, which is invalidated by any (de)registration.
+    Listeners are referenced weakly, so registering does not keep a listener alive.
+    Dead listeners are pruned when an event is dispatched to them."""
 
-    def register(self, listener: EventListener, *event_types):
+    def __init__(self):
+        self._listeners: Dict[TEvent, List[weakref.ref]] = {}
+        self._coalesced: Dict[TEvent, List[weakref.ref]] = {}
+        self._table: Dict[TEvent, List[weakref.ref]] = {}
+        self._coalesced_table: Dict[TEvent, List[weakref.ref]] = {}
+        self._pending: Dict[Tuple[weakref.ref, TEvent], Dict[Any, Event]] = {}
+        self._flush_scheduled: bool = False
+        self._stats = DispatchStats()
+
+    def register(self, listener: EventListener, *event_types, coalesce: bool = False):
+        """Registers the listener for the given event types.
+
+        With coalesce, the events of each type are collected and delivered at the end of the current event loop
+        iteration as a single CoalescedEvent."""
+        ref = weakref.ref(listener)
+        listeners = self._coalesced if coalesce else self._listeners
         for event_type in event_types:
-            if event_type not in self._listeners.keys():
-                self._listeners[event_type] = []
-            self._listeners[event_type].append(listener)
+            if event_type not in listeners.keys():
+                listeners[event_type] = []
+            listeners[event_type].append(ref)
+        self._invalidate()
         if isinstance(listener, QObject):
-            listener.destroyed.connect(lambda: self.deregister(listener, *event_types))
+            listener.destroyed.connect(lambda: self._deregister_ref(ref, event_types))
 
     def clear(self):
         self._listeners.clear()
+        self._coalesced.clear()
+        self._pending.clear()
+        self._invalidate()
 
     def deregister(self, listener: EventListener, *event_types):
-        for event_type in event_types:
-            if event_type not in self._listeners.keys():
-                return
-            if listener in self._listeners[event_type]:
-                self._listeners[event_type].remove(listener)
+        self._deregister_ref(weakref.ref(listener), event_types)
+
+    def listener_count(self, event_type: Optional[TEvent] = None) -> int:
+        """Returns the number of live registrations, for the given event type or in total."""
+        count = 0
+        for listeners in [self._listeners, self._coalesced]:
+            for type_, refs in listeners.items():
+                if event_type is None or type_ is event_type:
+                    count += len([x for x in refs if x() is not None])
+        return count
 
     def dispatch(self, event: Event):
-        if type(event) in self._listeners.keys():
-            for listener in self._listeners[type(event)]:
-                if event.source != listener:
-                    listener.event_received(event)
+        self._stats.events += 1
+        event_type = type(event)
+        refs = self._table.get(event_type)
+        if refs is None:
+            refs = self._resolve(self._listeners, self._table, event_type)
+        if refs:
+            dead = False
+            for ref in refs:
+                listener = ref()
+                if listener is None:
+                    dead = True
+                elif event.source != listener:
+                    self._stats.deliveries += 1
+                    if event_profiler.enabled:
+                        event_profiler.deliver(listener, event)
+                    else:
+                        listener.event_received(event)
+            if dead:
+                self._prune()
+        if self._coalesced:
+            self._enqueue(event)
+
+    def flush(self):
+        """Delivers the pending coalesced events right away."""
+        self._flush_scheduled = False
+        pending = self._pending
+        self._pending = {}
+        for (ref, event_type), events in pending.items():
+            listener = ref()
+            if listener is None:
+                continue
+            self._stats.deliveries += 1
+            event = CoalescedEvent(self, event_type, list(events.values()))
+            if event_profiler.enabled:
+                event_profiler.deliver(listener, event)
+            else:
+                listener.event_received(event)
+
+    def stats(self) -> DispatchStats:
+        return DispatchStats(events=self._stats.events, deliveries=self._stats.deliveries,
+                             coalesced_events=self._stats.coalesced_events,
+                             saved_deliveries=self._stats.saved_deliveries)
+
+    def _enqueue(self, event: Event):
+        event_type = type(event)
+        refs = self._coalesced_table.get(event_type)
+        if refs is None:
+            refs = self._resolve(self._coalesced, self._coalesced_table, event_type)
+        dead = False
+        for ref in refs:
+            listener = ref()
+            if listener is None:
+                dead = True
+                continue
+            if event.source == listener:
+                continue
+            self._stats.coalesced_events += 1
+            key = (ref, event_type)
+            if key not in self._pending:
+                self._pending[key] = {}
+            else:
+                self._stats.saved_deliveries += 1
+            self._pending[key].setdefault(_event_key(event), event)
+        if dead:
+            self._prune()
+
+        if self._pending and not self._flush_scheduled:
+            if QCoreApplication.instance() is None:
+                self.flush()
+            else:
+                self._flush_scheduled = True
+                QTimer.singleShot(0, self.flush)
+
+    def _deregister_ref(self, ref: weakref.ref, event_types):
+        listener = ref()
+        for event_type in event_types:
+            for listeners in [self._listeners, self._coalesced]:
+                refs = listeners.get(event_type)
+                if refs:
+                    listeners[event_type] = [x for x in refs if x is not ref and x() is not None and
+                                             x() is not listener]
+        if self._pending:
+            self._pending = {key: events for key, events in self._pending.items()
+                             if key[1] not in event_types or key[0] != ref}
+        self._invalidate()
+
+    def _prune(self):
+        for listeners in [self._listeners, self._coalesced]:
+            for event_type, refs in listeners.items():
+                listeners[event_type] = [x for x in refs if x() is not None]
+        self._invalidate()
+
+    def _invalidate(self):
+        self._table.clear()
+        self._coalesced_table.clear()
+
+    @staticmethod
+    def _resolve(listeners: Dict[TEvent, List[weakref.ref]], table: Dict[TEvent, List[weakref.ref]],
+                 event_type: TEvent) -> List[weakref.ref]:
+        refs = []
+        seen = set()
+        for cls in event_type.__mro__:
+            for ref in listeners.get(cls, []):
+                if id(ref) not in seen:
+                    seen.add(id(ref))
+                    refs.append(ref)
+        table[event_type] = refs
+        return refs
+
+
+def _event_key(event: Event) -> Tuple[Any, ...]:
+    key = []
+    for field_ in fields(event):
+        value = getattr(event, field_.name)
+        try:
+            hash(value)
+        except TypeError:
+            value = id(value)
+        key.append(value)
+    return tuple(key)
 
 
 class EventDispatchersRepository:
@@ -135,7 +289,21 @@ class EventDispatchersRepository:
         if dispatcher:
             dispatcher.clear()
 
+    def stats(self) -> Dict[Novel, DispatchStats]:
+        return {novel: dispatcher.stats() for novel, dispatcher in self._dispatchers.items()}
+
 
 event_dispatchers = EventDispatchersRepository()
 
 global_event_dispatcher = EventDispatcher()
+
+
+def dispatch_report() -> str:
+    """Returns the dispatched events and the deliveries saved by coalescing, per dispatcher."""
+    rows = [('global', global_event_dispatcher.stats())]
+    rows.extend((novel.title, stats) for novel, stats in event_dispatchers.stats().items())
+    lines = [f'{"dispatcher":<36} {"events":>8} {"deliveries":>10} {"coalesced":>10} {"saved":>8}']
+    for name, stats in rows:
+        lines.append(f'{name[:36]:<36} {stats.events:>8} {stats.deliveries:>10} {stats.coalesced_events:>10} '
+                     f'{stats.saved_deliveries:>8}')
+    return '\n'.join(lines)
@@ -222,7 +222,7 @@ class ScenesTableModel(AbstractHorizontalHeaderBasedTableModel, BaseScenesTableM
             return False
 
         scene: Scene = pickle.loads(data.data(self.MimeType))
-        old_index = self.novel.scenes.index(scene)
+        old_index = self.novel.index.scene_position(scene)
         if row < old_index:
             new_index = row
         else:
@@ -17,6 +17,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import logging
 from typing import Optional, Dict, Set, Any, List
 from uuid import UUID
 
@@ -27,44 +28,86 @@ from plotlyst.core.domain import Novel, Scene, StoryBeat, Character, Location, N
 from plotlyst.env import app_env
 from plotlyst.event.core import EventListener, Event
 from plotlyst.event.handler import event_dispatchers
-from plotlyst.events import SceneChangedEvent, SceneDeletedEvent, SceneStoryBeatChangedEvent, \
-    CharacterChangedEvent, CharacterDeletedEvent, LocationAddedEvent, LocationDeletedEvent, WorldEntityAddedEvent, \
-    WorldEntityDeletedEvent, ItemLinkedEvent, ItemUnlinkedEvent
+from plotlyst.events import SceneChangedEvent, SceneDeletedEvent, SceneStoryBeatChangedEvent, SceneAddedEvent, \
+    SceneOrderChangedEvent, CharacterChangedEvent, CharacterDeletedEvent, LocationAddedEvent, LocationDeletedEvent, \
+    WorldEntityAddedEvent, WorldEntityDeletedEvent, ItemLinkedEvent, ItemUnlinkedEvent, NovelStoryStructureUpdated
 
 
 class NovelActsRegistry(EventListener):
+    """Keeps track of the act of each scene and of the beats that are linked to scenes.
+
+    The assignment is updated incrementally: an event recomputes it only from the first scene whose position
+    or beat linkage changed, onwards. A change of the story structure, e.g. switching the active structure
+    or editing its beats, recomputes it entirely."""
 
     def __init__(self):
         self.novel: Optional[Novel] = None
         self._acts_per_scenes: Dict[Scene, int] = {}
         self._beats: Set[StoryBeat] = set()
         self._scenes_per_beats: Dict[StoryBeat, Scene] = {}
+        self._order: List[Scene] = []
+        self._linked_beats: List[Optional[StoryBeat]] = []
+        self._acts_after: List[int] = []
+        self._scenes_version: Any = None
 
     def set_novel(self, novel: Novel):
         self.novel = novel
         dispatcher = event_dispatchers.instance(self.novel)
-        dispatcher.register(self, SceneChangedEvent, SceneDeletedEvent, SceneStoryBeatChangedEvent)
+        dispatcher.register(self, SceneChangedEvent, SceneDeletedEvent, SceneStoryBeatChangedEvent, SceneAddedEvent,
+                            SceneOrderChangedEvent, NovelStoryStructureUpdated)
         self.refresh()
 
     @overrides
     def event_received(self, event: Event):
-        if self.novel:
+        if self.novel is None:
+            return
+        if isinstance(event, NovelStoryStructureUpdated):
             self.refresh()
+            return
+
+        start = self._first_reordered_position()
+        if isinstance(event, (SceneChangedEvent, SceneStoryBeatChangedEvent)):
+            position = self._position(event.scene)
+            if position is not None and position < start and \
+                    event.scene.beat(self.novel) != self._linked_beats[position]:
+                start = position
+        if start < len(self._order) or start < len(self.novel.scenes):
+            self._update(start)
 
     def refresh(self):
         self._acts_per_scenes.clear()
         self._scenes_per_beats.clear()
         self._beats.clear()
-
-        act = 1
-        for index, scene in enumerate(self.novel.scenes):
+        self._order.clear()
+        self._linked_beats.clear()
+        self._acts_after.clear()
+        self._update(0)
+
+    def _update(self, start: int):
+        unlinked_beats = set()
+        for scene, beat in zip(self._order[start:], self._linked_beats[start:]):
+            self._acts_per_scenes.pop(scene, None)
+            if beat is not None and self._scenes_per_beats.get(beat) is scene:
+                del self._scenes_per_beats[beat]
+                self._beats.discard(beat)
+                unlinked_beats.add(beat)
+        del self._order[start:]
+        del self._linked_beats[start:]
+        del self._acts_after[start:]
+
+        act = self._acts_after[-1] if self._acts_after else 1
+        for scene in self.novel.scenes[start:]:
             beat: StoryBeat = scene.beat(self.novel)
+            self._order.append(scene)
+            self._linked_beats.append(beat)
             if beat is None:
                 self._acts_per_scenes[scene] = act
+                self._acts_after.append(act)
                 continue
 
             self._beats.add(beat)
             self._scenes_per_beats[beat] = scene
+            unlinked_beats.discard(beat)
             if beat.act > act and not beat.ends_act:
                 act = beat.act
 
@@ -72,6 +115,38 @@ class NovelActsRegistry(EventListener):
 
             if beat.ends_act:
                 act = beat.act + 1
+            self._acts_after.append(act)
+
+        for i in range(start - 1, -1, -1):
+            if not unlinked_beats:
+                break
+            beat = self._linked_beats[i]
+            if beat in unlinked_beats:
+                self._beats.add(beat)
+                self._scenes_per_beats[beat] = self._order[i]
+                unlinked_beats.discard(beat)
+
+        self._scenes_version = self._version()
+
+    def _first_reordered_position(self) -> int:
+        if self._scenes_version == self._version():
+            return len(self._order)
+        for i, (cached, scene) in enumerate(zip(self._order, self.novel.scenes)):
+            if cached is not scene:
+                return i
+        if len(self._order) == len(self.novel.scenes):
+            self._scenes_version = self._version()
+        return min(len(self._order), len(self.novel.scenes))
+
+    def _position(self, scene: Scene) -> Optional[int]:
+        try:
+            return self.novel.index.scene_position(scene)
+        except ValueError:
+            return None
+
+    def _version(self) -> Any:
+        scenes = self.novel.scenes
+        return id(scenes), getattr(scenes, 'version', None), len(scenes)
 
     def act(self, scene: Scene) -> int:
         return self._acts_per_scenes.get(scene, 1)
@@ -90,11 +165,16 @@ acts_registry = NovelActsRegistry()
 
 
 class EntitiesRegistry(EventListener):
+    """Id lookups of characters and locations, and of the world-building entities that reference an item.
+
+    Events apply deltas to the maps: only the changed entity, or the subtree of an added or removed location or
+    world-building entity is updated. In dev mode every update is checked against a full rebuild."""
+
     def __init__(self):
         self.novel: Optional[Novel] = None
         self._characters: Dict[str, Character] = {}
         self._locations: Dict[str, Location] = {}
-        self._references: Dict[str, List[Any]] = {}
+        self._references: Dict[str, Dict[UUID, Any]] = {}
         self._series: Dict[str, NovelDescriptor] = {}
 
     def set_novel(self, novel: Novel):
@@ -126,31 +206,51 @@ class EntitiesRegistry(EventListener):
         if self.novel is None:
             return
 
-        if isinstance(event, (CharacterChangedEvent, CharacterDeletedEvent)):
-            self._refreshCharacters()
+        if isinstance(event, CharacterChangedEvent):
+            self._characters[str(event.character.id)] = event.character
+            if len(self._characters) != len(self.novel.characters):
+                self._refreshCharacters()
+        elif isinstance(event, CharacterDeletedEvent):
+            self._characters.pop(str(event.character.id), None)
         elif isinstance(event, LocationAddedEvent):
-            self._refreshLocations()
+            self.__addLocation(event.location)
         elif isinstance(event, LocationDeletedEvent):
-            self._refreshLocations()
+            self.__removeLocation(event.location)
             self._references.pop(str(event.location.id), None)
         elif isinstance(event, WorldEntityAddedEvent):
-            if event.entity.ref:
-                self.__addReference(event.entity.ref, event.entity)
+            self.__addReferences(event.entity)
         elif isinstance(event, WorldEntityDeletedEvent):
-            if event.entity.ref:
-                self.__removeReference(event.entity, event.entity.ref)
+            self.__removeReferences(event.entity)
         elif isinstance(event, ItemLinkedEvent):
             self.__addReference(event.item.ref, event.item)
         elif isinstance(event, ItemUnlinkedEvent):
             self.__removeReference(event.item, event.ref)
 
+        if app_env.is_dev():
+            self.verify()
+
     def refresh(self):
         self._refreshCharacters()
         self._refreshLocations()
         self._refreshReferences()
 
+    def verify(self) -> bool:
+        """Compares the registry to a full rebuild. On a mismatch the registry is rebuilt."""
+        rebuilt = EntitiesRegistry()
+        rebuilt.novel = self.novel
+        rebuilt.refresh()
+        if self._characters == rebuilt._characters and self._locations == rebuilt._locations and \
+                self._references == rebuilt._references:
+            return True
+
+        logging.error('Entities registry is inconsistent with novel %s', self.novel.id)
+        self._characters = rebuilt._characters
+        self._locations = rebuilt._locations
+        self._references = rebuilt._references
+        return False
+
     def refs(self, item: Any) -> List[Any]:
-        return self._references.get(str(item.id), [])
+        return list(self._references.get(str(item.id), {}).values())
 
     def _refreshCharacters(self):
         self._characters.clear()
@@ -158,31 +258,56 @@ class EntitiesRegistry(EventListener):
             self._characters[str(character.id)] = character
 
     def _refreshLocations(self):
-        def addChild(_: Location, child: Location):
-            self._locations[str(child.id)] = child
-
         self._locations.clear()
         for location in self.novel.locations:
-            self._locations[str(location.id)] = location
-            recursive(location, lambda parent: parent.children, addChild)
+            self.__addLocation(location)
 
     def _refreshReferences(self):
+        self._references.clear()
+        for entity in self.novel.world.root_entity.children:
+            self.__addReferences(entity)
+
+    def __addLocation(self, location: Location):
+        def addChild(_: Location, child: Location):
+            self._locations[str(child.id)] = child
+
+        self._locations[str(location.id)] = location
+        recursive(location, lambda parent: parent.children, addChild)
+
+    def __removeLocation(self, location: Location):
+        def removeChild(_: Location, child: Location):
+            self._locations.pop(str(child.id), None)
+
+        self._locations.pop(str(location.id), None)
+        recursive(location, lambda parent: parent.children, removeChild)
+
+    def __addReferences(self, entity: Any):
         def addChild(_: Any, child: Any):
             if child.ref:
                 self.__addReference(child.ref, child)
 
-        for entity in self.novel.world.root_entity.children:
-            if entity.ref:
-                self.__addReference(entity.ref, entity)
-            recursive(entity, lambda parent: parent.children, addChild)
+        if entity.ref:
+            self.__addReference(entity.ref, entity)
+        recursive(entity, lambda parent: parent.children, addChild)
+
+    def __removeReferences(self, entity: Any):
+        def removeChild(_: Any, child: Any):
+            if child.ref:
+                self.__removeReference(child, child.ref)
+
+        if entity.ref:
+            self.__removeReference(entity, entity.ref)
+        recursive(entity, lambda parent: parent.children, removeChild)
 
     def __addReference(self, id: UUID, ref: Any):
-        if str(id) not in self._references.keys():
-            self._references[str(id)] = []
-        self._references[str(id)].append(ref)
+        self._references.setdefault(str(id), {})[ref.id] = ref
 
     def __removeReference(self, source: Any, id: UUID):
-        self._references[str(id)].remove(source)
+        refs = self._references.get(str(id))
+        if refs is not None:
+            refs.pop(source.id, None)
+            if not refs:
+                del self._references[str(id)]
 
 
 entities_registry = EntitiesRegistry()
@@ -17,12 +17,18 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import bisect
+import hashlib
 import logging
-from typing import Optional, Set
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Set, List, Dict, Tuple
 
 import language_tool_python
-from PyQt6.QtCore import QRunnable
-from language_tool_python import LanguageTool
+from PyQt6.QtCore import QRunnable, QObject, QThreadPool, pyqtSignal
+from language_tool_python import LanguageTool, Match
 from language_tool_python.download_lt import LATEST_VERSION
 from overrides import overrides
 
@@ -86,6 +92,200 @@ class LanguageToolProxy:
 
 language_tool_proxy = LanguageToolProxy()
 
+GRAMMAR_CACHE_SIZE = 20000  # paragraphs
+GRAMMAR_BATCH_LIMIT = 8000  # characters per request
+GRAMMAR_BATCH_SEPARATOR = '\n\n'
+
+
+@dataclass
+class GrammarIssue:
+    offset: int
+    length: int
+    message: str = ''
+    replacements: List[str] = field(default_factory=list)
+    issue_type: str = ''
+
+
+class GrammarChecker(QObject):
+    """Checks paragraphs with LanguageTool on a worker thread and caches the issues.
+
+    The issues are cached by the hash of the language and the text of the paragraph,
+    so an unchanged paragraph is sent to the server only once, even after its scene is reopened.
+    Requested paragraphs are checked in order. A request that is discarded by every requester
+    before its turn, e.g. because the paragraph was edited again, is never sent.
+    Background requests are checked only when no other request is queued.
+
+    Queued paragraphs are joined into one request up to GRAMMAR_BATCH_LIMIT characters,
+    and the returned matches are split back to their paragraphs.
+    The checked signal is emitted with the keys of the paragraphs once their issues are available,
+    the failed signal if the request of the paragraphs failed."""
+    checked = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+    def __init__(self, size: int = GRAMMAR_CACHE_SIZE, tool: Optional[LanguageTool] = None):
+        super(GrammarChecker, self).__init__()
+        self._size = size
+        self._language_tool = tool
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[bytes, List[GrammarIssue]]' = OrderedDict()
+        self._queue: 'OrderedDict[bytes, str]' = OrderedDict()
+        self._background: 'OrderedDict[bytes, str]' = OrderedDict()
+        self._requesters: Dict[bytes, int] = {}
+        self._last_request: float = 0
+        self._running: bool = False
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(1)
+
+    def key(self, text: str) -> bytes:
+        tool = self._tool()
+        language = str(tool.language) if tool is not None else ''
+        return hashlib.blake2b(f'{language}\0{text}'.encode('utf-8'), digest_size=16).digest()
+
+    def issues(self, key: bytes) -> Optional[List[GrammarIssue]]:
+        with self._lock:
+            issues = self._cache.get(key)
+            if issues is not None:
+                self._cache.move_to_end(key)
+            return issues
+
+    def request(self, key: bytes, text: str, background: bool = False):
+        with self._lock:
+            if key in self._cache:
+                return
+            if background:
+                if key in self._queue:
+                    return
+                self._background[key] = text
+            else:
+                self._background.pop(key, None)
+                self._requesters[key] = self._requesters.get(key, 0) + 1
+                self._queue[key] = text
+                self._last_request = time.monotonic()
+            if self._running:
+                return
+            self._running = True
+        self._pool.start(GrammarCheckWorker(self))
+
+    def discard(self, key: bytes):
+        with self._lock:
+            if key not in self._queue:
+                return
+            self._requesters[key] -= 1
+            if self._requesters[key] <= 0:
+                del self._requesters[key]
+                del self._queue[key]
+
+    def idle(self, seconds: float) -> bool:
+        """Returns True if nothing but background requests were made in the given number of seconds."""
+        with self._lock:
+            return not self._queue and time.monotonic() - self._last_request >= seconds
+
+    def store(self, issues: Dict[bytes, List[GrammarIssue]]):
+        """Caches the issues of already checked paragraphs, e.g. restored from a previous session."""
+        with self._lock:
+            for key, paragraph_issues in issues.items():
+                self._cache[key] = paragraph_issues
+            while len(self._cache) > self._size:
+                self._cache.popitem(last=False)
+        self.checked.emit(list(issues.keys()))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def check(self, paragraphs: List[Tuple[bytes, str]]):
+        """Checks the paragraphs in one request right away on the calling thread and caches their issues."""
+        texts = [x[1] for x in paragraphs]
+        keys = [x[0] for x in paragraphs]
+        try:
+            matches = self._tool().check(GRAMMAR_BATCH_SEPARATOR.join(texts))
+        except Exception as e:
+            logging.warning(f'Grammar check failed: {e}')
+            self.failed.emit(keys)
+            return
+
+        with self._lock:
+            for key, paragraph_issues in zip(keys, split_matches(texts, matches)):
+                self._cache[key] = paragraph_issues
+            while len(self._cache) > self._size:
+                self._cache.popitem(last=False)
+        self.checked.emit(keys)
+
+    def drain(self):
+        """Checks the queued paragraphs batch after batch until the queues are empty."""
+        while True:
+            with self._lock:
+                if self._queue:
+                    batch = self._next_batch(self._queue)
+                elif self._background:
+                    batch = self._next_batch(self._background)
+                else:
+                    self._running = False
+                    return
+            self.check(batch)
+
+    def _next_batch(self, queue: 'OrderedDict[bytes, str]') -> List[Tuple[bytes, str]]:
+        batch = []
+        size = 0
+        for key, text in queue.items():
+            if batch and (size + len(text) > GRAMMAR_BATCH_LIMIT or not _batchable(text)):
+                break
+            batch.append((key, text))
+            size += len(text) + len(GRAMMAR_BATCH_SEPARATOR)
+            if not _batchable(text):
+                break
+        for key, _ in batch:
+            del queue[key]
+            self._requesters.pop(key, None)
+        return batch
+
+    def _tool(self) -> Optional[LanguageTool]:
+        if self._language_tool is not None:
+            return self._language_tool
+        if language_tool_proxy.is_set():
+            return language_tool_proxy.tool
+        return None
+
+
+def split_matches(texts: List[str], matches: List[Match]) -> List[List[GrammarIssue]]:
+    """Splits the matches of the joined texts back to the texts they belong to, with offsets relative to their text.
+    Matches that span the separator of two texts are dropped."""
+    starts = []
+    position = 0
+    for text in texts:
+        starts.append(position)
+        position += len(text) + len(GRAMMAR_BATCH_SEPARATOR)
+
+    results: List[List[GrammarIssue]] = [[] for _ in texts]
+    for match in matches:
+        i = bisect.bisect_right(starts, match.offset) - 1
+        if i < 0 or match.offset + match.errorLength > starts[i] + len(texts[i]):
+            continue
+        results[i].append(GrammarIssue(match.offset - starts[i], match.errorLength, match.message,
+                                       list(match.replacements), match.ruleIssueType))
+
+    return results
+
+
+def _batchable(text: str) -> bool:
+    # LanguageTool counts offsets in UTF-16 code units,
+    # so texts outside the BMP would shift the offsets of the texts after them
+    return len(text) <= GRAMMAR_BATCH_LIMIT and (not text or max(text) <= '\uffff')
+
+
+class GrammarCheckWorker(QRunnable):
+
+    def __init__(self, checker: GrammarChecker):
+        super(GrammarCheckWorker, self).__init__()
+        self.checker = checker
+
+    @overrides
+    def run(self) -> None:
+        self.checker.drain()
+
+
+grammar_checker = GrammarChecker()
+
 
 class Dictionary(EventListener):
     def __init__(self):
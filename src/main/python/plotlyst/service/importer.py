@@ -17,6 +17,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import logging
 from abc import abstractmethod
 from pathlib import Path
 from typing import Dict, List
@@ -119,7 +120,7 @@ class ScrivenerSyncImporter(SyncImporter):
 
         self._sync_characters(novel, new_novel)
         for scene in novel.scenes:
-            scene.chapter = None
+            novel.assign_chapter(scene, None)
         self._sync_chapters(novel, new_novel)
         new_scenes, removed_scenes = self._sync_scenes(novel, new_novel)
 
@@ -196,7 +197,7 @@ class ScrivenerSyncImporter(SyncImporter):
                     old_scene.manuscript = imported_manuscript
 
                 if imported_scene.chapter:
-                    old_scene.chapter = chapters[imported_scene.chapter]
+                    novel.assign_chapter(old_scene, chapters[imported_scene.chapter])
 
                 self.repo.update_scene(old_scene)
                 if old_scene.manuscript:
@@ -224,6 +225,8 @@ class ScrivenerSyncImporter(SyncImporter):
 
 class NovelLoadingResult(QObject):
     finished = pyqtSignal(object)
+    progress = pyqtSignal(int, int)
+    failed = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
@@ -231,6 +234,12 @@ class NovelLoadingResult(QObject):
     def emit_success(self, novel):
         self.finished.emit(novel)
 
+    def emit_progress(self, value: int, total: int):
+        self.progress.emit(value, total)
+
+    def emit_failure(self, msg: str):
+        self.failed.emit(msg)
+
 
 class NovelLoaderWorker(QRunnable):
 
@@ -241,6 +250,11 @@ class NovelLoaderWorker(QRunnable):
 
     @overrides
     def run(self) -> None:
-        novel = json_client.fetch_novel(self._id)
+        try:
+            novel = json_client.fetch_novel(self._id, self._result.emit_progress)
+        except Exception as e:
+            logging.exception('Could not load novel %s', self._id)
+            self._result.emit_failure(str(e))
+            return
         if novel:
             self._result.emit_success(novel)
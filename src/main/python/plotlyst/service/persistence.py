@@ -17,17 +17,17 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-import asyncio
 import logging
+import threading
 import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Set
+from typing import List, Optional, Set, Callable
 
-from PyQt6.QtCore import QTimer, QRunnable, QThreadPool, QObject
+from PyQt6.QtCore import QTimer, QRunnable, QThreadPool, QObject, QCoreApplication, QEventLoop
 from overrides import overrides
 
-from plotlyst.core.client import client, json_client
+from plotlyst.core.client import client, json_client, BatchStats
 from plotlyst.core.domain import Novel, Character, Scene, NovelDescriptor, Document, Plot, Diagram, \
     WorldBuilding
 from plotlyst.env import app_env
@@ -55,6 +55,11 @@ class Operation:
     world: Optional[WorldBuilding] = None
 
 
+FLUSH_TIMEOUT = 30  # seconds
+FLUSH_WAIT_SLICE = 0.05  # seconds between two rounds of event processing while waiting for a flush
+JOURNAL_INTERVAL = 1000  # ms, changes queued in between are journaled together
+
+
 class RepositoryPersistenceManager(QObject):
     __instance = None
 
@@ -62,11 +67,19 @@ class RepositoryPersistenceManager(QObject):
         super(RepositoryPersistenceManager, self).__init__()
         self._operations: List[Operation] = []
         self._pool = QThreadPool.globalInstance()
-        self._finished_event = asyncio.Event()
+        self._batch: Optional[_PersistenceBatch] = None
         self._persistence_enabled = True
+        self._unjournaled: List[Operation] = []
+        self._journal_pool = QThreadPool()
+        self._journal_pool.setMaxThreadCount(1)
+
+        self._journal_timer = QTimer()
+        self._journal_timer.setSingleShot(True)
+        self._journal_timer.setInterval(JOURNAL_INTERVAL)
+        self._journal_timer.timeout.connect(self._journal)
 
         self._timer = QTimer()
-        self._timer.setInterval(60 * 1000)  # 1 min
+        self._timer.setInterval(5 * 60 * 1000)  # 5 min, changes in between are journaled
         self._timer.timeout.connect(self.flush)
         if not app_env.test_env():
             self._timer.start()
@@ -80,124 +93,237 @@ class RepositoryPersistenceManager(QObject):
     def set_persistence_enabled(self, enabled: bool):
         self._persistence_enabled = enabled
 
-    def flush(self, sync: bool = False) -> bool:
-        if self._finished_event.is_set():
-            return False
+    def flush(self, sync: bool = False, progress: Optional[Callable[[int, int], None]] = None,
+              timeout: float = FLUSH_TIMEOUT) -> bool:
+        """Persists the pending operations. If a batch is being persisted in the background,
+        the pending operations are merged into it.
 
+        With sync, waits until every operation is persisted and reports the progress meanwhile.
+        Returns False if the operations could not be persisted, or no progress was made within the timeout."""
         if self._operations:
             operations_to_persist = []
             operations_to_persist.extend(self._operations)
-            if sync:
-                _persist_operations(operations_to_persist)
-            else:
-                self._finished_event.set()
-                _runnable = _PersistenceRunnable(operations_to_persist, self._finished_event)
-                self._pool.start(_runnable)
             self._operations.clear()
-
+            journal_segment = json_client.rotate_journal()
+
+            if self._batch is None or not self._batch.merge(operations_to_persist, journal_segment):
+                self._batch = _PersistenceBatch(operations_to_persist, journal_segment)
+                if sync:
+                    try:
+                        self._batch.run(progress)
+                    except Exception:
+                        logging.exception('Could not persist %d operations', len(operations_to_persist))
+                        return False
+                else:
+                    self._pool.start(_PersistenceRunnable(self._batch))
+
+        if sync and self._batch is not None:
+            return self._batch.wait(timeout, progress)
         return True
 
     def insert_novel(self, novel: Novel):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.INSERT, novel=novel))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.INSERT, novel=novel))
 
     def delete_novel(self, novel: Novel):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.DELETE, novel=novel))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.DELETE, novel=novel))
 
     def update_project_novel(self, novel: NovelDescriptor):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.UPDATE, novel_descriptor=novel))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.UPDATE, novel_descriptor=novel))
 
     def update_novel(self, novel: Novel):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.UPDATE, novel=novel))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.UPDATE, novel=novel))
 
     def insert_character(self, novel: Novel, character: Character):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.INSERT, novel=novel, character=character))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.INSERT, novel=novel, character=character))
 
     def update_character(self, character: Character, update_avatar: bool = False):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.UPDATE, character=character, update_image=update_avatar))
-        self._persist_if_test_env()
+            self._queue(Operation(OperationType.UPDATE, character=character, update_image=update_avatar))
 
     def delete_character(self, novel: Novel, character: Character):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.DELETE, novel=novel, character=character))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.DELETE, novel=novel, character=character))
 
     def update_scene(self, scene: Scene):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.UPDATE, scene=scene))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.UPDATE, scene=scene))
 
     def insert_scene(self, novel: Novel, scene: Scene):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.INSERT, novel=novel, scene=scene))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.INSERT, novel=novel, scene=scene))
 
     def delete_scene(self, novel: Novel, scene: Scene):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.DELETE, novel=novel, scene=scene))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.DELETE, novel=novel, scene=scene))
 
     def update_doc(self, novel: Novel, document: Document):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.UPDATE, novel=novel, doc=document))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.UPDATE, novel=novel, doc=document))
 
     def update_diagram(self, novel: Novel, diagram: Diagram):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.UPDATE, novel=novel, diagram=diagram))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.UPDATE, novel=novel, diagram=diagram))
 
     def update_world(self, novel: Novel):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.UPDATE, novel=novel, world=novel.world))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.UPDATE, novel=novel, world=novel.world))
 
     def delete_doc(self, novel: Novel, document: Document):
         if self._persistence_enabled:
-            self._operations.append(Operation(OperationType.DELETE, novel=novel, doc=document))
-            self._persist_if_test_env()
+            self._queue(Operation(OperationType.DELETE, novel=novel, doc=document))
 
-    def _persist_if_test_env(self):
+    def _queue(self, operation: Operation):
+        self._operations.append(operation)
         if app_env.test_env():
             _persist_operations(self._operations)
             self._operations.clear()
+        elif _journaled(operation):
+            self._unjournaled.append(operation)
+            if not self._journal_timer.isActive():
+                self._journal_timer.start()
+
+    def _journal(self):
+        if self._unjournaled:
+            self._journal_pool.start(_JournalRunnable(self._unjournaled))
+            self._unjournaled = []
+
+
+class _PersistenceBatch:
+    """Operations persisted together. More operations can be merged in until the batch finishes."""
+
+    def __init__(self, operations: List[Operation], journal_segment: int):
+        self._condition = threading.Condition()
+        self._pending: List[Operation] = list(operations)
+        self._journal_segment = journal_segment
+        self._total = len(operations)
+        self._done = 0
+        self._finished = False
+        self._failed = False
+
+    def merge(self, operations: List[Operation], journal_segment: int) -> bool:
+        with self._condition:
+            if self._finished:
+                return False
+            self._pending.extend(operations)
+            self._journal_segment = journal_segment
+            self._total += len(operations)
+            self._condition.notify_all()
+            return True
+
+    def run(self, progress: Optional[Callable[[int, int], None]] = None):
+        step = self._step if progress is None else lambda: progress(*self._step())
+        try:
+            while True:
+                with self._condition:
+                    if not self._pending:
+                        self._finish()
+                        return
+                    operations = self._pending
+                    self._pending = []
+                    journal_segment = self._journal_segment
+                _persist_operations(operations, step)
+                json_client.discard_journal(journal_segment)
+        except Exception:
+            with self._condition:
+                self._failed = True
+                self._finish()
+            raise
+
+    def wait(self, timeout: float, progress: Optional[Callable[[int, int], None]] = None) -> bool:
+        """Blocks until the batch finishes. Progress is reported from the calling thread.
+        Waits in short slices and processes the pending events in between, except user input,
+        so that a progress dialog keeps repainting.
+        Returns False if the batch failed or made no progress within the timeout."""
+        last_state = None
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                if (self._done, self._total, self._finished) == last_state:
+                    self._condition.wait(FLUSH_WAIT_SLICE)
+                state = self._done, self._total, self._finished
+
+            if state != last_state:
+                last_state = state
+                deadline = time.monotonic() + timeout
+                done, total, finished = state
+                if progress:
+                    progress(done, total)
+                if finished:
+                    return not self._failed
+            elif time.monotonic() > deadline:
+                return False
+
+            if QCoreApplication.instance() is not None:
+                QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.ExcludeUserInputEvents)
+
+    def _finish(self):
+        self._finished = True
+        self._condition.notify_all()
+
+    def _step(self):
+        with self._condition:
+            self._done += 1
+            self._condition.notify_all()
+            return self._done, self._total
 
 
 class _PersistenceRunnable(QRunnable):
-    def __init__(self, operations: List[Operation], finished: asyncio.Event):
+    def __init__(self, batch: _PersistenceBatch):
         super(_PersistenceRunnable, self).__init__()
+        self.batch = batch
+
+    @overrides
+    def run(self) -> None:
+        self.batch.run()
+
+
+class _JournalRunnable(QRunnable):
+    """Journals the operations queued within a journal interval. Each entity is serialized once
+    and the journal is synced to disk once for the whole group."""
+
+    def __init__(self, operations: List[Operation]):
+        super(_JournalRunnable, self).__init__()
         self.operations = operations
-        self.finished = finished
 
     @overrides
     def run(self) -> None:
         try:
-            _persist_operations(self.operations)
-        finally:
-            self.finished.clear()
+            with json_client.journaling():
+                _apply_operations(self.operations)
+        except Exception:
+            logging.exception('Could not journal %d operations', len(self.operations))
 
 
-def flush_or_fail():
-    attempts = 0
+def flush_or_fail(progress: Optional[Callable[[int, int], None]] = None):
     repo = RepositoryPersistenceManager.instance()
-    while not repo.flush(sync=True) and attempts < 30:
-        time.sleep(1)
-        attempts += 1
-    if attempts >= 30:
+    if not repo.flush(sync=True, progress=progress):
         raise IOError('Could not save Plotlyst workspace')
 
 
-def _persist_operations(operations: List[Operation]):
+def _journaled(operation: Operation) -> bool:
+    if operation.novel_descriptor:
+        return False
+    if operation.type != OperationType.UPDATE and operation.novel and not (
+            operation.scene or operation.character or operation.doc):
+        return False
+    return True
+
+
+def _persist_operations(operations: List[Operation], step: Optional[Callable] = None) -> BatchStats:
+    with json_client.batch() as stats:
+        _apply_operations(operations, step)
+
+    logging.debug('Persisted %d operations: %d writes, %d unchanged writes skipped', len(operations), stats.written,
+                  stats.skipped)
+    return stats
+
+
+def _apply_operations(operations: List[Operation], step: Optional[Callable] = None):
     updated_doc_cache: Set[Document] = set()
     updated_novel_cache: Set[Novel] = set()
     updated_scene_cache: Set[Scene] = set()
@@ -260,6 +386,9 @@ def _persist_operations(operations: List[Operation]):
         else:
             logging.error('Unrecognized operation %s', op.type)
 
+        if step:
+            step()
+
 
 def delete_plot(novel: Novel, plot: Plot):
     novel.plots.remove(plot)
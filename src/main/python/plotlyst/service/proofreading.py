@@ -0,0 +1,308 @@
+"""
+Plotlyst
+Copyright (C) 2021-2024  Zsolt Kovari
+
+This file is part of Plotlyst.
+
+Plotlyst is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Plotlyst is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Dict, List, Set
+
+from PyQt6.QtCore import QObject, QTimer, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QTextDocument, QTextCursor
+from overrides import overrides
+from qttextedit import remove_font
+
+from plotlyst.core import codec
+from plotlyst.core.client import json_client
+from plotlyst.core.domain import Novel, Scene, Chapter
+from plotlyst.env import app_env
+from plotlyst.event.core import EventListener, Event
+from plotlyst.event.handler import global_event_dispatcher
+from plotlyst.events import LanguageToolSet
+from plotlyst.service.grammar import GrammarIssue, grammar_checker, language_tool_proxy
+from plotlyst.service.statistics import novel_statistics
+
+PROOFREADING_INTERVAL = 1000  # ms between two scenes
+PROOFREADING_IDLE = 5  # seconds without grammar checks from the editors
+PROOFREADING_TICK_BUDGET = 0.02  # seconds spent on skipping up-to-date scenes per tick
+PROOFREADING_SAVE_INTERVAL = 5000  # ms between two writes of the results
+
+
+@dataclass
+class SceneProofreading:
+    content_hash: str
+    language: str
+    paragraphs: Dict[str, List[GrammarIssue]] = field(default_factory=dict)
+
+    def issues(self) -> int:
+        return sum(len(x) for x in self.paragraphs.values())
+
+
+@dataclass
+class NovelProofreading:
+    scenes: Dict[uuid.UUID, SceneProofreading] = field(default_factory=dict)
+
+
+@dataclass
+class _SceneInProgress:
+    scene: Scene
+    content_hash: str
+    keys: List[bytes]
+    waiting: Set[bytes]
+    issues: Dict[bytes, List[GrammarIssue]] = field(default_factory=dict)
+
+
+class ProofreadingJob(QObject, EventListener):
+    """Proofreads every scene manuscript of the novel in the background and keeps the grammar issues per scene.
+
+    The results are stored in the cache directory with the hash of the manuscript they were computed against,
+    so the job resumes with the scenes that changed or were not proofread yet. They are written at most once per
+    PROOFREADING_SAVE_INTERVAL, and when the job finishes or stops.
+    One scene is split into paragraphs per tick on a worker thread, and its paragraphs are checked by the grammar
+    checker as background requests. The job pauses while the editors check grammar, i.e. while the writer is typing.
+    The stored paragraphs are fed to the grammar checker's cache, so the editors show their issues right away."""
+    sceneProofread = pyqtSignal(Scene)
+    sceneSplit = pyqtSignal(object, object)
+
+    def __init__(self):
+        super(ProofreadingJob, self).__init__()
+        self.novel: Optional[Novel] = None
+        self._results = NovelProofreading()
+        self._queue: List[Scene] = []
+        self._current: Optional[_SceneInProgress] = None
+
+        self._timer = QTimer()
+        self._timer.setInterval(PROOFREADING_INTERVAL)
+        self._timer.timeout.connect(self._proofreadNext)
+
+        self._saveTimer = QTimer()
+        self._saveTimer.setSingleShot(True)
+        self._saveTimer.setInterval(PROOFREADING_SAVE_INTERVAL)
+        self._saveTimer.timeout.connect(self._write)
+
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(1)
+        self.sceneSplit.connect(self._split)
+
+        grammar_checker.checked.connect(self._checked)
+        grammar_checker.failed.connect(self._failed)
+        global_event_dispatcher.register(self, LanguageToolSet)
+
+    def set_novel(self, novel: Novel):
+        self.stop()
+        self.novel = novel
+        self._results = self._read()
+        self._restore()
+        self.start()
+
+    @overrides
+    def event_received(self, event: Event):
+        if isinstance(event, LanguageToolSet):
+            self.restart()
+
+    def restart(self):
+        """Starts over with the current language of the grammar checker, e.g. after it was changed."""
+        self.stop()
+        self._restore()
+        self.start()
+
+    def start(self):
+        if self.novel is None or self.novel.tutorial or not language_tool_proxy.is_set():
+            return
+        self._queue = [x for x in self.novel.scenes if x.manuscript]
+        self._current = None
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._queue.clear()
+        self._current = None
+        self._save()
+
+    def is_running(self) -> bool:
+        return self._timer.isActive()
+
+    def scene(self, scene: Scene) -> Optional[SceneProofreading]:
+        return self._results.scenes.get(scene.id)
+
+    def issues(self, scene: Scene) -> int:
+        result = self.scene(scene)
+        return result.issues() if result else 0
+
+    def chapter_density(self, chapter: Chapter) -> float:
+        """Returns the number of issues per 1000 words in the proofread scenes of the chapter."""
+        issues = 0
+        words = 0
+        for scene in self.novel.scenes_in_chapter(chapter):
+            if scene.id in self._results.scenes:
+                issues += self.issues(scene)
+                words += novel_statistics.scene(scene)
+        return issues * 1000 / words if words else 0
+
+    def _proofreadNext(self):
+        if self._current is not None or not grammar_checker.idle(PROOFREADING_IDLE):
+            return
+
+        start = time.monotonic()
+        while self._queue:
+            if time.monotonic() - start > PROOFREADING_TICK_BUDGET:
+                return
+            scene = self._queue.pop(0)
+            if scene.manuscript is None:
+                continue
+            json_client.load_document(self.novel, scene.manuscript)
+            content_hash = hashlib.blake2b(scene.manuscript.content.encode('utf-8'), digest_size=16).hexdigest()
+            result = self._results.scenes.get(scene.id)
+            if result and result.content_hash == content_hash and result.language == self._language():
+                continue
+
+            self._current = _SceneInProgress(scene, content_hash, [], set())
+            self._pool.start(ParagraphsSplitWorker(self, self._current, scene.manuscript.content))
+            return
+
+        self._timer.stop()
+        self._save()
+
+    def _split(self, current: _SceneInProgress, paragraphs: Optional[List[str]]):
+        if current is not self._current:
+            return
+        if paragraphs is None:
+            self._current = None
+            return
+
+        for text in paragraphs:
+            key = grammar_checker.key(text)
+            current.keys.append(key)
+            issues = grammar_checker.issues(key)
+            if issues is None:
+                current.waiting.add(key)
+                grammar_checker.request(key, text, background=True)
+            else:
+                current.issues[key] = issues
+        if not current.waiting:
+            self._finish()
+
+    def _checked(self, keys: List[bytes]):
+        if self._current is None:
+            return
+        for key in self._current.waiting.intersection(keys):
+            issues = grammar_checker.issues(key)
+            if issues is not None:
+                self._current.issues[key] = issues
+        self._current.waiting.difference_update(keys)
+        if not self._current.waiting:
+            self._finish()
+
+    def _failed(self, keys: List[bytes]):
+        if self._current is not None and self._current.waiting.intersection(keys):
+            self._current = None
+            self._timer.stop()
+            self._save()
+
+    def _finish(self):
+        current = self._current
+        self._current = None
+        paragraphs = {}
+        for key in current.keys:
+            issues = current.issues.get(key)
+            if issues is None:  # evicted from the grammar checker's cache before it arrived, check the scene again
+                self._queue.append(current.scene)
+                return
+            paragraphs[key.hex()] = issues
+        self._results.scenes[current.scene.id] = SceneProofreading(current.content_hash, self._language(),
+                                                                   paragraphs)
+        if not self._saveTimer.isActive():
+            self._saveTimer.start()
+        self.sceneProofread.emit(current.scene)
+
+    def _restore(self):
+        language = self._language()
+        issues = {}
+        for result in self._results.scenes.values():
+            if result.language == language:
+                for key, paragraph_issues in result.paragraphs.items():
+                    issues[bytes.fromhex(key)] = paragraph_issues
+        if issues:
+            grammar_checker.store(issues)
+
+    def _language(self) -> str:
+        return str(language_tool_proxy.tool.language) if language_tool_proxy.is_set() else ''
+
+    def _path(self) -> Path:
+        return Path(app_env.cache_dir).joinpath('proofreading', f'{self.novel.id}.json')
+
+    def _read(self) -> NovelProofreading:
+        path = self._path()
+        if not path.exists():
+            return NovelProofreading()
+        try:
+            return codec.from_json(NovelProofreading, path.read_text(encoding='utf-8'))
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f'Could not read proofreading results {path}: {e}')
+            return NovelProofreading()
+
+    def _save(self):
+        if self._saveTimer.isActive():
+            self._saveTimer.stop()
+            self._write()
+
+    def _write(self):
+        ids = set(x.id for x in self.novel.scenes)
+        self._results.scenes = {k: v for k, v in self._results.scenes.items() if k in ids}
+        path = self._path()
+        os.makedirs(path.parent, exist_ok=True)
+        path.write_text(codec.to_json(self._results), encoding='utf-8')
+
+
+class ParagraphsSplitWorker(QRunnable):
+
+    def __init__(self, job: ProofreadingJob, current: _SceneInProgress, content: str):
+        super(ParagraphsSplitWorker, self).__init__()
+        self.job = job
+        self.current = current
+        self.content = content
+
+    @overrides
+    def run(self) -> None:
+        try:
+            paragraphs = split_paragraphs(self.content)
+        except Exception:
+            logging.exception('Could not split the manuscript of scene %s', self.current.scene.id)
+            paragraphs = None
+        self.job.sceneSplit.emit(self.current, paragraphs)
+
+
+def split_paragraphs(html: str) -> List[str]:
+    """Returns the non-empty blocks of the HTML content as the editors see them."""
+    document = QTextDocument()
+    QTextCursor(document).insertHtml(remove_font(html))
+    paragraphs = []
+    block = document.begin()
+    while block.isValid():
+        text = block.text()
+        if text.strip():
+            paragraphs.append(text)
+        block = block.next()
+    return paragraphs
+
+
+proofreading_job = ProofreadingJob()
@@ -0,0 +1,169 @@
+"""
+Plotlyst
+Copyright (C) 2021-2024  Zsolt Kovari
+
+This file is part of Plotlyst.
+
+Plotlyst is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Plotlyst is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple, Any
+
+from overrides import overrides
+
+from plotlyst.core.domain import Novel, Scene, Chapter, Character, Plot
+from plotlyst.event.core import EventListener, Event
+from plotlyst.event.handler import event_dispatchers
+from plotlyst.events import SceneChangedEvent, SceneDeletedEvent, SceneAddedEvent, SceneOrderChangedEvent, \
+    SceneStoryBeatChangedEvent, NovelSyncEvent, ChapterChangedEvent, NovelStoryStructureUpdated
+from plotlyst.service.cache import acts_registry
+
+
+@dataclass
+class _SceneStatistics:
+    wc: int
+    chapter: Optional[Chapter]
+    pov: Optional[Character]
+    plots: Tuple[Plot, ...]
+
+
+class NovelStatistics(EventListener):
+    """Word counts of the manuscript, aggregated per scene, chapter, POV character, storyline and act.
+
+    The aggregates are updated by deltas: a word count change of a scene or its reassignment to another chapter,
+    POV or storyline touches only the aggregates of that scene. Scenes moved between chapters are detected after
+    the order or the chapters of the novel changed. Act totals are recomputed lazily after the acts may have shifted."""
+
+    def __init__(self):
+        self.novel: Optional[Novel] = None
+        self._scenes: Dict[Scene, _SceneStatistics] = {}
+        self._chapters: Dict[Chapter, int] = {}
+        self._povs: Dict[Character, int] = {}
+        self._plots: Dict[Plot, int] = {}
+        self._acts: Dict[int, int] = {}
+        self._acts_dirty: bool = True
+        self._total: int = 0
+
+    def set_novel(self, novel: Novel):
+        self.novel = novel
+        dispatcher = event_dispatchers.instance(self.novel)
+        dispatcher.register(self, SceneChangedEvent, SceneDeletedEvent, SceneAddedEvent, SceneOrderChangedEvent,
+                            SceneStoryBeatChangedEvent, NovelSyncEvent, ChapterChangedEvent,
+                            NovelStoryStructureUpdated)
+        self.refresh()
+
+    @overrides
+    def event_received(self, event: Event):
+        if self.novel is None:
+            return
+
+        if isinstance(event, (SceneChangedEvent, SceneAddedEvent)):
+            self.scene_changed(event.scene)
+        elif isinstance(event, SceneDeletedEvent):
+            self._remove(event.scene)
+        elif isinstance(event, (SceneOrderChangedEvent, ChapterChangedEvent)):
+            for scene in self.novel.scenes:
+                self.scene_changed(scene)
+        elif isinstance(event, NovelSyncEvent):
+            self.refresh()
+        if isinstance(event, (SceneDeletedEvent, SceneAddedEvent, SceneOrderChangedEvent, SceneStoryBeatChangedEvent,
+                              NovelStoryStructureUpdated)):
+            self._acts_dirty = True
+
+    def refresh(self):
+        self._scenes.clear()
+        self._chapters.clear()
+        self._povs.clear()
+        self._plots.clear()
+        self._total = 0
+        for scene in self.novel.scenes:
+            self._add(scene)
+        self._acts_dirty = True
+
+    def scene_changed(self, scene: Scene):
+        """Updates the aggregates after the word count of the scene or its chapter, POV or storylines changed."""
+        stats = self._scenes.get(scene)
+        if stats is None:
+            self._add(scene)
+            self._acts_dirty = True
+            return
+
+        wc = self._word_count(scene)
+        plots = tuple(scene.plots())
+        if stats.chapter is scene.chapter and stats.pov is scene.pov and stats.plots == plots:
+            if stats.wc != wc:
+                self._apply(scene, stats, wc - stats.wc)
+                stats.wc = wc
+            return
+
+        self._remove(scene)
+        self._add(scene)
+
+    def total(self) -> int:
+        return self._total
+
+    def scene(self, scene: Scene) -> int:
+        stats = self._scenes.get(scene)
+        return stats.wc if stats else 0
+
+    def chapter(self, chapter: Chapter) -> int:
+        return self._chapters.get(chapter, 0)
+
+    def pov(self, character: Character) -> int:
+        return self._povs.get(character, 0)
+
+    def plot(self, plot: Plot) -> int:
+        return self._plots.get(plot, 0)
+
+    def act(self, act: int) -> int:
+        if self._acts_dirty:
+            self._acts.clear()
+            for scene, stats in self._scenes.items():
+                self._increment(self._acts, acts_registry.act(scene), stats.wc)
+            self._acts_dirty = False
+        return self._acts.get(act, 0)
+
+    def _add(self, scene: Scene):
+        stats = _SceneStatistics(self._word_count(scene), scene.chapter, scene.pov, tuple(scene.plots()))
+        self._scenes[scene] = stats
+        self._apply(scene, stats, stats.wc)
+
+    def _remove(self, scene: Scene):
+        stats = self._scenes.pop(scene, None)
+        if stats is not None:
+            self._apply(scene, stats, -stats.wc)
+
+    def _apply(self, scene: Scene, stats: _SceneStatistics, diff: int):
+        self._total += diff
+        if stats.chapter is not None:
+            self._increment(self._chapters, stats.chapter, diff)
+        if stats.pov is not None:
+            self._increment(self._povs, stats.pov, diff)
+        for plot in stats.plots:
+            self._increment(self._plots, plot, diff)
+        if not self._acts_dirty:
+            self._increment(self._acts, acts_registry.act(scene), diff)
+
+    @staticmethod
+    def _increment(aggregate: Dict[Any, int], key: Any, diff: int):
+        aggregate[key] = aggregate.get(key, 0) + diff
+
+    @staticmethod
+    def _word_count(scene: Scene) -> int:
+        if scene.manuscript and scene.manuscript.statistics:
+            return scene.manuscript.statistics.wc
+        return 0
+
+
+novel_statistics = NovelStatistics()
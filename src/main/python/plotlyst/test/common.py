@@ -17,7 +17,10 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import json
+from http.server import BaseHTTPRequestHandler
 from typing import Any, List
+from urllib.parse import parse_qs, urlparse
 from unittest.mock import patch
 
 from PyQt6 import QtWidgets, QtCore
@@ -26,7 +29,8 @@ from PyQt6.QtGui import QAction
 from PyQt6.QtWidgets import QAbstractItemView, QMenu, QMessageBox
 from qttextedit import RichTextEditor
 
-from plotlyst.core.domain import PlotType
+from plotlyst.core.domain import PlotType, Novel, Scene
+from plotlyst.event.handler import event_dispatchers
 from plotlyst.view.characters_view import CharactersView
 from plotlyst.view.docs_view import DocumentsView
 from plotlyst.view.home_view import HomeView
@@ -194,3 +198,66 @@ def type_text(qtbot, editor, text: str):
         textedit = editor
     for c in text:
         qtbot.keyPress(textedit, c)
+
+
+def novel_with_scenes(count: int = 8) -> Novel:
+    novel = Novel.new_novel('Test')
+    for i in range(count - 1):
+        novel.scenes.append(Scene(f'Scene {i + 2}'))
+    return novel
+
+
+def dispatch(novel: Novel, event):
+    event_dispatchers.instance(novel).dispatch(event)
+
+
+class LanguageToolStubHandler(BaseHTTPRequestHandler):
+    """Answers like a LanguageTool server and reports every word starting with 'xx' as a misspelling."""
+    checks = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self._respond(url.path, parse_qs(url.query))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+        self._respond(urlparse(self.path).path, parse_qs(body))
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, path: str, params):
+        if path.endswith('/languages'):
+            response = [{'name': 'English (US)', 'code': 'en', 'longCode': 'en-US'}]
+        else:
+            text = params['text'][0]
+            self.checks.append(text)
+            response = {'matches': [self._match(text, i, word) for i, word in self._words(text)
+                                    if word.startswith('xx')]}
+        data = json.dumps(response).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _words(self, text: str):
+        start = None
+        for i, char in enumerate(text + ' '):
+            if char.isspace():
+                if start is not None:
+                    yield start, text[start:i]
+                start = None
+            elif start is None:
+                start = i
+
+    def _match(self, text: str, offset: int, word: str):
+        utf16_offset = len(text[:offset].encode('utf-16-le')) // 2
+        return {'message': 'Possible spelling mistake found.', 'shortMessage': 'Spelling mistake',
+                'replacements': [{'value': word[2:]}], 'offset': utf16_offset, 'length': len(word),
+                'context': {'text': text, 'offset': utf16_offset, 'length': len(word)}, 'sentence': text,
+                'type': {'typeName': 'Other'},
+                'rule': {'id': 'MORFOLOGIK_RULE_EN_US', 'description': 'Possible spelling mistake',
+                         'issueType': 'misspelling', 'category': {'id': 'TYPOS', 'name': 'Possible Typo'}},
+                'ignoreForIncompleteSentence': False, 'contextForSureMatch': 0}
+
@@ -1,6 +1,12 @@
-from plotlyst.core.client import client, json_client
-from plotlyst.core.domain import Novel, Scene, default_story_structures, three_act_structure, \
-    SceneStoryBeat, ScenePurposeType
+import copy
+import threading
+
+from PyQt6.QtCore import QByteArray, QBuffer, QIODevice
+from PyQt6.QtGui import QImage
+
+from plotlyst.core.client import client, json_client, PARALLEL_LOADING_THRESHOLD
+from plotlyst.core.domain import Novel, Scene, Character, default_story_structures, three_act_structure, \
+    SceneStoryBeat, ScenePurposeType, Document
 from plotlyst.env import app_env
 from plotlyst.test.conftest import init_project
 
@@ -56,3 +62,245 @@ def test_init_client(test_client):
     init_project()
 
     json_client.init(str(json_client.root_path))
+
+
+def test_fetch_novel_in_parallel(test_client):
+    novel = Novel(title='test1')
+    app_env.novel = novel
+    client.insert_novel(novel)
+    for i in range(PARALLEL_LOADING_THRESHOLD * 2):
+        scene = Scene(title=f'Scene {i}')
+        novel.scenes.append(scene)
+        json_client.update_scene(scene)
+    json_client.update_novel(novel)
+
+    progress = []
+    saved_novel = client.fetch_novel(novel.id, lambda value, total: progress.append((value, total)))
+    assert novel == saved_novel
+    assert [x.title for x in saved_novel.scenes] == [x.title for x in novel.scenes]
+    assert progress[-1] == (len(novel.scenes), len(novel.scenes))
+
+
+def test_character_avatar_loaded_lazily(test_client):
+    novel = Novel(title='test1')
+    app_env.novel = novel
+    client.insert_novel(novel)
+
+    image = QImage(200, 200, QImage.Format.Format_RGB32)
+    array = QByteArray()
+    buffer = QBuffer(array)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, 'PNG')
+    character = Character('Alfred', avatar=array)
+    novel.characters.append(character)
+    client.insert_character(novel, character)
+
+    saved_character = client.fetch_novel(novel.id).characters[0]
+    assert saved_character.avatar is None
+    assert saved_character.avatar_id == character.avatar_id
+    assert saved_character.has_avatar()
+
+    assert json_client.load_avatar(saved_character)
+    assert QImage.fromData(saved_character.avatar).width() == 200
+
+
+def test_convert_to_container_storage(test_client):
+    novel = init_project()
+    json_client.convert_to_container(novel.id)
+    assert json_client.is_container_storage(novel.id)
+    assert json_client.novels_dir.joinpath(f'{novel.id}.db').exists()
+    assert not json_client.novels_dir.joinpath(f'{novel.id}.json').exists()
+
+    saved_novel = client.fetch_novel(novel.id)
+    assert novel == saved_novel
+    assert [x.title for x in saved_novel.scenes] == ['Scene 1', 'Scene 2']
+    assert saved_novel.scenes[0].pov == novel.characters[0]
+
+    json_client.convert_to_directory(novel.id)
+    assert not json_client.is_container_storage(novel.id)
+    assert not json_client.novels_dir.joinpath(f'{novel.id}.db').exists()
+    assert client.fetch_novel(novel.id) == novel
+
+
+def test_delete_novel_removes_container(test_client):
+    novel = init_project()
+    json_client.convert_to_container(novel.id)
+
+    client.delete_novel(novel)
+    assert not json_client.novels_dir.joinpath(f'{novel.id}.db').exists()
+    assert not client.novels()
+
+
+def test_batch_isolated_per_thread(test_client):
+    novel = init_project()
+    json_client.convert_to_container(novel.id)
+
+    novel.scenes[0].synopsis = 'Batched synopsis'
+    novel.scenes[1].synopsis = 'Concurrent synopsis'
+    with json_client.batch() as stats:
+        json_client.update_scene(novel.scenes[0])
+        thread = threading.Thread(target=json_client.update_scene, args=(novel.scenes[1],))
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+    thread.join()
+
+    assert stats.written == 1
+    saved_novel = client.fetch_novel(novel.id)
+    assert [x.synopsis for x in saved_novel.scenes] == ['Batched synopsis', 'Concurrent synopsis']
+
+
+def test_unchanged_writes_skipped(test_client):
+    novel = init_project()
+
+    with json_client.batch() as stats:
+        json_client.update_novel(novel)
+        for scene in novel.scenes:
+            json_client.update_scene(scene)
+    assert stats.written == 0
+    assert stats.skipped == 4
+
+    novel.scenes[0].synopsis = 'Changed synopsis'
+    with json_client.batch() as stats:
+        json_client.update_novel(novel)
+        for scene in novel.scenes:
+            json_client.update_scene(scene)
+    assert stats.written == 1
+    assert stats.skipped == 3
+    assert client.fetch_novel(novel.id).scenes[0].synopsis == 'Changed synopsis'
+
+
+def test_journal_replayed_on_init(test_client):
+    novel = init_project()
+
+    with json_client.journaling():
+        novel.scenes[0].synopsis = 'Journaled synopsis'
+        json_client.update_scene(novel.scenes[0])
+        json_client.delete_scene(novel, novel.scenes.pop(1))
+    assert client.fetch_novel(novel.id).scenes[0].synopsis != 'Journaled synopsis'
+
+    json_client.init(json_client.root_path)
+    persisted_novel = client.fetch_novel(novel.id)
+    assert persisted_novel.scenes[0].synopsis == 'Journaled synopsis'
+    assert len(persisted_novel.scenes) == len(novel.scenes)
+    assert not list(json_client.root_path.joinpath('journal').glob('*.journal'))
+
+
+def test_journal_leaves_avatar_index(test_client):
+    novel = init_project()
+    character = novel.characters[0]
+    json_client._avatar_ids.clear()
+
+    with json_client.journaling():
+        json_client.update_character(character)
+    assert character.id not in json_client._avatar_ids
+
+    json_client.update_character(character)
+    assert character.id in json_client._avatar_ids
+
+    with json_client.journaling():
+        json_client.delete_character(novel, character)
+    assert character.id in json_client._avatar_ids
+
+
+def test_journal_discarded_after_flush(test_client):
+    novel = init_project()
+
+    with json_client.journaling():
+        novel.scenes[0].synopsis = 'Journaled synopsis'
+        json_client.update_scene(novel.scenes[0])
+    segment = json_client.rotate_journal()
+    json_client.update_scene(novel.scenes[0])
+    json_client.discard_journal(segment)
+
+    novel.scenes[0].synopsis = 'Not journaled'
+    json_client.update_scene(novel.scenes[0])
+    json_client.init(json_client.root_path)
+    assert client.fetch_novel(novel.id).scenes[0].synopsis == 'Not journaled'
+
+
+def test_document_cache_evicts_persisted_documents(test_client, monkeypatch):
+    novel = init_project()
+    docs = [Document(f'Doc {i}') for i in range(5)]
+    for i, doc in enumerate(docs):
+        doc.content = f'<p>Content {i}</p>' * 1000
+        json_client.update_document(novel, doc)
+
+    monkeypatch.setattr(json_client.document_cache, 'budget', docs[0].content_size() * 2)
+    dirty_doc = Document('Dirty')
+    json_client.update_document(novel, dirty_doc)
+    dirty_doc.content = '<p>Not persisted</p>' * 1000
+
+    stats = json_client.document_cache.stats()
+    assert stats.evictions >= 3
+    assert stats.resident_bytes <= json_client.document_cache.budget
+    assert dirty_doc.content == '<p>Not persisted</p>' * 1000
+
+    assert docs[0].content == '<p>Content 0</p>' * 1000
+    assert json_client.document_cache.stats().misses == 1
+
+
+def test_document_cache_keeps_edit_during_eviction(test_client, monkeypatch):
+    novel = init_project()
+    doc = Document('Edited')
+    doc.content = '<p>Persisted</p>' * 1000
+    json_client.update_document(novel, doc)
+
+    unload_content = Document.unload_content
+
+    def edit_then_unload(document: Document, expected_version=None):
+        if document is doc:
+            editor = threading.Thread(target=setattr, args=(doc, 'content', '<p>Edited</p>'))
+            editor.start()
+            editor.join()
+        return unload_content(document, expected_version)
+
+    monkeypatch.setattr(Document, 'unload_content', edit_then_unload)
+    monkeypatch.setattr(json_client.document_cache, 'budget', 0)
+    evictor = threading.Thread(target=json_client.update_document, args=(novel, Document('Newest')))
+    evictor.start()
+    evictor.join()
+
+    assert doc.content == '<p>Edited</p>'
+    assert json_client.document_cache.stats().misses == 0
+
+
+def test_deepcopy_cached_document(test_client):
+    novel = init_project()
+    character = novel.characters[0]
+    character.document = Document('Notes')
+    character.document.content = '<p>Character notes</p>' * 1000
+    json_client.update_document(novel, character.document)
+    character.document.unload_content()
+
+    character_copy = copy.deepcopy(character)
+    assert character_copy.document.content == '<p>Character notes</p>' * 1000
+    assert character_copy.document is not character.document
+
+    character_copy.document.content = '<p>Changed copy</p>'
+    assert character.document.content == '<p>Character notes</p>' * 1000
+
+
+def test_compact_documents(test_client, monkeypatch):
+    novel = init_project()
+    doc = Document('Manuscript')
+    doc.content = '<p>Plain document</p>' * 100
+    json_client.update_document(novel, doc)
+
+    monkeypatch.setattr(json_client, 'compact_documents', True)
+    doc.loaded = False
+    json_client.load_document(novel, doc)
+    assert doc.content == '<p>Plain document</p>' * 100
+
+    assert json_client.migrate_documents(novel.id, compact=True) == 1
+    docs_dir = json_client.novels_dir.joinpath(str(novel.id), 'docs', str(novel.id))
+    assert not docs_dir.joinpath(f'{doc.id}.html').exists()
+    assert docs_dir.joinpath(f'{doc.id}.html.gz').stat().st_size < len(doc.content)
+
+    doc.content = '<p>Compact document</p>' * 100
+    json_client.update_document(novel, doc)
+    monkeypatch.setattr(json_client, 'compact_documents', False)
+    json_client.init(json_client.root_path)
+    doc.loaded = False
+    json_client.load_document(novel, doc)
+    assert doc.content == '<p>Compact document</p>' * 100
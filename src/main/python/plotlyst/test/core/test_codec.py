@@ -0,0 +1,112 @@
+import inspect
+import json
+import typing
+import uuid
+from dataclasses import fields, is_dataclass, MISSING
+from datetime import datetime, timezone
+from enum import Enum
+
+import pytest
+from dataclasses_json.core import _asdict, _ExtendedEncoder, _decode_dataclass
+
+from plotlyst.core import client, codec, domain, template
+
+
+def _sample_value(type_, depth: int):
+    while hasattr(type_, '__supertype__'):
+        type_ = type_.__supertype__
+    origin = typing.get_origin(type_)
+    args = typing.get_args(type_)
+    if origin is typing.Union:
+        return _sample_value([x for x in args if x is not type(None)][0], depth)
+    if origin is list:
+        return [_sample_value(args[0], depth + 1)] if depth < 3 else []
+    if origin is set:
+        return {_sample_value(args[0], depth + 1)} if depth < 3 else set()
+    if origin is dict:
+        return {_sample_value(args[0], depth + 1): _sample_value(args[1], depth + 1)} if depth < 3 else {}
+    if type_ is typing.Any or type_ is str:
+        return 'Text ü'
+    if type_ is bool:
+        return True
+    if type_ is int:
+        return 3
+    if type_ is float:
+        return 1.5
+    if type_ is uuid.UUID:
+        return uuid.uuid4()
+    if type_ is datetime:
+        return datetime(2024, 1, 2, tzinfo=timezone.utc)
+    if inspect.isclass(type_) and issubclass(type_, Enum):
+        return list(type_)[-1]
+    if is_dataclass(type_):
+        return _sample(type_, populated=True, depth=depth + 1)
+    return None
+
+
+def _sample(cls, populated: bool, depth: int = 0):
+    types = typing.get_type_hints(cls)
+    kwargs = {}
+    for field_ in fields(cls):
+        if not field_.init:
+            continue
+        if populated or (field_.default is MISSING and field_.default_factory is MISSING):
+            kwargs[field_.name] = _sample_value(types[field_.name], depth)
+    return cls(**kwargs)
+
+
+def _domain_classes():
+    classes = []
+    for module in [domain, template, client]:
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if is_dataclass(cls) and cls.__module__ == module.__name__:
+                classes.append(cls)
+    return classes
+
+
+def _reference_json(obj) -> str:
+    return json.dumps(_asdict(obj), cls=_ExtendedEncoder)
+
+
+def _assert_same(expected, actual, path: str):
+    assert type(expected) is type(actual), path
+    if is_dataclass(expected):
+        for field_ in fields(expected):
+            _assert_same(getattr(expected, field_.name), getattr(actual, field_.name), f'{path}.{field_.name}')
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual), path
+        for i, (x, y) in enumerate(zip(expected, actual)):
+            _assert_same(x, y, f'{path}[{i}]')
+    elif isinstance(expected, dict):
+        assert list(expected.keys()) == list(actual.keys()), path
+        for k in expected.keys():
+            _assert_same(expected[k], actual[k], f'{path}[{k}]')
+    else:
+        assert expected == actual, path
+
+
+@pytest.mark.parametrize('cls', _domain_classes(), ids=lambda x: x.__name__)
+@pytest.mark.parametrize('populated', [True, False], ids=['populated', 'defaults'])
+def test_codec_conforms_to_dataclasses_json(cls, populated):
+    try:
+        obj = _sample(cls, populated)
+        expected_json = _reference_json(obj)
+    except Exception:
+        pytest.skip(f'{cls.__name__} cannot be sampled')
+
+    assert codec.to_json(obj) == expected_json
+
+    expected = _decode_dataclass(cls, json.loads(expected_json), False)
+    decoded = codec.from_json(cls, expected_json)
+    _assert_same(expected, decoded, cls.__name__)
+    assert codec.to_json(decoded) == expected_json
+
+
+def test_codec_ignores_unknown_keys():
+    info = client.SceneInfo(title='Scene', id=uuid.uuid4())
+    data = json.loads(codec.to_json(info))
+    data['removed_field'] = 'value'
+
+    decoded = codec.from_json(client.SceneInfo, json.dumps(data))
+    assert decoded.id == info.id
+    assert decoded.title == 'Scene'
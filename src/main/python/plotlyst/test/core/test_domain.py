@@ -1,6 +1,7 @@
 from typing import Set
 
-from plotlyst.core.domain import default_story_structures, StoryBeatType
+from plotlyst.core.domain import default_story_structures, StoryBeatType, Novel, Character, Scene, Tag, TagType, \
+    Chapter
 
 
 def test_unique_story_structures():
@@ -29,3 +30,60 @@ def test_unique_story_structures():
 
             if beat.ends_act:
                 act += 1
+
+
+def test_novel_index_follows_modifications():
+    novel = Novel(title='Novel')
+    character = Character(name='Alfred')
+    novel.characters.append(character)
+    assert novel.index.character(character.id) is character
+    assert novel.index.character(str(character.id)) is character
+
+    novel.characters.remove(character)
+    assert novel.index.character(character.id) is None
+
+    scene = Scene(title='Scene')
+    novel.scenes = [scene]
+    assert novel.index.scene(scene.id) is scene
+
+    tag = Tag('Tag', tag_type='Other')
+    novel.tags[TagType('Other')] = [tag]
+    assert novel.index.tag(tag.id) is tag
+    novel.tags[TagType('Other')].clear()
+    assert novel.index.tag(tag.id) is None
+
+
+def test_novel_index_follows_replaced_collections():
+    novel = Novel(title='Novel')
+    for _ in range(3):
+        scene = Scene(title='Scene')
+        novel.scenes = [scene]
+        assert novel.scenes.version == 0
+        assert novel.index.scene(scene.id) is scene
+        assert novel.index.scene_position(scene) == 0
+
+
+def test_scene_order_index_follows_reordering():
+    novel = Novel(title='Novel')
+    chapter_1 = Chapter('1')
+    chapter_2 = Chapter('2')
+    novel.chapters.extend([chapter_1, chapter_2])
+    scene_1 = Scene('', chapter=chapter_1)
+    scene_2 = Scene('', chapter=chapter_1)
+    scene_3 = Scene('', chapter=chapter_2)
+    novel.scenes.extend([scene_1, scene_2, scene_3])
+
+    assert novel.scenes_in_chapter(chapter_1) == [scene_1, scene_2]
+    assert scene_2.title_or_index(novel) == 'Scene 2'
+
+    novel.scenes.insert(0, novel.scenes.pop(1))
+    assert novel.scenes_in_chapter(chapter_1) == [scene_2, scene_1]
+    assert scene_2.title_or_index(novel) == 'Scene 1'
+
+    novel.assign_chapter(scene_1, chapter_2)
+    assert novel.scenes_in_chapter(chapter_1) == [scene_2]
+    assert novel.scenes_in_chapter(chapter_2) == [scene_1, scene_3]
+
+    novel.scenes[:] = [scene_3, scene_1]
+    assert novel.scenes_in_chapter(chapter_1) == []
+    assert scene_1.title_or_index(novel) == 'Scene 2'
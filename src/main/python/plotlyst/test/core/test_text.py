@@ -1,6 +1,9 @@
+import random
+import re
+
 import nltk
 
-from plotlyst.core.text import wc, sentence_count
+from plotlyst.core.text import wc, sentence_count, sentence_counts, clean_text, clean_texts
 
 nltk.download('punkt')
 
@@ -35,3 +38,42 @@ def test_sentence_count():
     assert sentence_count('Mr. Anderson. Hello.') == 2
     assert sentence_count('Dr. Anderson. Hello.') == 2
     assert sentence_count('Hello John F. Kennedy. This is my second sentence.') == 2
+
+
+def _reference_clean_text(text: str) -> str:
+    text = re.sub(r'[,:;()\-–—]', ' ', text)
+    text = re.sub(r'["\'“”«»‹›„‟’❝❞❮❯⹂〝〞〟＂‚‘‛❛❜❟]', '', text)
+    text = re.sub(r'[\.!?]', '.', text)
+    text = re.sub(r'^\s+', '', text)
+    text = re.sub(r'[ ]*(\n|\r\n|\r)[ ]*', ' ', text)
+    text = re.sub(r'([\.])[\. ]+', '.', text)
+    text = re.sub(r'[ ]*([\.])', '. ', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s+$', '', text)
+    text = re.sub(r'\.(?! )', '. ', text)
+    text = re.sub(r'\,(?! )', ', ', text)
+    text = re.sub(r' +', ' ', text)
+    return text
+
+
+def _random_texts(count: int):
+    alphabet = list('ab .!?,:;()-–—"\'“”«»’\n\r\t\x0b\u00a0\u3000') + ['\r\n', 'word', ' . ', '...', 'Mr.']
+    rnd = random.Random(42)
+    return [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 30))) for _ in range(count)]
+
+
+def test_clean_text_equivalence():
+    texts = _random_texts(20000)
+    texts.extend(['Simple sentence.', '"Hello," said John. Then he grabbed the torch.', 'Too many dots.. .',
+                  'Tab\t\tsentence.', '  Leading and trailing  \n', 'Line\r\nbreaks\rand\nmore'])
+    for text in texts:
+        assert clean_text(text) == _reference_clean_text(text), repr(text)
+    assert clean_texts(texts) == [_reference_clean_text(x) for x in texts]
+
+
+def test_sentence_counts_equivalence():
+    texts = _random_texts(500) + ['Mr. Anderson. Hello.', 'This is...Just what is it?', 'Without punctuation']
+    expected = [len(nltk.text.sent_tokenize(_reference_clean_text(x))) for x in texts]
+    assert sentence_counts(texts) == expected
+    assert sentence_counts(texts) == expected
+    assert [sentence_count(x) for x in texts] == expected
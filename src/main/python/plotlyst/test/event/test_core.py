@@ -0,0 +1,70 @@
+from plotlyst.core.domain import Scene
+from plotlyst.event import core
+from plotlyst.event.core import EventListener, Event, EventProfiler, CoalescedEvent
+from plotlyst.events import SceneChangedEvent, SceneDeletedEvent
+
+
+class FakeListener(EventListener):
+    def __init__(self):
+        self.events = []
+
+    def event_received(self, event: Event):
+        self.events.append(event)
+
+
+def test_profiler_deliver(monkeypatch):
+    clock = iter([1.0, 1.5, 2.0, 2.25])
+    monkeypatch.setattr(core, 'timer', lambda: next(clock))
+    profiler = EventProfiler()
+    listener = FakeListener()
+    scene = Scene('Scene')
+    event = SceneChangedEvent(None, scene)
+
+    profiler.deliver(listener, event)
+    profiler.deliver(listener, CoalescedEvent(None, SceneChangedEvent, [event]))
+    assert len(listener.events) == 2
+
+    timings = profiler.timings()
+    assert [(x.event_type, x.listener, x.count, x.total) for x in timings] == [
+        ('SceneChangedEvent', 'FakeListener', 1, 0.5),
+        ('SceneChangedEvent (coalesced)', 'FakeListener', 1, 0.25)]
+
+
+def test_profiler_timings():
+    profiler = EventProfiler()
+    for elapsed in [0.004, 0.001, 0.003, 0.002]:
+        profiler.record('SceneChangedEvent', 'FakeListener', elapsed)
+    profiler.record('SceneDeletedEvent', 'FakeListener', 0.1)
+
+    expensive, cheap = profiler.timings()
+    assert expensive.event_type == 'SceneDeletedEvent'
+    assert expensive.count == 1
+    assert expensive.p50 == expensive.p99 == 0.1
+    assert cheap.count == 4
+    assert cheap.total == sum([0.004, 0.001, 0.003, 0.002])
+    assert cheap.p50 == 0.003
+    assert cheap.p99 == 0.004
+
+    report = profiler.report().splitlines()
+    assert len(report) == 3
+    assert report[1].split() == ['SceneDeletedEvent', 'FakeListener', '1', '100.00', '100.000', '100.000']
+    assert report[2].split() == ['SceneChangedEvent', 'FakeListener', '4', '10.00', '3.000', '4.000']
+
+    profiler.reset()
+    assert profiler.timings() == []
+
+
+def test_profiler_sampling(monkeypatch):
+    monkeypatch.setattr(EventProfiler, 'MAX_SAMPLES', 3)
+    replaced = iter([1, 4])
+    monkeypatch.setattr(core.random, 'randrange', lambda count: next(replaced))
+    profiler = EventProfiler()
+    for elapsed in [1.0, 2.0, 3.0, 4.0, 5.0]:
+        profiler.record(SceneDeletedEvent.__name__, 'FakeListener', elapsed)
+
+    timing = profiler.timings()[0]
+    assert timing.count == 5
+    assert timing.total == 15.0
+    assert sorted(profiler._samples[(SceneDeletedEvent.__name__, 'FakeListener')]) == [1.0, 3.0, 4.0]
+    assert timing.p50 == 3.0
+    assert timing.p99 == 4.0
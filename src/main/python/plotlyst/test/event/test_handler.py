@@ -0,0 +1,167 @@
+import gc
+import weakref
+
+from PyQt6.QtCore import QCoreApplication
+
+from plotlyst.core.domain import Scene, NovelSetting, Novel
+from plotlyst.event.core import EventListener, Event, CoalescedEvent
+from plotlyst.event.handler import EventDispatcher, event_dispatchers, dispatch_report
+from plotlyst.events import SceneChangedEvent, SceneDeletedEvent, NovelPanelCustomizationEvent, \
+    NovelManuscriptToggleEvent, NovelCharactersToggleEvent
+
+
+class RecordingListener(EventListener):
+    def __init__(self):
+        self.events = []
+
+    def event_received(self, event: Event):
+        self.events.append(event)
+
+
+def test_coalesced_delivery(qtbot):
+    dispatcher = EventDispatcher()
+    listener = RecordingListener()
+    dispatcher.register(listener, SceneChangedEvent, SceneDeletedEvent, coalesce=True)
+    scene_a = Scene('A')
+    scene_b = Scene('B')
+
+    for scene in [scene_a, scene_b, scene_a, scene_a, scene_b]:
+        dispatcher.dispatch(SceneChangedEvent(None, scene))
+    assert not listener.events
+
+    QCoreApplication.processEvents()
+    assert len(listener.events) == 1
+    event = listener.events[0]
+    assert isinstance(event, CoalescedEvent)
+    assert event.event_type is SceneChangedEvent
+    assert event.events == [SceneChangedEvent(None, scene_a), SceneChangedEvent(None, scene_b)]
+    assert event.values('scene') == [scene_a, scene_b]
+
+    stats = dispatcher.stats()
+    assert stats.events == 5
+    assert stats.coalesced_events == 5
+    assert stats.saved_deliveries == 4
+    assert stats.deliveries == 1
+
+
+def test_coalesced_delivery_per_event_type(qtbot):
+    dispatcher = EventDispatcher()
+    listener = RecordingListener()
+    direct_listener = RecordingListener()
+    dispatcher.register(listener, SceneChangedEvent, SceneDeletedEvent, coalesce=True)
+    dispatcher.register(direct_listener, SceneChangedEvent)
+    scene = Scene('A')
+
+    dispatcher.dispatch(SceneChangedEvent(None, scene))
+    dispatcher.dispatch(SceneDeletedEvent(None, scene))
+    dispatcher.dispatch(SceneChangedEvent(None, scene))
+    assert len(direct_listener.events) == 2
+
+    dispatcher.flush()
+    assert [x.event_type for x in listener.events] == [SceneChangedEvent, SceneDeletedEvent]
+    assert [len(x.events) for x in listener.events] == [1, 1]
+
+    QCoreApplication.processEvents()
+    assert len(listener.events) == 2
+    assert dispatcher.stats().saved_deliveries == 1
+
+
+def test_dispatch_report(qtbot):
+    novel = Novel('Coalesced novel')
+    dispatcher = event_dispatchers.instance(novel)
+    listener = RecordingListener()
+    dispatcher.register(listener, SceneChangedEvent, coalesce=True)
+    scene = Scene('A')
+    for _ in range(3):
+        dispatcher.dispatch(SceneChangedEvent(None, scene))
+    dispatcher.flush()
+
+    try:
+        row = [x for x in dispatch_report().splitlines() if x.startswith('Coalesced novel')]
+        assert row[0].split()[-4:] == ['3', '1', '3', '2']
+    finally:
+        event_dispatchers.pop(novel)
+
+
+def test_plain_listener_released(qtbot):
+    dispatcher = EventDispatcher()
+    scene = Scene('A')
+    listener = RecordingListener()
+    events = listener.events
+    ref = weakref.ref(listener)
+    dispatcher.register(listener, SceneChangedEvent)
+    dispatcher.register(listener, SceneDeletedEvent, coalesce=True)
+    dispatcher.dispatch(SceneDeletedEvent(None, scene))
+    assert dispatcher.listener_count() == 2
+
+    del listener
+    gc.collect()
+    assert ref() is None
+    assert dispatcher.listener_count() == 0
+
+    dispatcher.dispatch(SceneChangedEvent(None, scene))
+    dispatcher.flush()
+    assert not events
+    assert not dispatcher._pending
+
+
+def test_pending_events_released_with_listener(qtbot):
+    dispatcher = EventDispatcher()
+    listener = RecordingListener()
+    ref = weakref.ref(listener)
+    dispatcher.register(listener, SceneChangedEvent, coalesce=True)
+    dispatcher.dispatch(SceneChangedEvent(None, Scene('A')))
+
+    del listener
+    gc.collect()
+    assert ref() is None
+
+    other = RecordingListener()
+    dispatcher.register(other, SceneChangedEvent, coalesce=True)
+    QCoreApplication.processEvents()
+    assert not other.events
+
+
+def test_pending_events_dropped_on_deregister(qtbot):
+    dispatcher = EventDispatcher()
+    listener = RecordingListener()
+    dispatcher.register(listener, SceneChangedEvent, SceneDeletedEvent, coalesce=True)
+    scene = Scene('A')
+    dispatcher.dispatch(SceneChangedEvent(None, scene))
+    dispatcher.dispatch(SceneDeletedEvent(None, scene))
+
+    dispatcher.deregister(listener, SceneChangedEvent)
+    QCoreApplication.processEvents()
+    assert [x.event_type for x in listener.events] == [SceneDeletedEvent]
+
+
+def test_base_class_registration(qtbot):
+    dispatcher = EventDispatcher()
+    listener = RecordingListener()
+    dispatcher.register(listener, NovelPanelCustomizationEvent)
+
+    manuscript = NovelManuscriptToggleEvent(None, NovelSetting.Manuscript, False)
+    characters = NovelCharactersToggleEvent(None, NovelSetting.Characters, True)
+    dispatcher.dispatch(manuscript)
+    dispatcher.dispatch(characters)
+
+    assert listener.events == [manuscript, characters]
+
+
+def test_base_and_subclass_registration_delivered_once(qtbot):
+    dispatcher = EventDispatcher()
+    listener = RecordingListener()
+    dispatcher.register(listener, NovelPanelCustomizationEvent)
+    dispatcher.register(listener, NovelManuscriptToggleEvent, coalesce=True)
+    dispatcher.register(listener, NovelManuscriptToggleEvent)
+
+    manuscript = NovelManuscriptToggleEvent(None, NovelSetting.Manuscript, False)
+    characters = NovelCharactersToggleEvent(None, NovelSetting.Characters, True)
+    dispatcher.dispatch(manuscript)
+    dispatcher.dispatch(characters)
+    assert listener.events == [manuscript, characters]
+    assert dispatcher.stats().deliveries == 2
+
+    QCoreApplication.processEvents()
+    assert len(listener.events) == 3
+    assert listener.events[2].events == [manuscript]
@@ -0,0 +1,38 @@
+"""
+Plotlyst
+Copyright (C) 2021-2024  Zsolt Kovari
+
+This file is part of Plotlyst.
+
+Plotlyst is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Plotlyst is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+from language_tool_python import LanguageTool
+
+from plotlyst.test.common import LanguageToolStubHandler
+
+
+@pytest.fixture
+def stub_tool():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LanguageToolStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    LanguageToolStubHandler.checks = []
+    tool = LanguageTool('en-US', remote_server=f'http://127.0.0.1:{server.server_port}')
+    yield tool
+    server.shutdown()
+    server.server_close()
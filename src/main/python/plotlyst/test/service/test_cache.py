@@ -0,0 +1,190 @@
+import copy
+
+import logging
+
+from plotlyst.core.domain import Novel, Scene, save_the_cat, Character, Location, WorldBuildingEntity
+from plotlyst.events import SceneStoryBeatChangedEvent, SceneOrderChangedEvent, SceneAddedEvent, \
+    SceneDeletedEvent, NovelStoryStructureUpdated, SceneChangedEvent, CharacterChangedEvent, \
+    CharacterDeletedEvent, LocationAddedEvent, LocationDeletedEvent, WorldEntityAddedEvent, \
+    WorldEntityDeletedEvent, ItemLinkedEvent, ItemUnlinkedEvent
+from plotlyst.service.cache import NovelActsRegistry, EntitiesRegistry
+from plotlyst.test.common import novel_with_scenes, dispatch
+
+
+def acts_registry(novel: Novel) -> NovelActsRegistry:
+    registry = NovelActsRegistry()
+    registry.set_novel(novel)
+    return registry
+
+
+def assert_refreshed(registry: NovelActsRegistry, novel: Novel):
+    fresh = NovelActsRegistry()
+    fresh.novel = novel
+    fresh.refresh()
+    assert [registry.act(x) for x in novel.scenes] == [fresh.act(x) for x in novel.scenes]
+    assert registry.occupied_beats() == fresh.occupied_beats()
+    for beat in fresh.occupied_beats():
+        assert registry.scene(beat) is fresh.scene(beat)
+
+
+def act_ending_beats(novel: Novel):
+    return [x for x in novel.active_story_structure.beats if x.ends_act]
+
+
+def test_beat_linked_and_unlinked(test_client):
+    novel = novel_with_scenes()
+    registry = acts_registry(novel)
+    assert [registry.act(x) for x in novel.scenes] == [1] * 8
+
+    first_act_end, second_act_end = act_ending_beats(novel)[:2]
+    novel.scenes[2].link_beat(novel.active_story_structure, first_act_end)
+    dispatch(novel, SceneStoryBeatChangedEvent(None, novel.scenes[2], first_act_end, True))
+    assert [registry.act(x) for x in novel.scenes] == [1, 1, 1, 2, 2, 2, 2, 2]
+    assert registry.scene(first_act_end) is novel.scenes[2]
+
+    novel.scenes[5].link_beat(novel.active_story_structure, second_act_end)
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[5]))
+    assert [registry.act(x) for x in novel.scenes] == [1, 1, 1, 2, 2, 2, 3, 3]
+    assert_refreshed(registry, novel)
+
+    novel.scenes[2].remove_beat(novel)
+    dispatch(novel, SceneStoryBeatChangedEvent(None, novel.scenes[2], first_act_end, False))
+    assert not registry.occupied(first_act_end)
+    assert_refreshed(registry, novel)
+
+
+def test_scenes_reordered_added_and_deleted(test_client):
+    novel = novel_with_scenes()
+    registry = acts_registry(novel)
+    first_act_end = act_ending_beats(novel)[0]
+    novel.scenes[4].link_beat(novel.active_story_structure, first_act_end)
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[4]))
+
+    novel.scenes.insert(1, novel.scenes.pop(4))
+    dispatch(novel, SceneOrderChangedEvent(None))
+    assert [registry.act(x) for x in novel.scenes] == [1, 1, 2, 2, 2, 2, 2, 2]
+    assert_refreshed(registry, novel)
+
+    scene = Scene('New scene')
+    novel.scenes.insert(0, scene)
+    dispatch(novel, SceneAddedEvent(None, scene))
+    assert registry.act(scene) == 1
+    assert_refreshed(registry, novel)
+
+    removed = novel.scenes.pop(2)
+    dispatch(novel, SceneDeletedEvent(None, removed))
+    assert not registry.occupied(first_act_end)
+    assert_refreshed(registry, novel)
+
+
+def test_structure_switched(test_client):
+    novel = novel_with_scenes()
+    cat = copy.deepcopy(save_the_cat)
+    novel.story_structures.append(cat)
+    registry = acts_registry(novel)
+
+    three_act = novel.active_story_structure
+    novel.scenes[5].link_beat(three_act, act_ending_beats(novel)[0])
+    novel.scenes[1].link_beat(cat, [x for x in cat.beats if x.ends_act][0])
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[5]))
+    assert [registry.act(x) for x in novel.scenes] == [1, 1, 1, 1, 1, 1, 2, 2]
+
+    three_act.active = False
+    cat.active = True
+    dispatch(novel, NovelStoryStructureUpdated(None))
+    assert [registry.act(x) for x in novel.scenes] == [1, 1, 2, 2, 2, 2, 2, 2]
+    assert_refreshed(registry, novel)
+
+
+def test_beat_edited(test_client):
+    novel = novel_with_scenes()
+    registry = acts_registry(novel)
+    beat = act_ending_beats(novel)[0]
+    novel.scenes[1].link_beat(novel.active_story_structure, beat)
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[1]))
+    assert registry.act(novel.scenes[2]) == 2
+
+    beat.ends_act = False
+    dispatch(novel, NovelStoryStructureUpdated(None))
+    assert registry.act(novel.scenes[2]) == 1
+    assert_refreshed(registry, novel)
+
+
+def entities_registry(novel: Novel) -> EntitiesRegistry:
+    registry = EntitiesRegistry()
+    registry.set_novel(novel)
+    return registry
+
+
+def test_entities_registry_deltas(test_client):
+    novel = novel_with_scenes()
+    registry = entities_registry(novel)
+    assert registry.verify()
+
+    joe = Character('Joe')
+    jane = Character('Jane')
+    novel.characters.extend([joe, jane])
+    dispatch(novel, CharacterChangedEvent(None, joe))
+    assert registry.character(str(jane.id)) is jane
+    assert registry.verify()
+
+    novel.characters.remove(joe)
+    dispatch(novel, CharacterDeletedEvent(None, joe))
+    assert registry.character(str(joe.id)) is None
+    assert registry.verify()
+
+    street = Location('Street')
+    district = Location('District', children=[street])
+    city = Location('City', children=[district])
+    novel.locations.append(city)
+    dispatch(novel, LocationAddedEvent(None, city))
+    assert registry.location(str(street.id)) is street
+    assert registry.verify()
+
+    town = WorldBuildingEntity('Town', ref=district.id)
+    region = WorldBuildingEntity('Region', ref=city.id, children=[town])
+    novel.world.root_entity.children.append(region)
+    dispatch(novel, WorldEntityAddedEvent(None, region))
+    assert registry.refs(city) == [region]
+    assert registry.refs(district) == [town]
+    assert registry.verify()
+
+    tavern = WorldBuildingEntity('Tavern')
+    town.children.append(tavern)
+    tavern.ref = street.id
+    dispatch(novel, ItemLinkedEvent(None, tavern))
+    assert registry.refs(street) == [tavern]
+    assert registry.verify()
+
+    tavern.ref = None
+    dispatch(novel, ItemUnlinkedEvent(None, tavern, street.id))
+    assert registry.refs(street) == []
+    assert registry.verify()
+
+    novel.world.root_entity.children.remove(region)
+    dispatch(novel, WorldEntityDeletedEvent(None, region))
+    assert registry.refs(city) == []
+    assert registry.refs(district) == []
+    assert registry.verify()
+
+    novel.locations.remove(city)
+    dispatch(novel, LocationDeletedEvent(None, city))
+    assert registry.location(str(district.id)) is None
+    assert registry.verify()
+
+
+def test_entities_registry_verify_rebuilds(test_client, caplog):
+    novel = novel_with_scenes()
+    location = Location('Harbor')
+    novel.locations.append(location)
+    registry = entities_registry(novel)
+    ghost = Character('Ghost')
+    registry._locations.clear()
+    registry._characters[str(ghost.id)] = ghost
+
+    with caplog.at_level(logging.ERROR):
+        assert not registry.verify()
+    assert 'Entities registry is inconsistent' in caplog.text
+    assert registry.location(str(location.id)) is location
+    assert registry.character(str(ghost.id)) is None
+    assert registry.verify()
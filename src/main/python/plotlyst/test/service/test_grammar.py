@@ -0,0 +1,58 @@
+from plotlyst.service.grammar import GrammarChecker, GRAMMAR_BATCH_LIMIT
+from plotlyst.test.common import LanguageToolStubHandler
+
+
+def _offsets(matches):
+    return [(m.offset, m.errorLength) for m in matches]
+
+
+def _issue_offsets(issues):
+    return [(x.offset, x.length) for x in issues]
+
+
+def test_batch_matches_split_to_paragraphs(stub_tool):
+    paragraphs = [f'Paragraph {i} has xxerror{i} and xxanother.' if i % 3 else f'Clean paragraph {i}.'
+                  for i in range(40)]
+    checker = GrammarChecker(tool=stub_tool)
+    keys = [checker.key(x) for x in paragraphs]
+
+    checker.check(list(zip(keys, paragraphs)))
+    assert len(LanguageToolStubHandler.checks) == 1
+
+    for key, text in zip(keys, paragraphs):
+        issues = checker.issues(key)
+        assert _issue_offsets(issues) == _offsets(stub_tool.check(text))
+        for issue in issues:
+            assert text[issue.offset:issue.offset + issue.length].startswith('xx')
+
+
+def test_queued_paragraphs_are_batched(qtbot, stub_tool):
+    paragraphs = [f'Paragraph {i} is long enough to matter with xxtypo{i} in the middle of it. ' * 2
+                  for i in range(300)]
+    paragraphs.append('Emoji 😀 before xxtypo shifts the offsets.')
+    checker = GrammarChecker(tool=stub_tool)
+    keys = [checker.key(x) for x in paragraphs]
+    for key, text in zip(keys, paragraphs):
+        checker.request(key, text)
+
+    qtbot.waitUntil(lambda: all(checker.issues(x) is not None for x in keys), timeout=10000)
+
+    checks = LanguageToolStubHandler.checks
+    assert len(checks) < len(paragraphs) // 10
+    assert all(len(x) <= GRAMMAR_BATCH_LIMIT for x in checks)
+    for key, text in zip(keys, paragraphs):
+        assert _issue_offsets(checker.issues(key)) == _offsets(stub_tool.check(text))
+
+
+def test_cached_and_discarded_paragraphs_are_not_sent(qtbot, stub_tool):
+    checker = GrammarChecker(tool=stub_tool)
+    text = 'A paragraph with xxtypo.'
+    key = checker.key(text)
+    checker.check([(key, text)])
+    checker.request(key, text)
+    assert len(LanguageToolStubHandler.checks) == 1
+
+    checker.discard(key)
+    with qtbot.waitSignal(checker.checked, timeout=5000):
+        checker.request(checker.key('First.'), 'First.')
+    assert LanguageToolStubHandler.checks[1:] == ['First.']
@@ -0,0 +1,83 @@
+import threading
+
+from PyQt6.QtCore import QTimer
+
+from plotlyst.core.client import client, json_client
+from plotlyst.core.journal import OperationJournal
+from plotlyst.env import app_env
+from plotlyst.service import persistence
+from plotlyst.service.persistence import RepositoryPersistenceManager
+from plotlyst.test.conftest import init_project
+
+
+def journal_entries():
+    return list(OperationJournal(json_client.root_path.joinpath('journal')).entries())
+
+
+def journaling_repo(monkeypatch) -> RepositoryPersistenceManager:
+    repo = RepositoryPersistenceManager()
+    monkeypatch.setattr(app_env, 'test_env', lambda: False)
+    return repo
+
+
+def test_queued_changes_journaled_together(qtbot, test_client, monkeypatch):
+    novel = init_project()
+    repo = journaling_repo(monkeypatch)
+
+    for i in range(10):
+        novel.scenes[0].synopsis = f'Synopsis {i}'
+        repo.update_scene(novel.scenes[0])
+    assert not journal_entries()
+
+    qtbot.waitUntil(lambda: len(journal_entries()) > 0)
+    entries = journal_entries()
+    assert len(entries) == 1
+    assert 'Synopsis 9' in entries[0].data
+
+    json_client.init(json_client.root_path)
+    assert client.fetch_novel(novel.id).scenes[0].synopsis == 'Synopsis 9'
+
+
+def test_journal_discarded_after_repo_flush(qtbot, test_client, monkeypatch):
+    novel = init_project()
+    repo = journaling_repo(monkeypatch)
+
+    novel.scenes[0].synopsis = 'Flushed synopsis'
+    repo.update_scene(novel.scenes[0])
+    qtbot.waitUntil(lambda: len(journal_entries()) > 0)
+
+    assert repo.flush(sync=True)
+    assert not journal_entries()
+    assert client.fetch_novel(novel.id).scenes[0].synopsis == 'Flushed synopsis'
+
+
+def test_sync_flush_failure_reported(test_client, monkeypatch):
+    novel = init_project()
+    repo = journaling_repo(monkeypatch)
+
+    def fail(operations, step=None):
+        raise IOError('Disk full')
+
+    monkeypatch.setattr(persistence, '_persist_operations', fail)
+    repo.update_scene(novel.scenes[0])
+    assert not repo.flush(sync=True)
+
+
+def test_flush_wait_processes_events(qtbot, test_client, monkeypatch):
+    novel = init_project()
+    repo = journaling_repo(monkeypatch)
+    released = threading.Event()
+
+    def blocked(operations, step=None):
+        assert released.wait(5)
+        for _ in operations:
+            step()
+
+    monkeypatch.setattr(persistence, '_persist_operations', blocked)
+    repo.update_scene(novel.scenes[0])
+    repo.flush()
+
+    QTimer.singleShot(10, released.set)
+    reported = []
+    assert repo.flush(sync=True, progress=lambda done, total: reported.append((done, total)), timeout=2)
+    assert reported[-1] == (1, 1)
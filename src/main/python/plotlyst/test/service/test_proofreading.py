@@ -0,0 +1,121 @@
+from plotlyst.core.client import json_client
+from plotlyst.core.domain import Novel, Scene, Document, Chapter, DocumentStatistics
+from plotlyst.env import app_env
+from plotlyst.service import proofreading
+from plotlyst.service.grammar import grammar_checker, language_tool_proxy
+from plotlyst.service.proofreading import ProofreadingJob
+from plotlyst.service.statistics import novel_statistics
+from plotlyst.test.common import LanguageToolStubHandler
+
+
+def _novel() -> Novel:
+    novel = Novel(title='Proofreading')
+    json_client.insert_novel(novel)
+    for i in range(3):
+        scene = Scene(f'Scene {i}')
+        scene.manuscript = Document('', scene_id=scene.id)
+        scene.manuscript.content = f'<p>Scene {i} has xxtypo here.</p><p>And xxanother in scene {i}.</p><p>Clean.</p>'
+        json_client.update_document(novel, scene.manuscript)
+        scene.manuscript.loaded = False
+        novel.scenes.append(scene)
+
+    return novel
+
+
+def _proofread(qtbot, job: ProofreadingJob, novel: Novel):
+    job.set_novel(novel)
+    qtbot.waitUntil(lambda: not job.is_running(), timeout=10000)
+
+
+def test_proofreading_is_stored_and_resumed(qtbot, test_client, stub_tool, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_env, '_plotlyst_cache_dir', str(tmp_path))
+    monkeypatch.setattr(language_tool_proxy, '_language_tool', stub_tool)
+    monkeypatch.setattr(proofreading, 'PROOFREADING_INTERVAL', 10)
+    grammar_checker.clear()
+    novel = _novel()
+    writes = []
+    write = ProofreadingJob._write
+
+    def counted_write(job: ProofreadingJob):
+        writes.append(job.novel)
+        write(job)
+
+    monkeypatch.setattr(ProofreadingJob, '_write', counted_write)
+
+    _proofread(qtbot, ProofreadingJob(), novel)
+    assert len(LanguageToolStubHandler.checks) == 3
+    assert tmp_path.joinpath('proofreading', f'{novel.id}.json').exists()
+    assert writes == [novel]
+
+    LanguageToolStubHandler.checks.clear()
+    grammar_checker.clear()
+    novel.scenes[1].manuscript.content = '<p>Edited xxscene with xxtwo xxtypos.</p>'
+    job = ProofreadingJob()
+    _proofread(qtbot, job, novel)
+    assert LanguageToolStubHandler.checks == ['Edited xxscene with xxtwo xxtypos.']
+    assert [job.issues(x) for x in novel.scenes] == [2, 3, 2]
+    assert grammar_checker.issues(grammar_checker.key('And xxanother in scene 0.')) is not None
+
+
+def test_proofreading_stored_on_stop(qtbot, test_client, stub_tool, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_env, '_plotlyst_cache_dir', str(tmp_path))
+    monkeypatch.setattr(language_tool_proxy, '_language_tool', stub_tool)
+    monkeypatch.setattr(proofreading, 'PROOFREADING_INTERVAL', 10)
+    monkeypatch.setattr(proofreading, 'PROOFREADING_SAVE_INTERVAL', 60000)
+    grammar_checker.clear()
+    novel = _novel()
+
+    job = ProofreadingJob()
+    with qtbot.waitSignal(job.sceneProofread, timeout=10000):
+        job.set_novel(novel)
+    job.stop()
+    assert not job.is_running()
+
+    resumed = ProofreadingJob()
+    resumed.novel = novel
+    assert resumed._read().scenes
+
+
+def test_scene_proofread_again_after_eviction(qtbot, test_client, stub_tool, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_env, '_plotlyst_cache_dir', str(tmp_path))
+    monkeypatch.setattr(language_tool_proxy, '_language_tool', stub_tool)
+    monkeypatch.setattr(proofreading, 'PROOFREADING_INTERVAL', 10)
+    grammar_checker.clear()
+    novel = _novel()
+    clean_key = grammar_checker.key('Clean.')
+    issues = grammar_checker.issues
+    evicted = []
+
+    def evicted_once(key: bytes):
+        result = issues(key)
+        if key == clean_key and result is not None and not evicted:
+            evicted.append(key)
+            return None
+        return result
+
+    monkeypatch.setattr(grammar_checker, 'issues', evicted_once)
+    job = ProofreadingJob()
+    _proofread(qtbot, job, novel)
+    assert evicted
+    assert [job.issues(x) for x in novel.scenes] == [2, 2, 2]
+    assert all(job.scene(x) for x in novel.scenes)
+
+
+def test_chapter_density(qtbot, test_client, stub_tool, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_env, '_plotlyst_cache_dir', str(tmp_path))
+    monkeypatch.setattr(language_tool_proxy, '_language_tool', stub_tool)
+    monkeypatch.setattr(proofreading, 'PROOFREADING_INTERVAL', 10)
+    grammar_checker.clear()
+    novel = _novel()
+    first, second, empty = Chapter('Chapter 1'), Chapter('Chapter 2'), Chapter('Chapter 3')
+    novel.chapters.extend([first, second, empty])
+    for scene, chapter, wc in zip(novel.scenes, [first, first, second], [200, 200, 1000]):
+        novel.assign_chapter(scene, chapter)
+        scene.manuscript.statistics = DocumentStatistics(wc)
+    novel_statistics.set_novel(novel)
+
+    job = ProofreadingJob()
+    _proofread(qtbot, job, novel)
+    assert job.chapter_density(first) == 10
+    assert job.chapter_density(second) == 2
+    assert job.chapter_density(empty) == 0
@@ -0,0 +1,160 @@
+from plotlyst.core.domain import Novel, Scene, Chapter, Character, Plot, Document, DocumentStatistics, \
+    ScenePlotReference
+from plotlyst.events import SceneChangedEvent, SceneOrderChangedEvent, ChapterChangedEvent, \
+    SceneStoryBeatChangedEvent, SceneDeletedEvent, NovelStoryStructureUpdated
+from plotlyst.service.cache import acts_registry
+from plotlyst.service.statistics import NovelStatistics
+from plotlyst.test.common import novel_with_scenes, dispatch
+
+
+def novel_with_manuscripts(count: int = 6) -> Novel:
+    novel = novel_with_scenes(count)
+    novel.chapters.append(Chapter('Chapter 2'))
+    for i, scene in enumerate(novel.scenes):
+        scene.manuscript = Document('', statistics=DocumentStatistics((i + 1) * 100))
+        novel.assign_chapter(scene, novel.chapters[0] if i < count // 2 else novel.chapters[1])
+    return novel
+
+
+def statistics(novel: Novel) -> NovelStatistics:
+    acts_registry.set_novel(novel)
+    stats = NovelStatistics()
+    stats.set_novel(novel)
+    return stats
+
+
+def set_wc(scene: Scene, wc: int):
+    scene.manuscript.statistics.wc = wc
+
+
+def assert_refreshed(stats: NovelStatistics, novel: Novel):
+    fresh = NovelStatistics()
+    fresh.novel = novel
+    fresh.refresh()
+    assert stats.total() == fresh.total()
+    for scene in novel.scenes:
+        assert stats.scene(scene) == fresh.scene(scene)
+    for chapter in novel.chapters:
+        assert stats.chapter(chapter) == fresh.chapter(chapter)
+    for character in novel.characters:
+        assert stats.pov(character) == fresh.pov(character)
+    for plot in novel.plots:
+        assert stats.plot(plot) == fresh.plot(plot)
+    for act in [1, 2, 3]:
+        assert stats.act(act) == fresh.act(act)
+
+
+def test_word_count_changed(test_client):
+    novel = novel_with_manuscripts()
+    stats = statistics(novel)
+    c1, c2 = novel.chapters
+    assert stats.total() == 2100
+    assert stats.chapter(c1) == 600
+    assert stats.chapter(c2) == 1500
+
+    set_wc(novel.scenes[0], 150)
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[0]))
+    assert stats.scene(novel.scenes[0]) == 150
+    assert stats.total() == 2150
+    assert stats.chapter(c1) == 650
+    assert stats.act(1) == 2150
+    assert_refreshed(stats, novel)
+
+    set_wc(novel.scenes[5], 0)
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[5]))
+    assert stats.chapter(c2) == 900
+    assert_refreshed(stats, novel)
+
+
+def test_pov_and_plot_reassigned(test_client):
+    novel = novel_with_manuscripts()
+    stats = statistics(novel)
+    character = Character('Joe')
+    other = Character('Jane')
+    novel.characters.extend([character, other])
+    plot = novel.plots[0]
+    subplot = Plot('Subplot')
+    novel.plots.append(subplot)
+
+    novel.scenes[1].pov = character
+    novel.scenes[1].plot_values.append(ScenePlotReference(plot))
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[1]))
+    assert stats.pov(character) == 200
+    assert stats.plot(plot) == 200
+
+    novel.scenes[1].pov = other
+    novel.scenes[1].plot_values[0] = ScenePlotReference(subplot)
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[1]))
+    assert stats.pov(character) == 0
+    assert stats.pov(other) == 200
+    assert stats.plot(plot) == 0
+    assert stats.plot(subplot) == 200
+    assert_refreshed(stats, novel)
+
+
+def test_scene_moved_to_other_chapter(test_client):
+    novel = novel_with_manuscripts()
+    stats = statistics(novel)
+    c1, c2 = novel.chapters
+
+    scene = novel.scenes.pop(0)
+    novel.scenes.insert(4, scene)
+    novel.assign_chapter(scene, c2)
+    dispatch(novel, SceneOrderChangedEvent(None))
+    assert stats.chapter(c1) == 500
+    assert stats.chapter(c2) == 1600
+    assert_refreshed(stats, novel)
+
+
+def test_chapter_deleted(test_client):
+    novel = novel_with_manuscripts()
+    stats = statistics(novel)
+    c1, c2 = novel.chapters
+
+    for scene in novel.scenes_in_chapter(c1):
+        novel.assign_chapter(scene, None)
+    novel.chapters.remove(c1)
+    dispatch(novel, ChapterChangedEvent(None))
+    assert stats.chapter(c1) == 0
+    assert stats.chapter(c2) == 1500
+    assert stats.total() == 2100
+    assert_refreshed(stats, novel)
+
+
+def test_act_totals(test_client):
+    novel = novel_with_manuscripts()
+    stats = statistics(novel)
+    first_act_end, second_act_end = [x for x in novel.active_story_structure.beats if x.ends_act][:2]
+
+    novel.scenes[1].link_beat(novel.active_story_structure, first_act_end)
+    dispatch(novel, SceneStoryBeatChangedEvent(None, novel.scenes[1], first_act_end, True))
+    novel.scenes[3].link_beat(novel.active_story_structure, second_act_end)
+    dispatch(novel, SceneStoryBeatChangedEvent(None, novel.scenes[3], second_act_end, True))
+    assert [stats.act(x) for x in [1, 2, 3]] == [300, 700, 1100]
+
+    set_wc(novel.scenes[2], 0)
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[2]))
+    assert [stats.act(x) for x in [1, 2, 3]] == [300, 400, 1100]
+
+    removed = novel.scenes.pop(0)
+    dispatch(novel, SceneDeletedEvent(None, removed))
+    assert [stats.act(x) for x in [1, 2, 3]] == [200, 400, 1100]
+    assert_refreshed(stats, novel)
+
+
+def test_act_totals_after_structure_updated(test_client):
+    novel = novel_with_manuscripts()
+    stats = statistics(novel)
+    first_act_end = [x for x in novel.active_story_structure.beats if x.ends_act][0]
+    novel.scenes[1].link_beat(novel.active_story_structure, first_act_end)
+    dispatch(novel, SceneStoryBeatChangedEvent(None, novel.scenes[1], first_act_end, True))
+    assert [stats.act(x) for x in [1, 2]] == [300, 1800]
+
+    first_act_end.ends_act = False
+    dispatch(novel, NovelStoryStructureUpdated(None))
+    assert [stats.act(x) for x in [1, 2]] == [2100, 0]
+
+    set_wc(novel.scenes[4], 0)
+    dispatch(novel, SceneChangedEvent(None, novel.scenes[4]))
+    assert stats.act(1) == 1600
+    assert_refreshed(stats, novel)
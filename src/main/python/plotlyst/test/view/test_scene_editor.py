@@ -1,4 +1,10 @@
+import gc
+
+from PyQt6.QtCore import QCoreApplication, QEvent
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+
 from plotlyst.core.domain import Novel, default_story_structures
+from plotlyst.event.handler import event_dispatchers
 from plotlyst.view.scene_editor import SceneEditor
 from plotlyst.view.stylesheet import APP_STYLESHEET
 
@@ -23,3 +29,47 @@ def test_editor_with_new_scene(qtbot):
     view.set_scene(scene)
 
     assert view.ui.wdgPov.btnAvatar.text() == 'POV'
+
+
+def test_editor_listeners_released(qtbot):
+    novel = Novel('Test-novel', story_structures=default_story_structures)
+    novel.story_structures[0].active = True
+    scene = novel.new_scene()
+    novel.scenes.append(scene)
+    dispatcher = event_dispatchers.instance(novel)
+
+    counts = []
+    for _ in range(5):
+        view = SceneEditor(novel)
+        view.set_scene(scene)
+        view.widget.deleteLater()
+        del view
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        gc.collect()
+        counts.append(dispatcher.listener_count())
+
+    assert counts == [counts[0]] * len(counts)
+
+
+def test_editor_listeners_released_without_delete(qtbot):
+    novel = Novel('Test-novel', story_structures=default_story_structures)
+    novel.story_structures[0].active = True
+    scene = novel.new_scene()
+    novel.scenes.append(scene)
+    dispatcher = event_dispatchers.instance(novel)
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    qtbot.addWidget(container)
+
+    counts = []
+    for _ in range(5):
+        view = SceneEditor(novel)
+        layout.addWidget(view.widget)
+        view.set_scene(scene)
+        layout.removeWidget(view.widget)
+        view.widget.setParent(None)
+        del view
+        gc.collect()
+        counts.append(dispatcher.listener_count())
+
+    assert counts == [counts[0]] * len(counts)
@@ -1,7 +1,9 @@
 from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QTextCursor
 
+from plotlyst.core.text import wc
 from plotlyst.test.common import show_widget
-from plotlyst.view.widget.input import PowerBar, Toggle
+from plotlyst.view.widget.input import PowerBar, Toggle, TextEditBase
 
 
 def test_powerbar(qtbot):
@@ -25,3 +27,48 @@ def test_toggle(qtbot):
 
     qtbot.mouseClick(toggle, Qt.MouseButton.LeftButton)
     assert not toggle.isChecked()
+
+
+def test_block_statistics(qtbot):
+    textedit = TextEditBase()
+    show_widget(qtbot, textedit)
+
+    def cursor_at(block: int, offset: int = 0) -> QTextCursor:
+        cursor = QTextCursor(textedit.document().findBlockByNumber(block))
+        cursor.movePosition(QTextCursor.MoveOperation.Right, n=offset)
+        return cursor
+
+    def assert_word_count():
+        assert textedit.statistics().word_count == wc(textedit.toPlainText())
+
+    textedit.setHtml('<p>One two three.</p><p>Four five.</p><p>Six seven eight nine.</p>')
+    assert textedit.statistics().word_count == 9
+
+    cursor_at(0, 4).insertBlock()
+    assert_word_count()
+    cursor_at(1).deletePreviousChar()
+    assert_word_count()
+
+    cursor = cursor_at(1, 3)
+    cursor.movePosition(QTextCursor.MoveOperation.NextBlock, QTextCursor.MoveMode.KeepAnchor)
+    cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor, 4)
+    cursor.removeSelectedText()
+    assert textedit.statistics().word_count == 6
+    assert_word_count()
+
+    cursor_at(0).insertText('Ten eleven ')
+    assert textedit.statistics().word_count == 8
+
+    while textedit.document().isUndoAvailable():
+        textedit.undo()
+        assert_word_count()
+    assert textedit.statistics().word_count == 9
+    while textedit.document().isRedoAvailable():
+        textedit.redo()
+        assert_word_count()
+    assert textedit.statistics().word_count == 8
+
+    textedit.setHtml('<p>Twelve.</p>')
+    assert textedit.statistics().word_count == 1
+    textedit.clear()
+    assert textedit.statistics().word_count == 0
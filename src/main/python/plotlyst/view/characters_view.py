@@ -76,9 +76,7 @@ class CharactersTitle(QWidget, Ui_CharactersTitle, EventListener):
         self.refresh()
 
         dispatcher = event_dispatchers.instance(self.novel)
-        dispatcher.register(self, CharacterChangedEvent)
-        dispatcher.register(self, CharacterDeletedEvent)
-        dispatcher.register(self, NovelSyncEvent)
+        dispatcher.register(self, CharacterChangedEvent, CharacterDeletedEvent, NovelSyncEvent, coalesce=True)
 
     @overrides
     def event_received(self, event: Event):
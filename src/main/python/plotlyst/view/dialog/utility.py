@@ -23,10 +23,13 @@ from typing import Optional
 from PyQt6 import QtGui
 from PyQt6.QtCore import Qt, QSize, QEvent, QPoint, QRect, pyqtSignal
 from PyQt6.QtGui import QPixmap, QIcon, QPainter
-from PyQt6.QtWidgets import QDialog, QToolButton, QPushButton, QApplication
+from PyQt6.QtWidgets import QDialog, QToolButton, QPushButton, QApplication, QPlainTextEdit, QVBoxLayout, \
+    QDialogButtonBox
 from overrides import overrides
 from qthandy import bold, underline
 
+from plotlyst.event.core import event_profiler
+from plotlyst.event.handler import dispatch_report
 from plotlyst.view.common import rounded_pixmap, calculate_resized_dimensions
 from plotlyst.view.generated.image_crop_dialog_ui import Ui_ImageCropDialog
 
@@ -171,3 +174,37 @@ class ImageCropDialog(QDialog, Ui_ImageCropDialog):
         def mouseReleaseEvent(self, event: QtGui.QMouseEvent) -> None:
             self._pressedPoint = None
             self.cropped.emit()
+
+
+class EventProfilerDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Event listeners')
+        self.resize(900, 500)
+
+        self.textReport = QPlainTextEdit()
+        self.textReport.setReadOnly(True)
+        self.textReport.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        font = self.textReport.font()
+        font.setFamily('Courier New')
+        self.textReport.setFont(font)
+
+        self.btnBox = QDialogButtonBox(QDialogButtonBox.StandardButton.Reset | QDialogButtonBox.StandardButton.Close)
+        self.btnBox.rejected.connect(self.reject)
+        self.btnBox.button(QDialogButtonBox.StandardButton.Reset).clicked.connect(self._reset)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.textReport)
+        layout.addWidget(self.btnBox)
+
+        self._refresh()
+
+    def display(self):
+        self.exec()
+
+    def _refresh(self):
+        self.textReport.setPlainText(f'{event_profiler.report()}\n\n{dispatch_report()}')
+
+    def _reset(self):
+        event_profiler.reset()
+        self._refresh()
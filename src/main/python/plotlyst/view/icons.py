@@ -29,6 +29,7 @@ from plotlyst.common import CONFLICT_CHARACTER_COLOR, \
     CONFLICT_SELF_COLOR, CHARACTER_MAJOR_COLOR, CHARACTER_MINOR_COLOR, CHARACTER_SECONDARY_COLOR, \
     PLOTLYST_SECONDARY_COLOR, PLOTLYST_MAIN_COLOR, NEUTRAL_EMOTION_COLOR, EMOTION_COLORS, RED_COLOR, act_color, \
     BLACK_COLOR
+from plotlyst.core.client import json_client
 from plotlyst.core.domain import Character, ConflictType, \
     Scene, PlotType, MALE, FEMALE, TRANSGENDER, NON_BINARY, GENDERLESS, ScenePurposeType, StoryStructure
 from plotlyst.core.template import SelectionItem
@@ -766,7 +767,7 @@ class AvatarsRegistry:
         self._images: Dict[Character, QPixmap] = {}
 
     def avatar(self, character: Character, fallback: bool = True) -> QIcon:
-        if character.prefs.avatar.use_image and character.avatar:
+        if character.prefs.avatar.use_image and character.has_avatar():
             return QIcon(self.image(character))
         elif character.prefs.avatar.use_role and character.role:
             return IconRegistry.from_name(character.role.icon, character.role.icon_color)
@@ -785,10 +786,11 @@ class AvatarsRegistry:
             return self._images[character]
 
         pixmap = QPixmap()
-        if not character.avatar:
+        avatar = json_client.load_avatar(character)
+        if not avatar:
             return pixmap
 
-        pixmap.loadFromData(character.avatar)
+        pixmap.loadFromData(avatar)
         rounded = rounded_pixmap(pixmap)
         self._images[character] = rounded
 
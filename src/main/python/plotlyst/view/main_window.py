@@ -17,6 +17,9 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import logging
+import os
+import uuid
 from functools import partial
 from typing import Optional, List
 
@@ -40,9 +43,9 @@ from plotlyst.core.domain import Novel, NovelPanel, ScenesView, NovelSetting, No
 from plotlyst.core.text import sentence_count
 from plotlyst.env import app_env, open_location
 from plotlyst.event.core import event_log_reporter, EventListener, Event, global_event_sender, \
-    emit_info, event_senders, EventSender
+    emit_info, event_senders, EventSender, event_profiler, emit_critical
 from plotlyst.event.handler import EventLogHandler, global_event_dispatcher, event_dispatchers, \
-    EventDispatcher
+    EventDispatcher, dispatch_report
 from plotlyst.events import NovelDeletedEvent, \
     NovelUpdatedEvent, OpenDistractionFreeMode, ExitDistractionFreeMode, CloseNovelEvent, NovelPanelCustomizationEvent, \
     NovelWorldBuildingToggleEvent, NovelCharactersToggleEvent, NovelScenesToggleEvent, NovelDocumentsToggleEvent, \
@@ -52,11 +55,13 @@ from plotlyst.service.cache import acts_registry, entities_registry
 from plotlyst.service.common import try_shutdown_to_apply_change
 from plotlyst.service.dir import select_new_project_directory
 from plotlyst.service.grammar import LanguageToolServerSetupWorker, dictionary, language_tool_proxy
-from plotlyst.service.importer import ScrivenerSyncImporter
+from plotlyst.service.importer import ScrivenerSyncImporter, NovelLoaderWorker, NovelLoadingResult
 from plotlyst.service.migration import migrate_novel
 from plotlyst.service.persistence import RepositoryPersistenceManager, flush_or_fail
+from plotlyst.service.proofreading import proofreading_job
 from plotlyst.service.resource import download_resource, download_nltk_resources, ResourceManagerDialog
 from plotlyst.service.snapshot import SocialSnapshotPopup
+from plotlyst.service.statistics import novel_statistics
 from plotlyst.service.tour import TourService
 from plotlyst.settings import settings
 from plotlyst.view._view import AbstractView
@@ -64,6 +69,7 @@ from plotlyst.view.board_view import BoardView
 from plotlyst.view.characters_view import CharactersView
 from plotlyst.view.common import TooltipPositionEventFilter, ButtonPressResizeEventFilter, open_url, action
 from plotlyst.view.dialog.about import AboutDialog
+from plotlyst.view.dialog.utility import EventProfilerDialog
 from plotlyst.view.dialog.novel import DetachedWindow
 from plotlyst.view.docs_view import DocumentsView
 from plotlyst.view.generated.main_window_ui import Ui_MainWindow
@@ -128,19 +134,11 @@ class MainWindow(QMainWindow, Ui_MainWindow, EventListener):
         self._actionSeries: Optional[QAction] = None
         self._actionSettings: Optional[QAction] = None
         self._actionProgress: Optional[QAction] = None
+        self._novelLoading: Optional[NovelLoadingResult] = None
+        last_novel: Optional[NovelDescriptor] = None
         last_novel_id = settings.last_novel_id()
         if last_novel_id is not None:
-            has_novel = client.has_novel(last_novel_id)
-            if has_novel:
-                self.novel = client.fetch_novel(last_novel_id)
-
-        if self.novel:
-            migrate_novel(self.novel)
-
-            acts_registry.set_novel(self.novel)
-            entities_registry.set_novel(self.novel)
-            dictionary.set_novel(self.novel)
-            app_env.novel = self.novel
+            last_novel = next((x for x in client.novels() if x.id == last_novel_id), None)
 
         self.home_view = HomeView()
         self.pageHome.layout().addWidget(self.home_view.widget)
@@ -205,8 +203,8 @@ class MainWindow(QMainWindow, Ui_MainWindow, EventListener):
             download_resource(ResourceType.JRE_8)
             download_resource(ResourceType.PANDOC)
 
-        if self.novel:
-            self._language_tool_setup_worker.lang = self.novel.lang_settings.lang
+        if last_novel:
+            self._language_tool_setup_worker.lang = last_novel.lang_settings.lang
         if not app_env.test_env():
             if resource_manager.has_resource(ResourceType.JRE_8):
                 emit_info('Start initializing grammar checker...')
@@ -214,8 +212,12 @@ class MainWindow(QMainWindow, Ui_MainWindow, EventListener):
 
             QApplication.instance().installEventFilter(CapitalizationEventFilter(self))
 
+        if last_novel:
+            self._fetch_novel(last_novel.id)
+
     @overrides
     def closeEvent(self, event: QCloseEvent) -> None:
+        proofreading_job.stop()
         if language_tool_proxy.is_set():
             language_tool_proxy.tool.close()
 
@@ -246,7 +248,23 @@ class MainWindow(QMainWindow, Ui_MainWindow, EventListener):
             if language_tool_proxy.is_set():
                 language_tool_proxy.tool.close()
 
-        flush_or_fail()
+        progress = QProgressDialog('Saving changes...', '', 0, 0, parent=self.centralwidget)
+        progress.setCancelButton(None)
+        progress.setMinimumDuration(500)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+
+        def report(done: int, total: int):
+            progress.setMaximum(total)
+            progress.setValue(done)
+
+        flush_or_fail(report)
+        progress.close()
+
+        if event_profiler.enabled:
+            path = os.path.join(app_env.cache_dir, 'event_profile.txt')
+            event_profiler.dump(path)
+            logging.info('Event listener timings were saved to %s', path)
+            logging.info('Event deliveries:\n%s', dispatch_report())
 
     @overrides
     def keyPressEvent(self, event: QKeyEvent) -> None:
@@ -262,6 +280,8 @@ class MainWindow(QMainWindow, Ui_MainWindow, EventListener):
         elif event.key() == Qt.Key.Key_Backtab and event.modifiers() & modifier():
             if self._current_view is not None:
                 self._current_view.jumpToPrevious()
+        elif event.key() == Qt.Key.Key_F12 and app_env.is_dev() and event_profiler.enabled:
+            EventProfilerDialog(self).display()
         else:
             super(MainWindow, self).keyPressEvent(event)
             return
@@ -712,25 +732,65 @@ class MainWindow(QMainWindow, Ui_MainWindow, EventListener):
         self.repo.flush(sync=True)
         if self.novel:
             self._clear_novel()
+            self.novel = None
 
         if novel.tutorial:
-            self.novel = novel
+            self._novel_loaded(novel)
         else:
-            self.novel = client.fetch_novel(novel.id)
+            self._fetch_novel(novel.id)
+
+    def _fetch_novel(self, novel_id: uuid.UUID):
+        progress = QProgressDialog('Loading novel...', '', 0, 0, parent=self.centralwidget)
+        progress.setCancelButton(None)
+        progress.setMinimumDuration(500)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+
+        def report(value: int, total: int):
+            progress.setMaximum(total)
+            progress.setValue(value)
+
+        def finished(novel: Novel):
+            progress.close()
+            if self._novelLoading is result:
+                self._novelLoading = None
+                self._novel_loaded(novel)
+
+        def failed(msg: str):
+            progress.close()
+            if self._novelLoading is result:
+                self._novelLoading = None
+                emit_critical('Could not open novel', msg)
+
+        result = NovelLoadingResult()
+        result.progress.connect(report)
+        result.finished.connect(finished)
+        result.failed.connect(failed)
+        self._novelLoading = result
+
+        worker = NovelLoaderWorker(novel_id, result)
+        if app_env.test_env():
+            worker.run()
+        else:
+            self._threadpool.start(worker)
+
+    def _novel_loaded(self, novel: Novel):
+        self.novel = novel
         self.repo.set_persistence_enabled(not novel.tutorial)
 
         migrate_novel(self.novel)
 
         acts_registry.set_novel(self.novel)
         entities_registry.set_novel(self.novel)
+        novel_statistics.set_novel(self.novel)
         dictionary.set_novel(self.novel)
         app_env.novel = self.novel
 
         if language_tool_proxy.is_set():
             language_tool_proxy.tool.language = self.novel.lang_settings.lang
+        proofreading_job.set_novel(self.novel)
 
         self._init_views()
-        if not novel.tutorial:
+        if not self.novel.tutorial:
             settings.set_last_novel_id(self.novel.id)
 
         self.outline_mode.setEnabled(True)
@@ -746,6 +806,7 @@ class MainWindow(QMainWindow, Ui_MainWindow, EventListener):
 
     def _clear_novel(self):
         self._restore_all_windows()
+        proofreading_job.stop()
 
         event_senders.pop(self.novel)
         event_dispatchers.pop(self.novel)
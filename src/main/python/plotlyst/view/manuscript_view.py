@@ -36,7 +36,9 @@ from plotlyst.events import SceneChangedEvent, OpenDistractionFreeMode, \
 from plotlyst.resources import ResourceType
 from plotlyst.service.grammar import language_tool_proxy
 from plotlyst.service.persistence import flush_or_fail
+from plotlyst.service.proofreading import proofreading_job
 from plotlyst.service.resource import ask_for_resource
+from plotlyst.service.statistics import novel_statistics
 from plotlyst.view._view import AbstractNovelView
 from plotlyst.view.common import tool_btn, ButtonPressResizeEventFilter, action, \
     ExclusiveOptionalButtonGroup, link_buttons_to_pages, shadow, scroll_to_bottom
@@ -297,7 +299,7 @@ class ManuscriptView(AbstractNovelView):
         self.ui.scrollEditor.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
 
     def _update_story_goal(self):
-        wc = sum([x.manuscript.statistics.wc for x in self.novel.scenes if x.manuscript and x.manuscript.statistics])
+        wc = novel_statistics.total()
         self.ui.lblWc.setText(f'{wc} word{"s" if wc > 1 else ""}')
         self._progressWdg.setValue(wc)
 
@@ -425,6 +427,9 @@ class ManuscriptView(AbstractNovelView):
     def _language_changed(self, lang: str):
         emit_info('Novel is getting closed. Persist workspace...')
         self.novel.lang_settings.lang = lang
+        if language_tool_proxy.is_set():
+            language_tool_proxy.tool.language = lang
+            proofreading_job.restart()
         self.repo.update_project_novel(self.novel)
         flush_or_fail()
         emit_global_event(CloseNovelEvent(self, self.novel))
@@ -34,6 +34,7 @@ from plotlyst.event.core import EventListener, Event
 from plotlyst.event.handler import event_dispatchers
 from plotlyst.events import CharacterChangedEvent, SceneChangedEvent, SceneDeletedEvent, \
     CharacterDeletedEvent, NovelSyncEvent, StorylineCreatedEvent, StorylineRemovedEvent, NovelStoryStructureUpdated
+from plotlyst.service.statistics import novel_statistics
 from plotlyst.view._view import AbstractNovelView
 from plotlyst.view.common import link_buttons_to_pages, scrolled
 from plotlyst.view.generated.reports_view_ui import Ui_ReportsView
@@ -200,10 +201,7 @@ class ManuscriptReportPage(ReportPage):
     def _cacheWordCounts(self):
         self._wc_cache.clear()
         for scene in self._novel.scenes:
-            if scene.manuscript and scene.manuscript.statistics:
-                self._wc_cache.append(scene.manuscript.statistics.wc)
-            else:
-                self._wc_cache.append(0)
+            self._wc_cache.append(novel_statistics.scene(scene))
 
 
 class ProductivityReportPage(ReportPage):
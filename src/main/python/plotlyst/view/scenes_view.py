@@ -101,7 +101,7 @@ class ScenesTitle(QWidget, Ui_ScenesTitle, EventListener):
 
         dispatcher = event_dispatchers.instance(self.novel)
         dispatcher.register(self, SceneChangedEvent, SceneAddedEvent, SceneDeletedEvent, NovelSyncEvent,
-                            NovelStoryStructureUpdated)
+                            NovelStoryStructureUpdated, coalesce=True)
 
     @overrides
     def event_received(self, event: Event):
@@ -324,7 +324,7 @@ class ScenesOutlineView(AbstractNovelView):
             self._handle_scene_deletion(event.scene)
             return
         elif isinstance(event, SceneAddedEvent):
-            i = self.novel.scenes.index(event.scene)
+            i = self.novel.index.scene_position(event.scene)
             card = self.__init_card_widget(event.scene)
             self.ui.cards.insertAt(i, card)
             self._handle_scene_added()
@@ -737,13 +737,13 @@ class ScenesOutlineView(AbstractNovelView):
         i = scenes.index(droppedScene)
         if i == 0 and len(scenes) > 1:  # first pos
             if scenes[1].chapter:
-                droppedScene.chapter = scenes[1].chapter
+                self.novel.assign_chapter(droppedScene, scenes[1].chapter)
                 self.repo.update_scene(droppedScene)
         elif i == len(scenes) - 1 and i > 0:  # last pos
-            droppedScene.chapter = scenes[i - 1].chapter
+            self.novel.assign_chapter(droppedScene, scenes[i - 1].chapter)
             self.repo.update_scene(droppedScene)
         elif i < len(scenes) - 1:
-            droppedScene.chapter = scenes[i + 1].chapter
+            self.novel.assign_chapter(droppedScene, scenes[i + 1].chapter)
             self.repo.update_scene(droppedScene)
 
         self.novel.scenes[:] = scenes
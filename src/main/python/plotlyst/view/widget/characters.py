@@ -367,7 +367,7 @@ class AvatarSelectors(QWidget):
         self.btnUploadAvatar.clicked.connect(self._upload_avatar)
         # self.btnAi.setIcon(IconRegistry.from_name('mdi.robot-happy-outline', 'white'))
         # self.btnAi.clicked.connect(self._select_ai)
-        if character.avatar:
+        if character.has_avatar():
             pass
         else:
             self.btnImage.setHidden(True)
@@ -410,7 +410,7 @@ class AvatarSelectors(QWidget):
             self.btnRole.setIcon(IconRegistry.from_name(self.character.role.icon, self.character.role.icon_color))
         if avatars.has_name_initial_icon(self.character):
             self.btnInitial.setIcon(avatars.name_initial_icon(self.character))
-        if self.character.avatar:
+        if self.character.has_avatar():
             self.btnImage.setIcon(QIcon(avatars.image(self.character)))
 
     def _selectorClicked(self):
@@ -37,6 +37,7 @@ from plotlyst.core.template import enneagram_choices, supporter_role, guide_role
     antagonist_role, contagonist_role, adversary_role, henchmen_role, confidant_role, tertiary_role, SelectionItem, \
     secondary_role
 from plotlyst.service.cache import acts_registry
+from plotlyst.service.statistics import novel_statistics
 from plotlyst.view.common import icon_to_html_img
 from plotlyst.view.icons import IconRegistry
 
@@ -418,19 +419,12 @@ class ManuscriptLengthChart(BaseChart):
             set_ = QBarSet('Scene')
             set_.hovered.connect(self._hovered)
             for scene in novel.scenes:
-                scene_wc = 0
-                if scene.manuscript and scene.manuscript.statistics:
-                    scene_wc += scene.manuscript.statistics.wc
-                set_.append(scene_wc)
+                set_.append(novel_statistics.scene(scene))
         else:
             set_ = QBarSet('Chapter')
             set_.hovered.connect(self._hovered)
-            for i, chapter in enumerate(novel.chapters):
-                chapter_wc = 0
-                for scene in novel.scenes_in_chapter(chapter):
-                    if scene.manuscript and scene.manuscript.statistics:
-                        chapter_wc += scene.manuscript.statistics.wc
-                set_.append(chapter_wc)
+            for chapter in novel.chapters:
+                set_.append(novel_statistics.chapter(chapter))
 
         set_.setColor(QColor(PLOTLYST_SECONDARY_COLOR))
 
@@ -21,11 +21,11 @@ import math
 from dataclasses import dataclass
 from enum import Enum
 from functools import partial
-from typing import Optional, List
+from typing import Optional, List, Dict, Set
 
 import emoji
 import qtanim
-from PyQt6 import QtGui
+from PyQt6 import QtGui, sip
 from PyQt6.QtCore import Qt, QObject, QEvent, QTimer, QPoint, QSize, pyqtSignal, QModelIndex, QItemSelectionModel
 from PyQt6.QtGui import QFont, QTextCursor, QTextCharFormat, QKeyEvent, QPaintEvent, QPainter, QBrush, QLinearGradient, \
     QColor, QSyntaxHighlighter, \
@@ -53,7 +53,7 @@ from plotlyst.event.handler import global_event_dispatcher
 from plotlyst.events import LanguageToolSet
 from plotlyst.model.characters_model import CharactersTableModel
 from plotlyst.model.common import proxy
-from plotlyst.service.grammar import language_tool_proxy, dictionary
+from plotlyst.service.grammar import language_tool_proxy, dictionary, grammar_checker
 from plotlyst.service.persistence import RepositoryPersistenceManager
 from plotlyst.view.common import action, label, push_btn, tool_btn, insert_before, fade_out_and_gc, shadow, emoji_font, \
     fade_in
@@ -142,6 +142,8 @@ class TextBlockData(QTextBlockUserData):
         super(TextBlockData, self).__init__()
         self._misspellings = []
         self._wordCount: int = -1
+        self._textHash: int = 0
+        self._grammarKey: Optional[bytes] = None
 
     @property
     def misspellings(self):
@@ -160,6 +162,22 @@ class TextBlockData(QTextBlockUserData):
     def wordCount(self, value):
         self._wordCount = value
 
+    @property
+    def textHash(self) -> int:
+        return self._textHash
+
+    @textHash.setter
+    def textHash(self, value: int):
+        self._textHash = value
+
+    @property
+    def grammarKey(self) -> Optional[bytes]:
+        return self._grammarKey
+
+    @grammarKey.setter
+    def grammarKey(self, value: Optional[bytes]):
+        self._grammarKey = value
+
 
 class AbstractTextBlockHighlighter(QSyntaxHighlighter):
     def _currentblockData(self) -> TextBlockData:
@@ -211,10 +229,9 @@ class GrammarHighlighter(AbstractTextBlockHighlighter, EventListener):
         if language_tool_proxy.is_set():
             self._language_tool = language_tool_proxy.tool
 
-        self._currentAsyncBlock: int = 0
-        self._asyncTimer = QTimer()
-        self._asyncTimer.setInterval(20)
-        self._asyncTimer.timeout.connect(self._highlightNextBlock)
+        self._pending: Set[bytes] = set()
+        grammar_checker.checked.connect(self._checked)
+        grammar_checker.failed.connect(self._failed)
 
         global_event_dispatcher.register(self, LanguageToolSet)
 
@@ -224,11 +241,11 @@ class GrammarHighlighter(AbstractTextBlockHighlighter, EventListener):
     def setCheckEnabled(self, enabled: bool):
         self._checkEnabled = enabled
         if not enabled:
-            self._asyncTimer.stop()
+            self._pending.clear()
 
     @overrides
     def setDocument(self, doc: Optional[QTextDocument]) -> None:
-        self._asyncTimer.stop()
+        self._pending.clear()
         super(GrammarHighlighter, self).setDocument(doc)
 
     @overrides
@@ -241,38 +258,87 @@ class GrammarHighlighter(AbstractTextBlockHighlighter, EventListener):
     def highlightBlock(self, text: str) -> None:
         data = self._currentblockData()
         if self._checkEnabled and self._language_tool:
-            matches = self._language_tool.check(text)
+            key = grammar_checker.key(text) if text.strip() else None
+            issues = grammar_checker.issues(key) if key else []
+            if issues is None:
+                issues = []
+                if key not in self._pending:
+                    self._pending.add(key)
+                    grammar_checker.request(key, text)
+            if data.grammarKey != key and data.grammarKey in self._pending:
+                self._pending.discard(data.grammarKey)
+                grammar_checker.discard(data.grammarKey)
+            data.grammarKey = key
             misspellings = []
-            for m in matches:
-                if dictionary.is_known_word(text[m.offset:m.offset + m.errorLength]):
+            for issue in issues:
+                if dictionary.is_known_word(text[issue.offset:issue.offset + issue.length]):
                     continue
-                self.setFormat(m.offset, m.errorLength,
-                               self._formats_per_issue.get(m.ruleIssueType, self._grammar_format))
-                misspellings.append((m.offset, m.errorLength, m.replacements, m.message, m.ruleIssueType))
+                self.setFormat(issue.offset, issue.length,
+                               self._formats_per_issue.get(issue.issue_type, self._grammar_format))
+                misspellings.append((issue.offset, issue.length, issue.replacements, issue.message, issue.issue_type))
             data.misspellings = misspellings
         else:
+            data.grammarKey = None
             data.misspellings.clear()
 
     def asyncRehighlight(self):
         if self._checkEnabled and self._language_tool:
-            self._currentAsyncBlock = 0
-            self._asyncTimer.start()
+            self.rehighlight()
 
-    def _highlightNextBlock(self):
-        if self._currentAsyncBlock >= self.document().blockCount():
-            return self._asyncTimer.stop()
+    def _failed(self, keys: List[bytes]):
+        self._pending.difference_update(keys)
 
-        block = self.document().findBlockByNumber(self._currentAsyncBlock)
-        self.rehighlightBlock(block)
-        self._currentAsyncBlock += 1
+    def _checked(self, keys: List[bytes]):
+        checked = self._pending.intersection(keys)
+        if not checked or self.document() is None:
+            return
+        self._pending.difference_update(checked)
+        block = self.document().begin()
+        while block.isValid():
+            data = block.userData()
+            if isinstance(data, TextBlockData) and data.grammarKey in checked:
+                self.rehighlightBlock(block)
+            block = block.next()
 
 
 class BlockStatistics(AbstractTextBlockHighlighter):
+    """Keeps the word count of each block and the running total of the document.
+
+    A block is counted again only if its text changed, and the total is adjusted by the difference.
+    The counts of removed blocks are subtracted once their user data is deleted by the document."""
+
+    def __init__(self, document: QTextDocument):
+        super(BlockStatistics, self).__init__(document)
+        self._blocks: Dict[int, TextBlockData] = {}
+        self._wordCount: int = 0
+
+    def wordCount(self) -> int:
+        if len(self._blocks) != self.document().blockCount():
+            self._pruneRemovedBlocks()
+        return self._wordCount
 
     @overrides
     def highlightBlock(self, text: str) -> None:
         data = self._currentblockData()
-        data.wordCount = wc(text)
+        text_hash = hash(text)
+        tracked = id(data) in self._blocks
+        if tracked and data.textHash == text_hash:
+            return
+
+        count = wc(text)
+        if tracked:
+            self._wordCount += count - max(data.wordCount, 0)
+        else:
+            self._blocks[id(data)] = data
+            self._wordCount += count
+        data.wordCount = count
+        data.textHash = text_hash
+
+    def _pruneRemovedBlocks(self):
+        for key, data in list(self._blocks.items()):
+            if sip.isdeleted(data):
+                self._wordCount -= max(data.wordCount, 0)
+                del self._blocks[key]
 
 
 class CharacterContentAssistMenu(QMenu):
@@ -484,14 +550,7 @@ class TextEditBase(EnhancedTextEdit):
         self._replacementInfo: Optional[ReplacementInfo] = None
 
     def statistics(self) -> TextStatistics:
-        wc = 0
-        for i in range(self.document().blockCount()):
-            block = self.document().findBlockByNumber(i)
-            data = block.userData()
-            if isinstance(data, TextBlockData):
-                wc += data.wordCount
-
-        return TextStatistics(wc)
+        return TextStatistics(self._blockStatistics.wordCount())
 
     # @overrides
     # def keyPressEvent(self, event: QtGui.QKeyEvent) -> None:
@@ -42,7 +42,7 @@ from textstat import textstat
 from plotlyst.common import RELAXED_WHITE_COLOR, PLOTLYST_SECONDARY_COLOR, PLOTLYST_MAIN_COLOR
 from plotlyst.core.domain import Novel, DocumentProgress
 from plotlyst.core.sprint import TimerModel
-from plotlyst.core.text import wc, sentence_count, clean_text
+from plotlyst.core.text import wc, sentence_counts, clean_text
 from plotlyst.env import app_env
 from plotlyst.resources import resource_registry
 from plotlyst.service.manuscript import find_daily_overall_progress
@@ -331,14 +331,13 @@ class ReadabilityWidget(QWidget, Ui_ReadabilityWidget):
                 self.btnResult.setIcon(IconRegistry.from_name('mdi.alpha-e-circle-outline', color='#85182a'))
                 self.lblResult.setText('<i style="color:#85182a">Very difficult to read</i>')
 
-        sentences_count = 0
-        for i in range(doc.blockCount()):
-            block = doc.findBlockByNumber(i)
-            if block.userState() == TextBlockState.UNEDITABLE.value:
-                continue
-            block_text = block.text()
-            if block_text:
-                sentences_count += sentence_count(block_text)
+        block_texts = []
+        block = doc.begin()
+        while block.isValid():
+            if block.userState() != TextBlockState.UNEDITABLE.value and block.text():
+                block_texts.append(block.text())
+            block = block.next()
+        sentences_count = sum(sentence_counts(block_texts))
 
         if not sentences_count:
             sentence_length = 0
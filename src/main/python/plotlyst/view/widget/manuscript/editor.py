@@ -47,6 +47,7 @@ from plotlyst.event.handler import event_dispatchers
 from plotlyst.events import SceneDeletedEvent, SceneChangedEvent
 from plotlyst.service.manuscript import daily_progress, daily_overall_progress
 from plotlyst.service.persistence import RepositoryPersistenceManager
+from plotlyst.service.statistics import novel_statistics
 from plotlyst.view.common import tool_btn, fade_in, fade
 from plotlyst.view.icons import IconRegistry
 from plotlyst.view.style.text import apply_text_color
@@ -737,6 +738,7 @@ class ManuscriptEditor(QWidget, EventListener):
             overall_progress.removed += abs(diff)
         self.progressChanged.emit(overall_progress)
         scene.manuscript.statistics.wc = wc
+        novel_statistics.scene_changed(scene)
 
         return True
 
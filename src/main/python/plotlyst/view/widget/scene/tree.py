@@ -380,7 +380,7 @@ class ScenesTreeView(TreeView, EventListener):
 
     def _addScene(self, chapterWdg: ChapterNode):
         scene = self._novel.new_scene()
-        scene.chapter = chapterWdg.chapter()
+        self._novel.assign_chapter(scene, chapterWdg.chapter())
         self._novel.scenes.append(scene)
 
         self.repo.insert_scene(self._novel, scene)
@@ -435,7 +435,7 @@ class ScenesTreeView(TreeView, EventListener):
             self._centralWidget.layout().insertWidget(i, wdg)
             i += 1
 
-            wdg.scene().chapter = None
+            self._novel.assign_chapter(wdg.scene(), None)
             self.repo.update_scene(wdg.scene())
 
         chapterWdg.setHidden(True)
@@ -538,17 +538,17 @@ class ScenesTreeView(TreeView, EventListener):
             self._toBeRemoved = sceneWdg
             new_widget = self.__initSceneWidget(ref)
             if self._dummyWdg.parent() is self._centralWidget:
-                ref.chapter = None
+                self._novel.assign_chapter(ref, None)
                 new_widget.setParent(self._centralWidget)
                 i = self._centralWidget.layout().indexOf(self._dummyWdg)
                 self._centralWidget.layout().insertWidget(i, new_widget)
             elif self._dummyWdg.parent() is self._spacer:
-                ref.chapter = None
+                self._novel.assign_chapter(ref, None)
                 new_widget.setParent(self._centralWidget)
                 self._centralWidget.layout().insertWidget(self._centralWidget.layout().count() - 1, new_widget)
             elif isinstance(self._dummyWdg.parent().parent(), ChapterNode):
                 chapter_wdg: ChapterNode = self._dummyWdg.parent().parent()
-                ref.chapter = chapter_wdg.chapter()
+                self._novel.assign_chapter(ref, chapter_wdg.chapter())
                 new_widget.setParent(chapter_wdg)
                 i = chapter_wdg.containerWidget().layout().indexOf(self._dummyWdg)
                 chapter_wdg.insertChild(i, new_widget)
@@ -515,7 +515,7 @@ class StoryStructureTimelineWidget(QWidget):
             self.highlightBeat(beat)
         elif self.isProportionalDisplay():
             self.clearHighlights()
-            index = self.novel.scenes.index(scene)
+            index = self.novel.index.scene_position(scene)
             previous_beat_scene = None
             previous_beat = None
             next_beat_scene = None
@@ -533,8 +533,8 @@ class StoryStructureTimelineWidget(QWidget):
 
             min_percentage = previous_beat.percentage if previous_beat else 1
             max_percentage = next_beat.percentage if next_beat else 99
-            min_index = self.novel.scenes.index(previous_beat_scene) if previous_beat_scene else 0
-            max_index = self.novel.scenes.index(next_beat_scene) if next_beat_scene else len(self.novel.scenes) - 1
+            min_index = self.novel.index.scene_position(previous_beat_scene) if previous_beat_scene else 0
+            max_index = self.novel.index.scene_position(next_beat_scene) if next_beat_scene else len(self.novel.scenes) - 1
 
             if max_index - min_index == 0:
                 return